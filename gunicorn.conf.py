@@ -0,0 +1,4 @@
+# Приложение импортируется один раз в мастер-процессе, а воркеры
+# получают уже загруженные модули через fork: новый воркер не тратит
+# время на импорт Django и приложений.
+preload_app = True
@@ -0,0 +1,249 @@
+import hashlib
+import json
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+
+from . import conditional
+from .filters import TaskFilter
+from .models import Label, Status, Task
+from .pagination import InvalidCursor, KeysetPaginator
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# сколько строк за раз читается из курсора БД и сериализуется
+CHUNK_SIZE = 200
+
+
+class ApiError(Exception):
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class ApiListView(View):
+    """
+    Базовое представление списка для JSON API (только чтение).
+
+    Поддерживает ?fields=a,b (в SELECT попадают только нужные колонки),
+    ?limit= и ?cursor= (keyset-пагинация вперёд), ETag/If-None-Match.
+    Тело ответа отдаётся потоком: строки читаются из БД порциями
+    и сериализуются по мере отправки, целиком в памяти список не лежит.
+
+    fields описывает поля ответа: одна колонка — значение как есть,
+    две колонки — вложенный объект {"id": ..., "name": ...}.
+    """
+
+    model = None
+    fields = {}
+    paginate_keys = ('id',)
+    conditional_tables = ()
+
+    def get(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse(
+                {'detail': 'Требуется авторизация'}, status=401
+            )
+
+        try:
+            fields = self.get_fields()
+            limit = self.get_limit()
+            queryset = self.get_queryset()
+            paginator = KeysetPaginator(self.get_paginate_keys(), limit)
+            queryset, backwards, _ = paginator.seek(
+                queryset, request.GET.get('cursor')
+            )
+            if backwards:
+                raise InvalidCursor(request.GET['cursor'])
+        except InvalidCursor:
+            return JsonResponse(
+                {'detail': 'Некорректный курсор страницы'}, status=400
+            )
+        except ApiError as error:
+            return JsonResponse({'detail': str(error)}, status=error.status)
+
+        etag = self.get_etag()
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        columns = self.get_columns(fields, paginator)
+        rows = queryset.values(*columns)[:limit + 1].iterator(
+            chunk_size=CHUNK_SIZE
+        )
+        response = StreamingHttpResponse(
+            self.stream(rows, fields, paginator, limit),
+            content_type='application/json',
+        )
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    def get_paginate_keys(self):
+        return self.paginate_keys
+
+    def get_fields(self):
+        requested = self.request.GET.get('fields')
+        if not requested:
+            return list(self.fields)
+
+        names = [name.strip() for name in requested.split(',')]
+        names = [name for name in dict.fromkeys(names) if name]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f'Неизвестные поля: {", ".join(unknown)}')
+        return names
+
+    def get_limit(self):
+        value = self.request.GET.get('limit')
+        if not value:
+            return DEFAULT_PAGE_SIZE
+        if not value.isdigit() or int(value) < 1:
+            raise ApiError('limit должен быть положительным числом')
+        return min(int(value), MAX_PAGE_SIZE)
+
+    def get_columns(self, fields, paginator):
+        columns = [column for name in fields for column in self.fields[name]]
+        columns.extend(name for name, _ in paginator.keys)
+        return list(dict.fromkeys(columns))
+
+    def get_etag(self):
+        # Те же версии таблиц в БД, что и у страниц (conditional.py):
+        # один запрос, и запись в любом воркере видна всем остальным.
+        versions = conditional.get_table_versions(self.conditional_tables)
+        parts = [
+            f'{table}:{versions[table].version}' for table in sorted(versions)
+        ]
+        parts.append(str(self.request.user.pk))
+        parts.append(self.request.GET.urlencode())
+        digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+        return f'"{digest}"'
+
+    def serialize(self, row, fields):
+        item = {}
+        for name in fields:
+            columns = self.fields[name]
+            if len(columns) == 1:
+                item[name] = row[columns[0]]
+            elif row[columns[0]] is None:
+                item[name] = None
+            else:
+                item[name] = {'id': row[columns[0]], 'name': row[columns[1]]}
+        return item
+
+    def prepare_chunk(self, rows, fields):
+        return rows
+
+    def stream(self, rows, fields, paginator, limit):
+        encoder = DjangoJSONEncoder()
+        yield '{"results": ['
+
+        emitted = 0
+        last = None
+        has_more = False
+        while True:
+            chunk = list(islice(rows, CHUNK_SIZE))
+            if not chunk:
+                break
+            if emitted + len(chunk) > limit:
+                chunk = chunk[:limit - emitted]
+                has_more = True
+
+            chunk = self.prepare_chunk(chunk, fields)
+            for row in chunk:
+                prefix = ', ' if emitted else ''
+                yield prefix + encoder.encode(self.serialize(row, fields))
+                emitted += 1
+                last = row
+            if has_more:
+                break
+
+        next_cursor = (
+            paginator.encode_cursor(last) if has_more and last else None
+        )
+        yield f'], "next": {json.dumps(next_cursor)}}}'
+
+
+class TaskApiView(ApiListView):
+    model = Task
+    fields = {
+        'id': ('id',),
+        'name': ('name',),
+        'description': ('description',),
+        'status': ('status_id', 'status__name'),
+        'executor': ('executor_id', 'executor__username'),
+        'author': ('author_id', 'author__username'),
+        'labels': ('id',),
+        'created_at': ('created_at',),
+    }
+    conditional_tables = conditional.TABLES
+
+    def get_queryset(self):
+        self.task_filter = TaskFilter(self.request.GET, self.request.user)
+        return self.task_filter.apply(Task.objects.all())
+
+    def get_paginate_keys(self):
+        return self.task_filter.ordering_keys
+
+    def serialize(self, row, fields):
+        item = super().serialize(row, fields)
+        if 'labels' in fields:
+            item['labels'] = row['labels']
+        return item
+
+    def prepare_chunk(self, rows, fields):
+        # метки подгружаются одним запросом на порцию строк
+        if 'labels' not in fields:
+            return rows
+
+        labels = {row['id']: [] for row in rows}
+        task_labels = Task.labels.through.objects.filter(
+            task_id__in=labels,
+        ).order_by('label_id').values_list(
+            'task_id', 'label_id', 'label__name'
+        )
+        for task_id, label_id, label_name in task_labels:
+            labels[task_id].append({'id': label_id, 'name': label_name})
+        for row in rows:
+            row['labels'] = labels[row['id']]
+        return rows
+
+
+class StatusApiView(ApiListView):
+    model = Status
+    conditional_tables = (conditional.STATUS,)
+    fields = {
+        'id': ('id',),
+        'name': ('name',),
+    }
+
+
+class LabelApiView(ApiListView):
+    model = Label
+    conditional_tables = (conditional.LABEL,)
+    fields = {
+        'id': ('id',),
+        'name': ('name',),
+        'created_at': ('created_at',),
+    }
+
+
+class UserApiView(ApiListView):
+    model = User
+    conditional_tables = (conditional.USER,)
+    fields = {
+        'id': ('id',),
+        'username': ('username',),
+        'first_name': ('first_name',),
+        'last_name': ('last_name',),
+        'date_joined': ('date_joined',),
+    }
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class TaskManagerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'task_manager'
+
+    def ready(self):
+        from . import notifications, signals  # noqa: F401
+
+        post_migrate.connect(signals.install_search_index, sender=self)
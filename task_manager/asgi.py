@@ -9,8 +9,16 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
+from task_manager.startup import warm_templates
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
+
+# статика отдаётся до middleware и не занимает поток запроса
+application = ASGIStaticFilesHandler(get_asgi_application())
 
-application = get_asgi_application()
+# шаблоны компилируются до первого запроса (и до fork воркеров)
+warm_templates()
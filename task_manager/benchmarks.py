@@ -0,0 +1,683 @@
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlencode, urljoin
+
+from asgiref.sync import (
+    ThreadSensitiveContext,
+    async_to_sync,
+    iscoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.contrib.auth.forms import AuthenticationForm
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.forms import modelform_factory
+from django.http import QueryDict
+from django.template.backends.django import DjangoTemplates
+from django.test import AsyncClient, Client, RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .caching import get_reference_data, render_task_rows
+from .filters import TaskFilter
+from .forms import UserCreateForm
+from .importer import TaskImporter
+from .models import Label, Status, Task, UserTaskStats
+from .pagination import KeysetPage
+from .startup import template_names
+
+
+BENCH_PREFIX = 'bench'
+BENCH_PASSWORD = 'bench-password'
+
+WORDS = (
+    'deploy', 'report', 'release', 'review', 'invoice', 'backup',
+    'migration', 'design', 'budget', 'meeting', 'server', 'client',
+    'database', 'update', 'audit', 'support', 'contract', 'training',
+)
+
+
+def bench_username(index):
+    return f'{BENCH_PREFIX}{index}'
+
+
+def clear_data():
+    """Удаляет всё, что создал generate_data (по префиксу имён)."""
+    Task.objects.filter(author__username__startswith=BENCH_PREFIX).delete()
+    User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+    Status.objects.filter(name__startswith=BENCH_PREFIX).delete()
+    Label.objects.filter(name__startswith=BENCH_PREFIX).delete()
+
+
+def generate_data(users=20, statuses=5, labels=20, tasks=1000,
+                  labels_per_task=2, seed=0, progress=None):
+    """
+    Синтетические данные для нагрузочных замеров.
+
+    Пользователи, статусы и метки создаются через bulk_create (пароль
+    хэшируется один раз на всех), задачи — через TaskImporter, как при
+    обычном импорте. Задачи распределены по авторам, исполнителям,
+    статусам и датам создания за последний год; у каждой до
+    labels_per_task случайных меток.
+    """
+    rng = random.Random(seed)
+    password = make_password(BENCH_PASSWORD)
+    User.objects.bulk_create([
+        User(
+            username=bench_username(i),
+            first_name='Bench',
+            last_name=str(i),
+            password=password,
+        )
+        for i in range(users)
+    ])
+    Status.objects.bulk_create([
+        Status(name=f'{BENCH_PREFIX}-status-{i}') for i in range(statuses)
+    ])
+    Label.objects.bulk_create([
+        Label(name=f'{BENCH_PREFIX}-label-{i}') for i in range(labels)
+    ])
+
+    usernames = [bench_username(i) for i in range(users)]
+    status_names = [f'{BENCH_PREFIX}-status-{i}' for i in range(statuses)]
+    label_names = [f'{BENCH_PREFIX}-label-{i}' for i in range(labels)]
+    now = timezone.now()
+
+    def rows():
+        for i in range(tasks):
+            yield {
+                'name': ' '.join(rng.sample(WORDS, 3)) + f' {i}',
+                'description': ' '.join(rng.choices(WORDS, k=12)),
+                'status': rng.choice(status_names),
+                'author': rng.choice(usernames),
+                'executor': (
+                    rng.choice(usernames) if rng.random() < 0.8 else ''
+                ),
+                'labels': rng.sample(
+                    label_names, min(labels_per_task, len(label_names))
+                ),
+                'created_at': (
+                    now - timedelta(minutes=rng.randrange(60 * 24 * 365))
+                ).isoformat(),
+            }
+
+    importer = TaskImporter(progress=progress)
+    importer.run(rows())
+    return importer.imported
+
+
+class BenchContext:
+    """Идентификаторы сгенерированных данных, из которых строятся URL."""
+
+    def __init__(self, username, seed=0):
+        self.rng = random.Random(seed)
+        self.user = User.objects.get(username=username)
+        self.statuses = list(Status.objects.values_list('id', flat=True))
+        self.labels = list(Label.objects.values_list('id', flat=True))
+        self.users = list(
+            User.objects.filter(
+                username__startswith=BENCH_PREFIX
+            ).values_list('id', flat=True)
+        ) or [self.user.pk]
+        self.tasks = list(
+            Task.objects.order_by('-created_at').values_list(
+                'id', flat=True
+            )[:500]
+        )
+        self.own_task = (
+            Task.objects.filter(author=self.user).first()
+            or Task.objects.get(pk=self.make_task())
+        )
+        self.created = []
+
+    def pick(self, values, k=1):
+        return self.rng.sample(values, min(k, len(values)))
+
+    def task_form(self, name):
+        return {
+            'name': name,
+            'description': 'benchmark',
+            'status': self.pick(self.statuses)[0],
+            'executor': self.pick(self.users)[0],
+            'labels': self.pick(self.labels, 2),
+        }
+
+    def make_task(self):
+        task = Task.objects.create(
+            name=f'{BENCH_PREFIX} task',
+            status_id=self.statuses[0],
+            author=self.user,
+        )
+        return task.pk
+
+    def cleanup(self):
+        # задачи, созданные сценариями (в названии есть пробел после
+        # префикса, у сгенерированных задач его нет)
+        Task.objects.filter(
+            author=self.user, name__startswith=f'{BENCH_PREFIX} '
+        ).exclude(pk=self.own_task.pk).delete()
+
+
+def _list(**params):
+    def build(context):
+        query = {
+            name: value(context) if callable(value) else value
+            for name, value in params.items()
+        }
+        return reverse('task_list') + '?' + urlencode(query, doseq=True)
+    return build
+
+
+def _get(build):
+    return lambda context: ('GET', build(context), None)
+
+
+def _created_after(context):
+    return (timezone.localdate() - timedelta(days=30)).isoformat()
+
+
+def _create(context):
+    name = f'{BENCH_PREFIX} created {len(context.created)}'
+    context.created.append(name)
+    return 'POST', reverse('task_create'), context.task_form(name)
+
+
+def _update(context):
+    task = context.own_task
+    return (
+        'POST',
+        reverse('task_update', args=[task.pk]),
+        context.task_form(task.name),
+    )
+
+
+def _delete(context):
+    return 'POST', reverse('task_delete', args=[context.make_task()]), {}
+
+
+# имя сценария -> функция, которая по контексту возвращает
+# (метод, путь, данные формы)
+SCENARIOS = {
+    'task_list': _get(_list()),
+    'task_list_status': _get(
+        _list(status=lambda c: c.pick(c.statuses))
+    ),
+    'task_list_executor': _get(
+        _list(executor=lambda c: c.pick(c.users))
+    ),
+    'task_list_labels_any': _get(
+        _list(labels=lambda c: c.pick(c.labels, 2))
+    ),
+    'task_list_labels_all': _get(
+        _list(labels=lambda c: c.pick(c.labels, 2), labels_mode='all')
+    ),
+    'task_list_only_my': _get(_list(only_my='on')),
+    'task_list_created': _get(_list(created_after=_created_after)),
+    'task_list_search': _get(
+        _list(q=lambda c: c.rng.choice(WORDS))
+    ),
+    'task_list_combined': _get(
+        _list(
+            status=lambda c: c.pick(c.statuses),
+            executor=lambda c: c.pick(c.users),
+            labels=lambda c: c.pick(c.labels),
+        )
+    ),
+    'task_detail': _get(
+        lambda c: reverse('task_detail', args=c.pick(c.tasks))
+    ),
+    'task_create': _create,
+    'task_update': _update,
+    'task_delete': _delete,
+    'user_list': _get(lambda c: reverse('user_list')),
+    'dashboard': _get(lambda c: reverse('home')),
+    'inbox': _get(lambda c: reverse('task_inbox')),
+}
+
+
+class InProcessClient:
+    """Запросы через django.test.Client в текущем процессе."""
+
+    counts_queries = True
+
+    def __init__(self, user):
+        self.client = Client()
+        self.client.force_login(user)
+
+    def request(self, method, path, data):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            if method == 'POST':
+                response = self.client.post(path, data)
+            else:
+                response = self.client.get(path)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = time.perf_counter() - started
+        return response.status_code, elapsed, len(queries)
+
+
+class AsyncInProcessClient:
+    """
+    Запросы через django.test.AsyncClient, то есть через ASGI-обработчик.
+
+    Как ASGI-сервер, каждый запрос получает свой ThreadSensitiveContext,
+    поэтому его синхронные части идут в отдельный поток, а не в общий.
+    В тестах isolate_threads=False: иначе поток не увидит данные
+    транзакции теста.
+    """
+
+    counts_queries = True
+
+    def __init__(self, user, isolate_threads=True):
+        self.client = AsyncClient()
+        self.client.force_login(user)
+        self.isolate_threads = isolate_threads
+
+    async def request(self, method, path, data):
+        started = time.perf_counter()
+        if self.isolate_threads:
+            async with ThreadSensitiveContext():
+                response = await self.send(method, path, data)
+        else:
+            response = await self.send(method, path, data)
+        elapsed = time.perf_counter() - started
+        return response.status_code, elapsed, server_timing_queries(response)
+
+    async def send(self, method, path, data):
+        if method == 'POST':
+            response = await self.client.post(path, data)
+        else:
+            response = await self.client.get(path)
+        if response.streaming:
+            b''.join([chunk async for chunk in response.streaming_content])
+        return response
+
+
+def server_timing_queries(response):
+    # число SQL-запросов из заголовка RequestMetricsMiddleware
+    match = re.search(
+        r'desc="(\d+) queries"', response.get('Server-Timing', '')
+    )
+    return int(match.group(1)) if match else None
+
+
+class HttpClient:
+    """Запросы по HTTP к запущенному серверу (gunicorn, runserver)."""
+
+    counts_queries = False
+
+    def __init__(self, base_url, username, password):
+        import requests
+
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.session.get(self.url(reverse('login')))
+        response = self.request(
+            'POST',
+            reverse('login'),
+            {'username': username, 'password': password},
+        )
+        if response[0] >= 400 or 'sessionid' not in self.session.cookies:
+            raise RuntimeError(f'Не удалось войти как {username}')
+
+    def url(self, path):
+        return urljoin(self.base_url, path)
+
+    def request(self, method, path, data):
+        started = time.perf_counter()
+        if method == 'POST':
+            data = dict(data)
+            data['csrfmiddlewaretoken'] = self.session.cookies.get(
+                'csrftoken', ''
+            )
+            response = self.session.post(
+                self.url(path),
+                data=data,
+                headers={'Referer': self.url(path)},
+                allow_redirects=False,
+            )
+        else:
+            response = self.session.get(self.url(path), allow_redirects=False)
+        elapsed = time.perf_counter() - started
+        return response.status_code, elapsed, None
+
+
+def percentile(values, percent):
+    """Перцентиль методом ближайшего ранга."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(timings, queries, errors, wall_time):
+    ms = [value * 1000 for value in timings]
+    return {
+        'requests': len(timings),
+        'errors': errors,
+        'p50_ms': round(percentile(ms, 50), 2),
+        'p95_ms': round(percentile(ms, 95), 2),
+        'p99_ms': round(percentile(ms, 99), 2),
+        'mean_ms': round(sum(ms) / len(ms), 2),
+        'rps': round(len(timings) / wall_time, 1) if wall_time else None,
+        'queries': (
+            round(sum(queries) / len(queries), 1) if queries else None
+        ),
+    }
+
+
+def run_scenario(clients, context, build, requests, warmup=0):
+    """
+    Гоняет один сценарий: warmup запросов без замера, затем requests
+    запросов, поровну распределённых между клиентами (каждый клиент —
+    отдельный поток со своим соединением).
+    """
+    for _ in range(warmup):
+        clients[0].request(*build(context))
+
+    def worker(client, count):
+        return [client.request(*build(context)) for _ in range(count)]
+
+    def threaded_worker(client, count):
+        try:
+            return worker(client, count)
+        finally:
+            # у каждого потока своё соединение с БД
+            connection.close()
+
+    counts = _split(requests, len(clients))
+    started = time.perf_counter()
+    if len(clients) == 1:
+        results = worker(clients[0], requests)
+    else:
+        with ThreadPoolExecutor(len(clients)) as pool:
+            results = [
+                result
+                for chunk in pool.map(threaded_worker, clients, counts)
+                for result in chunk
+            ]
+    wall_time = time.perf_counter() - started
+
+    return summarize(
+        timings=[elapsed for _, elapsed, _ in results],
+        queries=[count for _, _, count in results if count is not None],
+        errors=sum(1 for status, _, _ in results if status >= 400),
+        wall_time=wall_time,
+    )
+
+
+async def arun_scenario(clients, context, build, requests, warmup=0):
+    """
+    То же для асинхронных клиентов: параллельные клиенты — корутины
+    в одном цикле событий. Подготовка запроса (build) может ходить
+    в ORM, поэтому выполняется через sync_to_async.
+    """
+    prepare = sync_to_async(build)
+    for _ in range(warmup):
+        await clients[0].request(*await prepare(context))
+
+    async def worker(client, count):
+        return [
+            await client.request(*await prepare(context))
+            for _ in range(count)
+        ]
+
+    started = time.perf_counter()
+    chunks = await asyncio.gather(*(
+        worker(client, count)
+        for client, count in zip(clients, _split(requests, len(clients)))
+    ))
+    wall_time = time.perf_counter() - started
+
+    results = [result for chunk in chunks for result in chunk]
+    return summarize(
+        timings=[elapsed for _, elapsed, _ in results],
+        queries=[count for _, _, count in results if count is not None],
+        errors=sum(1 for status, _, _ in results if status >= 400),
+        wall_time=wall_time,
+    )
+
+
+def _split(total, parts):
+    return [total // parts + (i < total % parts) for i in range(parts)]
+
+
+def run_benchmarks(clients, context, scenarios=None, requests=50,
+                   warmup=5, progress=None):
+    if iscoroutinefunction(clients[0].request):
+        run = async_to_sync(arun_scenario)
+    else:
+        run = run_scenario
+
+    results = {}
+    try:
+        for name in scenarios or SCENARIOS:
+            results[name] = run(
+                clients, context, SCENARIOS[name], requests, warmup
+            )
+            if progress:
+                progress(name, results[name])
+    finally:
+        context.cleanup()
+    return results
+
+
+def build_report(results, **meta):
+    meta.setdefault('database', connection.vendor)
+    meta.setdefault('tasks', Task.objects.count())
+    meta.setdefault('created_at', timezone.now().isoformat())
+    return {'meta': meta, 'scenarios': results}
+
+
+def save_report(report, path):
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump(report, output, ensure_ascii=False, indent=2)
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as source:
+        return json.load(source)
+
+
+def compare(report, baseline, threshold=0.2, min_delta_ms=1.0):
+    """
+    Сравнивает отчёт с сохранённым базовым и возвращает список
+    регрессий: p95 вырос больше чем на threshold (и хотя бы на
+    min_delta_ms, чтобы не ловить шум на быстрых запросах) или
+    выросло число запросов к БД.
+    """
+    regressions = []
+    for name, current in report['scenarios'].items():
+        previous = baseline['scenarios'].get(name)
+        if previous is None:
+            continue
+        limit = previous['p95_ms'] * (1 + threshold)
+        delta = current['p95_ms'] - previous['p95_ms']
+        if current['p95_ms'] > limit and delta >= min_delta_ms:
+            regressions.append(
+                f'{name}: p95 {previous["p95_ms"]} -> '
+                f'{current["p95_ms"]} мс'
+            )
+        if (current['queries'] is not None
+                and previous['queries'] is not None
+                and current['queries'] > previous['queries']):
+            regressions.append(
+                f'{name}: запросов к БД {previous["queries"]} -> '
+                f'{current["queries"]}'
+            )
+    return regressions
+
+
+def template_engines():
+    """
+    Движок из настроек в двух вариантах: без кэша (шаблон читается
+    и компилируется при каждом get_template, как с
+    TEMPLATE_AUTORELOAD) и с кэширующим загрузчиком.
+    """
+    engines = {}
+    for mode, loaders in (
+        ('uncached', settings.TEMPLATE_LOADERS),
+        ('cached', [('django.template.loaders.cached.Loader',
+                     settings.TEMPLATE_LOADERS)]),
+    ):
+        params = dict(
+            settings.TEMPLATES[0], NAME=f'bench-{mode}', APP_DIRS=False
+        )
+        params['OPTIONS'] = dict(params['OPTIONS'], loaders=loaders)
+        params.pop('BACKEND')
+        engines[mode] = DjangoTemplates(params)
+    return engines
+
+
+def template_contexts(user):
+    """Контекст, с которым каждый шаблон рендерится вне представления."""
+    tasks = render_task_rows(Task.objects.for_listing()[:50], user)
+    task = tasks[0] if tasks else None
+    statuses = list(Status.objects.order_by('id')[:50])
+    labels = list(Label.objects.order_by('id')[:50])
+    page = {'page_obj': KeysetPage(tasks), 'is_paginated': False}
+    task_form = modelform_factory(
+        Task, fields=['name', 'description', 'status', 'executor', 'labels']
+    )
+    return {
+        'task_manager/index.html': {
+            'statuses': statuses,
+            'total_tasks': sum(status.task_count for status in statuses),
+            'executors': UserTaskStats.objects.select_related('user')
+            .order_by('-assigned_count')[:10],
+            'my_stats': UserTaskStats(user=user),
+        },
+        'task_manager/task_list.html': {
+            'tasks': tasks,
+            'task_filter': TaskFilter(QueryDict(), user),
+            **get_reference_data(),
+            **page,
+        },
+        'task_manager/task_row.html': {'task': task},
+        'task_manager/task_detail.html': {'task': task, 'object': task},
+        'task_manager/task_form.html': {
+            'form': task_form(instance=task), 'object': task,
+        },
+        'task_manager/task_confirm_delete.html': {'object': task},
+        'task_manager/status_list.html': {'statuses': statuses, **page},
+        'task_manager/status_form.html': {
+            'form': modelform_factory(Status, fields=['name'])(),
+        },
+        'task_manager/status_confirm_delete.html': {'object': statuses[0]},
+        'task_manager/label_list.html': {'labels': labels, **page},
+        'task_manager/label_form.html': {
+            'form': modelform_factory(Label, fields=['name'])(),
+        },
+        'task_manager/label_confirm_delete.html': {'object': labels[0]},
+        'task_manager/user_list.html': {
+            'object_list': User.objects.order_by('id')[:50], **page,
+        },
+        'task_manager/user_form.html': {'form': UserCreateForm()},
+        'task_manager/user_confirm_delete.html': {'object': user},
+        'task_manager/login.html': {'form': AuthenticationForm()},
+        'task_manager/pagination.html': page,
+    }
+
+
+def bench_templates(user, repeats=20, names=None):
+    """
+    Среднее время get_template() + render() каждого шаблона
+    из templates/task_manager/ без кэша загрузчика и с ним.
+    """
+    contexts = template_contexts(user)
+    request = RequestFactory().get('/')
+    request.user = user
+
+    results = {}
+    for mode, engine in template_engines().items():
+        for name in names or template_names():
+            context = contexts.get(name, {})
+            # первый рендер заполняет кэш и в замер не входит
+            engine.get_template(name).render(context, request)
+            started = time.perf_counter()
+            for _ in range(repeats):
+                engine.get_template(name).render(context, request)
+            elapsed = (time.perf_counter() - started) / repeats
+            results.setdefault(name, {})[f'{mode}_ms'] = round(
+                elapsed * 1000, 3
+            )
+    return results
+
+
+# (SESSION_BACKEND, MESSAGE_STORAGE) из settings.py; первый вариант —
+# худший случай, когда и сообщения пишутся в сессию в БД
+SESSION_SETUPS = (
+    ('db', 'session'),
+    ('db', 'fallback'),
+    ('cached_db', 'fallback'),
+    ('signed_cookies', 'cookie'),
+)
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def session_flow(username, password):
+    """Вход -> список задач -> выход: (метод, путь, данные формы)."""
+    return [
+        ('GET', reverse('login'), None),
+        ('POST', reverse('login'),
+         {'username': username, 'password': password}),
+        ('GET', reverse('task_list'), None),
+        ('GET', reverse('logout'), None),
+    ]
+
+
+def bench_session_flow(username, password, rounds=20, setups=None):
+    """
+    Прогоняет session_flow с каждым сочетанием хранилищ сессий
+    и сообщений. На запрос: сколько SQL-запросов, сколько из них
+    записей (INSERT/UPDATE/DELETE) и среднее время.
+    """
+    flow = session_flow(username, password)
+    results = {}
+    for session, storage in setups or SESSION_SETUPS:
+        with override_settings(
+            SESSION_ENGINE=settings.SESSION_BACKENDS[session],
+            MESSAGE_STORAGE=settings.MESSAGE_STORAGES[storage],
+        ):
+            caches[settings.SESSION_CACHE_ALIAS].clear()
+            # SessionMiddleware выбирает движок при создании клиента
+            client = Client()
+            queries = writes = 0
+            started = time.perf_counter()
+            for _ in range(rounds):
+                for method, path, data in flow:
+                    with CaptureQueriesContext(connection) as captured:
+                        if method == 'POST':
+                            response = client.post(path, data)
+                        else:
+                            response = client.get(path)
+                    if method == 'POST' and response.status_code != 302:
+                        raise RuntimeError(f'Не удалось войти как {username}')
+                    queries += len(captured)
+                    writes += sum(
+                        query['sql'].lstrip().upper().startswith(
+                            WRITE_STATEMENTS
+                        )
+                        for query in captured
+                    )
+            elapsed = time.perf_counter() - started
+        requests = rounds * len(flow)
+        results[f'{session}+{storage}'] = {
+            'queries': round(queries / requests, 2),
+            'writes': round(writes / requests, 2),
+            'mean_ms': round(elapsed * 1000 / requests, 2),
+        }
+    return results
@@ -0,0 +1,188 @@
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from . import conditional, counters, events, history
+from .caching import bump_versions
+from .models import Task, TaskHistory
+
+
+# сколько задач можно обработать одним действием
+MAX_TASKS = 1000
+
+SET_STATUS = 'status'
+SET_EXECUTOR = 'executor'
+ADD_LABELS = 'add_labels'
+REMOVE_LABELS = 'remove_labels'
+DELETE = 'delete'
+
+_local = threading.local()
+
+
+@contextmanager
+def bulk_operation():
+    """
+    Пока блок выполняется, обработчики сигналов задач (signals.py)
+    ничего не делают: счётчики и кэши после массового действия
+    обновляются одним проходом, а не на каждую задачу.
+    """
+    _local.depth = getattr(_local, 'depth', 0) + 1
+    try:
+        yield
+    finally:
+        _local.depth -= 1
+
+
+def in_bulk_operation():
+    return getattr(_local, 'depth', 0) > 0
+
+
+class BulkResult:
+
+    def __init__(self, changed=0, refused=0):
+        self.changed = changed
+        self.refused = refused
+
+
+def set_status(task_ids, status):
+    return _update(task_ids, status_id=status.pk)
+
+
+def set_executor(task_ids, executor):
+    return _update(task_ids, executor_id=executor.pk if executor else None)
+
+
+def add_labels(task_ids, labels):
+    Through = Task.labels.through
+    with transaction.atomic():
+        states = _lock(task_ids)
+        existing = set(
+            Through.objects.filter(
+                task_id__in=list(states), label__in=labels
+            ).values_list('task_id', 'label_id')
+        )
+        links = [
+            Through(task_id=task_id, label_id=label.pk)
+            for task_id in states
+            for label in labels
+            if (task_id, label.pk) not in existing
+        ]
+        Through.objects.bulk_create(links)
+        counters.add_label_uses(Counter(link.label_id for link in links))
+        added = defaultdict(list)
+        for link in links:
+            added[link.task_id].append(link.label_id)
+        history.record(
+            history.label_changes(task_id, added=label_ids)
+            for task_id, label_ids in added.items()
+        )
+    changed = set(added)
+    _invalidate(changed)
+    return BulkResult(len(changed))
+
+
+def remove_labels(task_ids, labels):
+    links = Task.labels.through.objects
+    with transaction.atomic():
+        states = _lock(task_ids)
+        removed = links.filter(task_id__in=list(states), label__in=labels)
+        removed_ids = defaultdict(list)
+        for task_id, label_id in removed.values_list('task_id', 'label_id'):
+            removed_ids[task_id].append(label_id)
+        changed = set(removed_ids)
+        counters.add_label_uses({
+            label_id: -count
+            for label_id, count in removed.order_by()
+            .values_list('label_id').annotate(count=Count('id'))
+        })
+        # у промежуточной таблицы нет обработчиков сигналов,
+        # так что это один DELETE ... WHERE без Collector
+        removed.delete()
+        history.record(
+            history.label_changes(task_id, removed=label_ids)
+            for task_id, label_ids in removed_ids.items()
+        )
+    _invalidate(changed)
+    return BulkResult(len(changed))
+
+
+def delete_tasks(task_ids, user):
+    """Удаляет только задачи, автор которых — user (как TaskDeleteView)."""
+    with transaction.atomic():
+        states = _lock(task_ids)
+        own = {
+            pk: state for pk, state in states.items()
+            if state['author_id'] == user.pk
+        }
+        label_uses = dict(
+            Task.labels.through.objects.filter(task_id__in=list(own))
+            .order_by().values_list('label_id').annotate(count=Count('id'))
+        )
+        with bulk_operation():
+            Task.objects.filter(pk__in=list(own)).delete()
+        deltas = Counter()
+        for state in own.values():
+            deltas.update(counters.change_deltas(state, None))
+        counters.apply_deltas(deltas)
+        counters.add_label_uses(
+            {pk: -count for pk, count in label_uses.items()}
+        )
+        history.record(
+            history.entry(pk, TaskHistory.DELETED) for pk in own
+        )
+    _invalidate(own, events.DELETED)
+    return BulkResult(len(own), len(states) - len(own))
+
+
+def _update(task_ids, **values):
+    """
+    Одно UPDATE ... WHERE id IN на все выбранные задачи. Счётчики
+    сдвигаются по прежним значениям, прочитанным под блокировкой.
+    """
+    with transaction.atomic():
+        states = _lock(task_ids)
+        changed = {
+            pk: state for pk, state in states.items()
+            if any(state[field] != value for field, value in values.items())
+        }
+        Task.objects.filter(pk__in=list(changed)).update(
+            updated_at=timezone.now(), **values
+        )
+        deltas = Counter()
+        for state in changed.values():
+            deltas.update(
+                counters.change_deltas(state, {**state, **values})
+            )
+        counters.apply_deltas(deltas)
+        history.record(
+            change
+            for pk, state in changed.items()
+            for change in history.field_changes(pk, state, values)
+        )
+    _invalidate(changed)
+    return BulkResult(len(changed))
+
+
+def _lock(task_ids):
+    """Прежние значения учитываемых полей: {id задачи: состояние}."""
+    rows = (
+        Task.objects.select_for_update()
+        .filter(pk__in=list(task_ids))
+        # строки блокируются в одном порядке — без взаимных блокировок
+        .order_by('pk')
+        .values('pk', *counters.COUNTED_FIELDS)
+    )
+    return {row.pop('pk'): row for row in rows}
+
+
+def _invalidate(task_ids, action=events.UPDATED):
+    # то же, что сигналы делают для одной задачи, но один раз на всё
+    if not task_ids:
+        return
+    bump_versions('task', task_ids)
+    conditional.bump_tables([conditional.TASK])
+    events.publish_on_commit(task_ids, action)
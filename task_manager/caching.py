@@ -0,0 +1,188 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import Label, Status
+
+
+ROW_TEMPLATE = 'task_manager/task_row.html'
+
+REFERENCE = 'reference'
+
+
+def version_key(kind, pk):
+    return f'version:{kind}:{pk}'
+
+
+def bump_versions(kind, pks):
+    """
+    Сбрасывает версии объектов. Ключ просто удаляется: при следующем
+    чтении get_versions() выдаст новое значение, которого не было
+    раньше, и все фрагменты со старой версией перестанут находиться.
+    """
+    cache.delete_many([version_key(kind, pk) for pk in pks])
+
+
+def get_versions(keys):
+    keys = list(dict.fromkeys(keys))
+    versions = cache.get_many(keys)
+    missing = _new_versions(keys, versions)
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return versions
+
+
+async def aget_versions(keys):
+    keys = list(dict.fromkeys(keys))
+    versions = await cache.aget_many(keys)
+    missing = _new_versions(keys, versions)
+    if missing:
+        await cache.aset_many(missing, timeout=None)
+        versions.update(missing)
+    return versions
+
+
+def _new_versions(keys, versions):
+    return {key: time.time_ns() for key in keys if key not in versions}
+
+
+def _row_version_keys(task):
+    keys = [
+        version_key('task', task.pk),
+        version_key('status', task.status_id),
+        version_key('user', task.author_id),
+    ]
+    if task.executor_id:
+        keys.append(version_key('user', task.executor_id))
+    keys.extend(version_key('label', label.pk) for label in task.labels.all())
+    return keys
+
+
+def _row_key(task, versions, user):
+    stamp = '.'.join(
+        str(versions[key]) for key in _row_version_keys(task)
+    )
+    is_author = int(task.author_id == user.pk)
+    digest = hashlib.md5(stamp.encode()).hexdigest()
+    return f'fragment:task_row:{task.pk}:{is_author}:{digest}'
+
+
+def render_task_rows(tasks, user):
+    """
+    Проставляет каждой задаче готовый HTML строки таблицы (task.row_html).
+
+    Строки берутся из кэша одним get_many; заново рендерятся только те,
+    у которых поменялась сама задача, её статус, автор, исполнитель или
+    одна из меток.
+    """
+    tasks = list(tasks)
+    versions = get_versions(
+        key for task in tasks for key in _row_version_keys(task)
+    )
+    keys = {task.pk: _row_key(task, versions, user) for task in tasks}
+    fragments = cache.get_many(keys.values())
+    rendered = _render_missing_rows(tasks, keys, fragments, user)
+    if rendered:
+        cache.set_many(rendered, timeout=settings.FRAGMENT_CACHE_TIMEOUT)
+    return tasks
+
+
+async def arender_task_rows(tasks, user):
+    tasks = list(tasks)
+    versions = await aget_versions(
+        key for task in tasks for key in _row_version_keys(task)
+    )
+    keys = {task.pk: _row_key(task, versions, user) for task in tasks}
+    fragments = await cache.aget_many(keys.values())
+    rendered = _render_missing_rows(tasks, keys, fragments, user)
+    if rendered:
+        await cache.aset_many(
+            rendered, timeout=settings.FRAGMENT_CACHE_TIMEOUT
+        )
+    return tasks
+
+
+def _render_missing_rows(tasks, keys, fragments, user):
+    rendered = {}
+    for task in tasks:
+        html = fragments.get(keys[task.pk])
+        if html is None:
+            html = render_to_string(ROW_TEMPLATE, {'task': task, 'user': user})
+            rendered[keys[task.pk]] = html
+        task.row_html = mark_safe(html)
+    return rendered
+
+
+def generation_key(name):
+    return f'generation:{name}'
+
+
+def get_generation(name):
+    key = generation_key(name)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+async def aget_generation(name):
+    key = generation_key(name)
+    generation = await cache.aget(key)
+    if generation is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        generation = await cache.aget(key)
+    return generation
+
+
+def bump_generation(name):
+    try:
+        cache.incr(generation_key(name))
+    except ValueError:
+        # ключа нет — новое поколение появится при следующем чтении
+        pass
+
+
+def get_reference_data():
+    """
+    Справочники для фильтров списка задач: пары (id, название)
+    статусов, пользователей и меток.
+
+    Хранятся под ключом с номером поколения; сигналы на Status, Label
+    и User увеличивают поколение, и следующий запрос перечитывает
+    справочники — только нужные колонки, без паролей и прочего.
+    """
+    key = f'{REFERENCE}:{get_generation(REFERENCE)}'
+    data = cache.get(key)
+    if data is None:
+        data = {
+            name: list(queryset)
+            for name, queryset in _reference_querysets().items()
+        }
+        cache.set(key, data, timeout=settings.REFERENCE_CACHE_TIMEOUT)
+    return data
+
+
+async def aget_reference_data():
+    key = f'{REFERENCE}:{await aget_generation(REFERENCE)}'
+    data = await cache.aget(key)
+    if data is None:
+        data = {}
+        for name, queryset in _reference_querysets().items():
+            data[name] = [row async for row in queryset]
+        await cache.aset(key, data, timeout=settings.REFERENCE_CACHE_TIMEOUT)
+    return data
+
+
+def _reference_querysets():
+    return {
+        'statuses': Status.objects.order_by('id').values_list('id', 'name'),
+        'users': User.objects.order_by('id').values_list('id', 'username'),
+        'labels': Label.objects.order_by('id').values_list('id', 'name'),
+    }
@@ -0,0 +1,168 @@
+import hashlib
+from calendar import timegm
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.contrib.messages import get_messages
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .models import TableVersion
+
+
+TASK = 'task'
+STATUS = 'status'
+LABEL = 'label'
+USER = 'user'
+TABLES = (TASK, STATUS, LABEL, USER)
+
+
+def bump_tables(tables, using=None):
+    """
+    Сдвигает версии таблиц после фиксации текущей транзакции. Строки
+    TableVersion общие для всех запросов: UPDATE внутри транзакции
+    держал бы их блокировку до COMMIT, и параллельные записи задач
+    шли бы строго по очереди.
+
+    Таблицы копятся на соединении; первый из колбэков транзакции
+    сдвигает их все одним UPDATE, остальные находят пустой набор
+    и запросов не делают. Таблицы откаченной транзакции сдвинутся
+    со следующей фиксацией — лишняя версия безвредна.
+    """
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        _bump_now(tables, connection.alias)
+        return
+    pending = connection.__dict__.setdefault('pending_table_bumps', set())
+    pending.update(tables)
+    transaction.on_commit(
+        partial(_flush_pending, connection.alias), using=connection.alias
+    )
+
+
+def _flush_pending(using):
+    connection = transaction.get_connection(using)
+    tables = connection.__dict__.pop('pending_table_bumps', None)
+    if tables:
+        _bump_now(sorted(tables), using)
+
+
+def _bump_now(tables, using=None):
+    """Одно UPDATE на все изменившиеся таблицы."""
+    versions = TableVersion.objects.using(using)
+    updated = versions.filter(table__in=tables).update(
+        version=F('version') + 1, updated_at=timezone.now()
+    )
+    if updated < len(tables):
+        # строки создаёт миграция; после flush их может не быть
+        _create_missing(tables, using)
+
+
+def get_table_versions(tables):
+    versions = {
+        row.table: row
+        for row in TableVersion.objects.filter(table__in=tables)
+    }
+    if len(versions) < len(tables):
+        versions.update(_create_missing(tables))
+    return versions
+
+
+async def aget_table_versions(tables):
+    versions = {
+        row.table: row
+        async for row in TableVersion.objects.filter(table__in=tables)
+    }
+    if len(versions) < len(tables):
+        versions.update(await sync_to_async(_create_missing)(tables))
+    return versions
+
+
+def _create_missing(tables, using=None):
+    versions = TableVersion.objects.using(using)
+    versions.bulk_create(
+        [TableVersion(table=table) for table in tables],
+        ignore_conflicts=True,
+    )
+    return {row.table: row for row in versions.filter(table__in=tables)}
+
+
+def page_validators(request, versions):
+    """
+    ETag и Last-Modified страницы. В ETag кроме версий таблиц входят
+    адрес с параметрами и ключ сессии: страница зависит от
+    пользователя (only_my, имя в шапке) и содержит CSRF-токен,
+    который меняется при входе.
+    """
+    parts = [
+        f'{table}:{versions[table].version}' for table in sorted(versions)
+    ]
+    parts.append(request.get_full_path())
+    parts.append(request.session.session_key or '')
+    digest = hashlib.md5('|'.join(parts).encode()).hexdigest()
+    last_modified = max(row.updated_at for row in versions.values())
+    return f'"{digest}"', timegm(last_modified.utctimetuple())
+
+
+def has_pending_messages(request):
+    # страница с flash-сообщениями одноразовая: её не сверяют
+    # с кэшем браузера и не снабжают валидаторами
+    return len(get_messages(request)) > 0
+
+
+def set_validators(response, etag, last_modified):
+    if response.status_code != 200:
+        return response
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # браузер хранит страницу, но каждый раз сверяется с сервером
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+class ConditionalPageMixin:
+    """
+    Условный GET: если таблицы из conditional_tables не менялись,
+    отвечает 304 без запроса списка и рендера шаблона. Ставится
+    после миксина авторизации.
+    """
+
+    conditional_tables = TABLES
+    # прочитанные версии таблиц, пригодятся для ключей кэша
+    table_versions = None
+
+    def dispatch(self, request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or has_pending_messages(request)):
+            return super().dispatch(request, *args, **kwargs)
+        self.table_versions = get_table_versions(self.conditional_tables)
+        etag, last_modified = page_validators(request, self.table_versions)
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+        response = super().dispatch(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
+
+
+class AsyncConditionalPageMixin:
+    conditional_tables = TABLES
+
+    async def dispatch(self, request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or await sync_to_async(has_pending_messages)(request)):
+            return await super().dispatch(request, *args, **kwargs)
+        etag, last_modified = page_validators(
+            request, await aget_table_versions(self.conditional_tables)
+        )
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            return not_modified
+        response = await super().dispatch(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
@@ -0,0 +1,157 @@
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Label, Status, Task, UserTaskStats
+
+
+# поля задачи, от которых зависят счётчики, и куда идёт каждый из них
+COUNTED_FIELDS = ('status_id', 'executor_id', 'author_id')
+TARGETS = {
+    'status_id': (Status, 'task_count'),
+    'executor_id': (UserTaskStats, 'assigned_count'),
+    'author_id': (UserTaskStats, 'authored_count'),
+}
+
+
+def task_state(task):
+    return {field: getattr(task, field) for field in COUNTED_FIELDS}
+
+
+def change_deltas(old, new):
+    """
+    Изменения счётчиков при переходе задачи из состояния old в new
+    (None — задачи нет): {(поле, id): +1/-1}.
+    """
+    deltas = Counter()
+    for field in COUNTED_FIELDS:
+        before = old[field] if old else None
+        after = new[field] if new else None
+        if before == after:
+            continue
+        if before is not None:
+            deltas[field, before] -= 1
+        if after is not None:
+            deltas[field, after] += 1
+    return deltas
+
+
+def apply_deltas(deltas, using=None):
+    """
+    Одно UPDATE ... SET x = x + n на каждый затронутый счётчик.
+    Строка UserTaskStats создаётся при первом увеличении: пользователи
+    заводятся и через bulk_create, без сигналов.
+    """
+    for (field, pk), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        model, column = TARGETS[field]
+        manager = model._default_manager.db_manager(using)
+        updated = manager.filter(pk=pk).update(
+            **{column: shifted(column, delta)}
+        )
+        if updated or model is not UserTaskStats or delta < 0:
+            continue
+        _, created = manager.get_or_create(
+            pk=pk, defaults={column: delta}
+        )
+        if not created:
+            manager.filter(pk=pk).update(**{column: shifted(column, delta)})
+
+
+def shifted(column, delta):
+    """
+    column + delta, но не меньше нуля: разошедшийся счётчик (см.
+    rebuild()) не должен ронять сохранение задачи на CHECK >= 0.
+    """
+    if delta < 0:
+        return Greatest(F(column) + delta, 0)
+    return F(column) + delta
+
+
+def add_tasks(tasks, label_ids=(), using=None):
+    """
+    Учитывает задачи и их метки, вставленные через bulk_create.
+    label_ids — id меток всех вставленных связей, с повторами.
+    """
+    deltas = Counter()
+    for task in tasks:
+        deltas.update(change_deltas(None, task_state(task)))
+    apply_deltas(deltas, using)
+    add_label_uses(Counter(label_ids), using)
+
+
+def add_label_uses(deltas, using=None):
+    """{id метки: изменение} — одно UPDATE на метку."""
+    labels = Label.objects.db_manager(using)
+    for pk, delta in sorted(deltas.items()):
+        if delta:
+            labels.filter(pk=pk).update(
+                task_count=shifted('task_count', delta)
+            )
+
+
+def rebuild(using=None):
+    """
+    Пересчитывает все счётчики по таблице задач (GROUP BY) —
+    на случай правок в обход save(), например QuerySet.update().
+    Возвращает число исправленных значений.
+    """
+    tasks = Task.objects.using(using)
+    fixed = 0
+    with transaction.atomic(using=using):
+        per_status = dict(
+            tasks.values_list('status').annotate(n=Count('id')).order_by()
+        )
+        fixed += _rebuild_column(Status, per_status, using)
+        per_label = dict(
+            Task.labels.through.objects.using(using)
+            .values_list('label').annotate(n=Count('id')).order_by()
+        )
+        fixed += _rebuild_column(Label, per_label, using)
+
+        assigned = dict(
+            tasks.exclude(executor=None).values_list('executor')
+            .annotate(n=Count('id')).order_by()
+        )
+        authored = dict(
+            tasks.values_list('author').annotate(n=Count('id')).order_by()
+        )
+        existing = {
+            stats.pk: stats
+            for stats in UserTaskStats.objects.using(using)
+        }
+        created = []
+        for user_id in User.objects.using(using).values_list('id', flat=True):
+            values = {
+                'assigned_count': assigned.get(user_id, 0),
+                'authored_count': authored.get(user_id, 0),
+            }
+            stats = existing.get(user_id)
+            if stats is None:
+                if any(values.values()):
+                    created.append(UserTaskStats(user_id=user_id, **values))
+                    fixed += 1
+                continue
+            if any(getattr(stats, key) != value
+                   for key, value in values.items()):
+                UserTaskStats.objects.using(using).filter(
+                    pk=user_id
+                ).update(**values)
+                fixed += 1
+        UserTaskStats.objects.using(using).bulk_create(created)
+    return fixed
+
+
+def _rebuild_column(model, counts, using):
+    fixed = 0
+    for obj in model.objects.using(using).only('task_count'):
+        count = counts.get(obj.pk, 0)
+        if obj.task_count != count:
+            obj.task_count = count
+            obj.save(update_fields=['task_count'])
+            fixed += 1
+    return fixed
@@ -0,0 +1,330 @@
+import atexit
+import hashlib
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.utils import timezone
+from django.utils.deprecation import MiddlewareMixin
+
+from .metrics import registry
+
+
+logger = logging.getLogger('task_manager.errors')
+
+# сколько отпечатков помнить для дедупликации
+MAX_FINGERPRINTS = 10_000
+
+# штатные ответы 404/403, а не ошибки
+IGNORED_EXCEPTIONS = (Http404, PermissionDenied)
+
+
+def fingerprint(exc_type, tb_frames):
+    # номера строк входят в отпечаток: одна и та же ошибка в разных
+    # местах функции — разные события
+    parts = [f'{exc_type.__module__}.{exc_type.__qualname__}']
+    parts.extend(
+        f'{frame.filename}:{frame.name}:{frame.lineno}' for frame in tb_frames
+    )
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+
+def build_event(exc_info, request=None):
+    """
+    Событие об ошибке в виде словаря. Трейсбек сразу превращается
+    в текст, чтобы очередь не удерживала кадры стека и их локальные
+    переменные.
+    """
+    exc_type, exc, tb = exc_info
+    frames = traceback.extract_tb(tb)
+    event = {
+        'fingerprint': fingerprint(exc_type, frames),
+        'timestamp': timezone.now().isoformat(),
+        'exception': exc_type.__name__,
+        'message': str(exc),
+        'traceback': ''.join(
+            traceback.format_exception(exc_type, exc, tb)
+        ),
+        'occurrences': 1,
+    }
+    if request is not None:
+        match = getattr(request, 'resolver_match', None)
+        user = getattr(request, 'user', None)
+        event['request'] = {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': match.view_name if match else None,
+            'user': user.pk if user is not None else None,
+        }
+    return event
+
+
+class FileSink:
+    """События построчно в JSON (NDJSON) в локальный файл."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def send(self, events):
+        with open(self.path, 'a', encoding='utf-8') as output:
+            for event in events:
+                output.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+
+class RollbarSink:
+    """
+    Отправка в Rollbar. SDK инициализируется при первой отправке
+    из фонового потока, а не при импорте настроек. Payload собирается
+    средствами SDK, но отправляется через _post_api, а не
+    report_message(): тот перехватывает и только логирует сетевые
+    ошибки, и ErrorReporter не узнал бы, что пора писать в fallback.
+    """
+
+    def __init__(self, options):
+        self.options = options
+        self.initialized = False
+
+    def send(self, events):
+        import rollbar
+
+        if not self.initialized:
+            rollbar.init(
+                access_token=self.options['access_token'],
+                environment=self.options['environment'],
+                root=str(self.options['root']),
+                endpoint=self.options.get(
+                    'endpoint', rollbar.DEFAULT_ENDPOINT
+                ),
+                timeout=self.options.get('timeout', 3),
+            )
+            self.initialized = True
+        for event in events:
+            data = rollbar._build_base_data(None, level='error')
+            data['body'] = {'message': {
+                'body': f'{event.get("exception")}: {event.get("message")}',
+                **event,
+            }}
+            data['custom'] = event
+            data['server'] = rollbar._build_server_data()
+            payload = rollbar._build_payload(data)
+            result = rollbar._post_api(
+                'item/', rollbar._serialize_payload(payload),
+                access_token=payload['access_token'],
+            )
+            # 429 и 502 SDK только логирует и возвращает None
+            if result is None:
+                raise ConnectionError('Rollbar не принял событие')
+
+
+class NullSink:
+
+    def send(self, events):
+        pass
+
+
+class ErrorReporter:
+    """
+    Асинхронная отправка ошибок пачками.
+
+    report() не делает сетевых вызовов: событие кладётся в
+    ограниченную очередь, которую разбирает фоновый поток и отправляет
+    в sink пачками до batch_size событий. Повторы одной ошибки
+    (по отпечатку) в течение dedup_window секунд не ставятся в
+    очередь, а считаются и уходят полем occurrences. Если очередь
+    полна, событие отбрасывается и учитывается в dropped. Когда
+    основной sink падает, пачка пишется в fallback.
+    """
+
+    def __init__(self, sink, fallback=None, max_queue=1000, batch_size=50,
+                 flush_interval=2.0, dedup_window=60.0):
+        self.sink = sink
+        self.fallback = fallback
+        self.queue = queue.Queue(max_queue)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dedup_window = dedup_window
+
+        self.lock = threading.Lock()
+        self.send_lock = threading.Lock()
+        self.recent = {}
+        self.suppressed = Counter()
+        self.dropped = 0
+        self.thread = None
+        self.pid = None
+
+    def report(self, exc_info=None, request=None):
+        try:
+            event = build_event(exc_info or sys.exc_info(), request)
+        except Exception:
+            logger.exception('Не удалось сформировать событие об ошибке')
+            return
+
+        key = event['fingerprint']
+        now = time.monotonic()
+        with self.lock:
+            seen = self.recent.get(key)
+            if seen is not None and now - seen < self.dedup_window:
+                self.suppressed[key] += 1
+                registry.inc('error_reports_deduplicated_total', {})
+                return
+            self.recent[key] = now
+            if len(self.recent) > MAX_FINGERPRINTS:
+                self.forget_old(now)
+
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            registry.inc(
+                'error_reports_dropped_total', {},
+                'Ошибки, отброшенные из-за полной очереди',
+            )
+            return
+        registry.inc('error_reports_total', {}, 'Поставленные в очередь')
+        self.ensure_thread()
+
+    def forget_old(self, now):
+        for key, seen in list(self.recent.items()):
+            if now - seen >= self.dedup_window and key not in self.suppressed:
+                del self.recent[key]
+
+    def ensure_thread(self):
+        # после fork (воркеры gunicorn) поток родителя не существует
+        if self.thread is not None and self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.thread is not None and self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self.thread = threading.Thread(
+                target=self.run, name='error-reporter', daemon=True
+            )
+            self.thread.start()
+
+    def run(self):
+        while True:
+            batch = self.collect(timeout=self.flush_interval)
+            self.send(batch)
+
+    def collect(self, timeout=None):
+        batch = []
+        try:
+            if timeout is None:
+                batch.append(self.queue.get_nowait())
+            else:
+                batch.append(self.queue.get(timeout=timeout))
+        except queue.Empty:
+            return batch
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self):
+        """Синхронно отправляет всё, что накопилось (тесты, atexit)."""
+        while True:
+            batch = self.collect()
+            if not batch:
+                break
+            self.send(batch)
+        self.send([], force=True)
+
+    def send(self, batch, force=False):
+        now = time.monotonic()
+        with self.lock:
+            for event in batch:
+                event['occurrences'] += self.suppressed.pop(
+                    event['fingerprint'], 0
+                )
+            # повторы ошибок, которые уже были отправлены раньше
+            for key, count in list(self.suppressed.items()):
+                if force or now - self.recent[key] >= self.dedup_window:
+                    batch.append({
+                        'fingerprint': key,
+                        'timestamp': timezone.now().isoformat(),
+                        'repeated': count,
+                    })
+                    del self.suppressed[key]
+            if self.dropped:
+                batch.append({
+                    'timestamp': timezone.now().isoformat(),
+                    'dropped': self.dropped,
+                })
+                self.dropped = 0
+        if not batch:
+            return
+
+        with self.send_lock:
+            try:
+                self.sink.send(batch)
+            except Exception:
+                logger.exception('Не удалось отправить ошибки')
+                if self.fallback is None:
+                    return
+                try:
+                    self.fallback.send(batch)
+                except Exception:
+                    logger.exception('Не удалось записать ошибки в файл')
+
+
+def make_sink(name, options):
+    if name == 'rollbar':
+        return RollbarSink(settings.ROLLBAR)
+    if name == 'file':
+        return FileSink(options['FILE'])
+    if name == 'null':
+        return NullSink()
+    raise ValueError(f'Неизвестный sink ошибок: {name}')
+
+
+_reporter = None
+_reporter_lock = threading.Lock()
+
+
+def get_reporter():
+    global _reporter
+    if _reporter is None:
+        with _reporter_lock:
+            if _reporter is None:
+                options = settings.ERROR_REPORTING
+                sink = make_sink(options['SINK'], options)
+                _reporter = ErrorReporter(
+                    sink,
+                    fallback=(
+                        None if isinstance(sink, FileSink)
+                        else FileSink(options['FILE'])
+                    ),
+                    max_queue=options['QUEUE_SIZE'],
+                    batch_size=options['BATCH_SIZE'],
+                    flush_interval=options['FLUSH_INTERVAL'],
+                    dedup_window=options['DEDUP_WINDOW'],
+                )
+                atexit.register(_reporter.flush)
+    return _reporter
+
+
+class ErrorReportingMiddleware(MiddlewareMixin):
+    """
+    Ставит необработанные исключения представлений в очередь.
+    MiddlewareMixin делает его пригодным и для ASGI: без
+    process_request/process_response запрос не уходит в поток.
+    """
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, IGNORED_EXCEPTIONS):
+            return None
+        get_reporter().report(
+            (type(exception), exception, exception.__traceback__), request
+        )
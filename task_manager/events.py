@@ -0,0 +1,228 @@
+import asyncio
+import itertools
+import json
+import threading
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.module_loading import import_string
+
+from .caching import ROW_TEMPLATE
+from .models import Task
+
+
+CREATED = 'created'
+UPDATED = 'updated'
+DELETED = 'deleted'
+# задача больше не подходит под фильтр подписчика
+REMOVED = 'removed'
+
+# подписчик не успевает читать: клиенту проще перезагрузить список
+RELOAD = object()
+
+_event_ids = itertools.count(1)
+_broker = None
+
+
+class TaskEvent:
+    """
+    Изменение одной задачи. Строка таблицы рендерится один раз при
+    публикации (для автора и для остальных — у автора есть кнопка
+    удаления), сообщения SSE кодируются лениво и тоже один раз на
+    вариант, а не на каждого подписчика.
+    """
+
+    def __init__(self, action, task_id, state=None, rows=None):
+        self.id = next(_event_ids)
+        self.action = action
+        self.task_id = task_id
+        self.state = state
+        self.rows = rows or {}
+        self._messages = {}
+
+    def for_subscriber(self, task_filter, user):
+        if self.action == DELETED:
+            return self.message(DELETED)
+        if not task_filter.matches(self.state):
+            return self.message(REMOVED)
+        variant = 'author' if self.state['author_id'] == user.pk else 'other'
+        return self.message(self.action, variant)
+
+    def message(self, action, variant=None):
+        key = action, variant
+        if key not in self._messages:
+            data = {'action': action, 'id': self.task_id}
+            if variant is not None:
+                data['html'] = self.rows[variant]
+            self._messages[key] = (
+                f'id: {self.id}\nevent: task\n'
+                f'data: {json.dumps(data, ensure_ascii=False)}\n\n'
+            )
+        return self._messages[key]
+
+
+class Subscription:
+    """Подписчик потока событий: фильтр списка и очередь в его цикле."""
+
+    def __init__(self, broker, task_filter, user, size=None):
+        self.broker = broker
+        self.task_filter = task_filter
+        self.user = user
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(size or settings.TASK_EVENTS_QUEUE_SIZE)
+
+    def deliver(self, events):
+        # вызывается в цикле событий подписчика
+        for event in events:
+            message = event.for_subscriber(self.task_filter, self.user)
+            try:
+                self.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                while not self.queue.empty():
+                    self.queue.get_nowait()
+                self.queue.put_nowait(RELOAD)
+                return
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """
+    Рассылка событий подписчикам этого процесса. Публикация из любого
+    потока стоит один call_soon_threadsafe на цикл событий, а не на
+    подписчика; подписчики проверяются в памяти.
+
+    Чтобы события доходили до подписчиков других процессов (несколько
+    воркеров uvicorn), подкласс переопределяет publish(): отправляет
+    события во внешний канал (Redis pub/sub, LISTEN/NOTIFY), а
+    полученные оттуда передаёт в dispatch(). Подключается настройкой
+    TASK_EVENTS_BACKEND.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, task_filter, user):
+        subscription = Subscription(self, task_filter, user)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def publish(self, events):
+        self.dispatch(events)
+
+    def dispatch(self, events):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        by_loop = defaultdict(list)
+        for subscription in subscribers:
+            by_loop[subscription.loop].append(subscription)
+        for loop, group in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_deliver, group, events)
+            except RuntimeError:
+                # цикл уже закрыт, его подписчики отключились
+                pass
+
+
+def _deliver(subscribers, events):
+    for subscription in subscribers:
+        subscription.deliver(events)
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.TASK_EVENTS_BACKEND)()
+    return _broker
+
+
+def publish_on_commit(task_ids, action, using=None):
+    """
+    Публикует изменение задач после фиксации транзакции: откаченное
+    подписчики не увидят. Без подписчиков ничего не рендерится.
+    """
+    task_ids = list(task_ids)
+    if task_ids:
+        transaction.on_commit(
+            partial(publish, task_ids, action, using), using=using
+        )
+
+
+def publish(task_ids, action, using=None):
+    broker = get_broker()
+    if not broker.has_subscribers():
+        return
+    if action == DELETED:
+        events = [TaskEvent(DELETED, pk) for pk in task_ids]
+    else:
+        tasks = Task.objects.using(using).for_listing().filter(
+            pk__in=task_ids
+        )
+        events = [
+            TaskEvent(action, task.pk, task_state(task), render_rows(task))
+            for task in tasks
+        ]
+    if events:
+        broker.publish(events)
+
+
+def task_state(task):
+    """Поля, по которым TaskFilter.matches() проверяет задачу."""
+    return {
+        'status_id': task.status_id,
+        'executor_id': task.executor_id,
+        'author_id': task.author_id,
+        'label_ids': [label.pk for label in task.labels.all()],
+        'created_at': task.created_at,
+        'name': task.name,
+        'description': task.description or '',
+    }
+
+
+def render_rows(task):
+    return {
+        'author': render_to_string(
+            ROW_TEMPLATE, {'task': task, 'user': task.author}
+        ),
+        'other': render_to_string(
+            ROW_TEMPLATE, {'task': task, 'user': AnonymousUser()}
+        ),
+    }
+
+
+async def stream(subscription):
+    """
+    Тело ответа text/event-stream. Пока событий нет, раз в
+    TASK_EVENTS_HEARTBEAT секунд уходит комментарий: прокси не
+    закрывают соединение, а отключившийся клиент обнаруживается.
+    """
+    try:
+        yield f'retry: {settings.TASK_EVENTS_RETRY_MS}\n\n'
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    subscription.queue.get(), settings.TASK_EVENTS_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            if message is RELOAD:
+                yield 'event: reload\ndata: {}\n\n'
+                return
+            yield message
+    finally:
+        subscription.close()
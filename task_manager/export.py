@@ -0,0 +1,78 @@
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .filters import TaskFilter
+from .models import Task
+
+
+EXPORT_FIELDS = (
+    'id',
+    'name',
+    'description',
+    'status',
+    'executor',
+    'author',
+    'labels',
+    'created_at',
+)
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def export_queryset(params, user):
+    """Задачи для выгрузки с теми же фильтрами и порядком, что и /tasks/."""
+    task_filter = TaskFilter(params, user)
+    queryset = task_filter.apply(Task.objects.for_listing()).only(
+        'id',
+        'name',
+        'description',
+        'created_at',
+        'status__name',
+        'executor__username',
+        'author__username',
+    )
+    return queryset.order_by(*task_filter.ordering_keys)
+
+
+def iter_task_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    # iterator() с prefetch_related подгружает метки отдельно для каждой
+    # порции из chunk_size задач, так что в памяти лежит одна порция
+    for task in queryset.iterator(chunk_size=chunk_size):
+        yield {
+            'id': task.id,
+            'name': task.name,
+            'description': task.description,
+            'status': task.status.name,
+            'executor': task.executor.username if task.executor else '',
+            'author': task.author.username,
+            'labels': [label.name for label in task.labels.all()],
+            'created_at': task.created_at,
+        }
+
+
+class _Echo:
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        row['labels'] = ', '.join(row['labels'])
+        row['created_at'] = row['created_at'].isoformat()
+        yield writer.writerow([row[field] for field in EXPORT_FIELDS])
+
+
+def iter_ndjson(rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(row) + '\n'
+
+
+FORMATS = {
+    'csv': (iter_csv, 'text/csv; charset=utf-8'),
+    'ndjson': (iter_ndjson, 'application/x-ndjson; charset=utf-8'),
+}
@@ -0,0 +1,167 @@
+from datetime import datetime, time, timedelta
+
+from django.db import connection
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Task
+from .search import get_search_backend
+
+
+LABELS_ANY = 'any'
+LABELS_ALL = 'all'
+
+DEFAULT_KEYS = ('-created_at', 'id')
+
+
+class TaskFilter:
+    """
+    Фильтры списка задач, собранные в один запрос.
+
+    Каждый параметр может повторяться (?status=1&status=2). Метки
+    проверяются через EXISTS по промежуточной таблице, а не JOIN,
+    поэтому задачи не дублируются и DISTINCT не нужен: при режиме
+    'any' хватает одного подзапроса, при 'all' — по одному на метку.
+    Текстовый запрос ?q= уходит в полнотекстовый индекс (search.py)
+    и меняет порядок выдачи на порядок по релевантности.
+    """
+
+    def __init__(self, params, user):
+        self.user = user
+        self.statuses = _ids(_getlist(params, 'status'), 'status')
+        self.executors = _ids(_getlist(params, 'executor'), 'executor')
+        self.labels = _ids(_getlist(params, 'labels'), 'labels')
+        self.labels_mode = (
+            LABELS_ALL if params.get('labels_mode') == LABELS_ALL
+            else LABELS_ANY
+        )
+        self.created_after = _start_of(params.get('created_after'))
+        self.created_before = _end_of(params.get('created_before'))
+        self.only_my = bool(params.get('only_my'))
+        self.query = (params.get('q') or '').strip()
+
+    @property
+    def ordering_keys(self):
+        if self.query:
+            return (get_search_backend().rank_key, 'id')
+        return DEFAULT_KEYS
+
+    def apply(self, queryset):
+        if self.statuses:
+            queryset = queryset.filter(status_id__in=self.statuses)
+        if self.executors:
+            queryset = queryset.filter(executor_id__in=self.executors)
+        if self.only_my:
+            queryset = queryset.filter(author=self.user)
+        if self.created_after:
+            queryset = queryset.filter(created_at__gte=self.created_after)
+        if self.created_before:
+            queryset = queryset.filter(created_at__lt=self.created_before)
+        if self.labels:
+            queryset = queryset.filter(*self._label_conditions(queryset))
+        if self.query:
+            queryset = get_search_backend().search(queryset, self.query)
+        return queryset
+
+    def matches(self, task):
+        """
+        Та же проверка для одной задачи в памяти, без запроса к БД, —
+        для живых обновлений списка (events.py). task — словарь полей
+        задачи с добавленным списком label_ids. Текстовый запрос
+        проверяется приближённо: каждое слово должно встретиться
+        в названии или описании.
+        """
+        if self.statuses and task['status_id'] not in self.statuses:
+            return False
+        if self.executors and task['executor_id'] not in self.executors:
+            return False
+        if self.only_my and task['author_id'] != self.user.pk:
+            return False
+        if self.created_after and task['created_at'] < self.created_after:
+            return False
+        if (self.created_before
+                and task['created_at'] >= self.created_before):
+            return False
+        if self.labels:
+            labels = set(task['label_ids'])
+            if self.labels_mode == LABELS_ALL:
+                if not labels.issuperset(self.labels):
+                    return False
+            elif labels.isdisjoint(self.labels):
+                return False
+        if self.query:
+            text = f"{task['name']} {task['description']}".casefold()
+            return all(word in text for word in self.query.casefold().split())
+        return True
+
+    def _label_conditions(self, queryset):
+        task_labels = queryset.model.labels.through.objects.filter(
+            task_id=OuterRef('pk'),
+        )
+        if self.labels_mode == LABELS_ALL:
+            return [
+                Exists(task_labels.filter(label_id=label_id))
+                for label_id in self.labels
+            ]
+        return [Exists(task_labels.filter(label_id__in=self.labels))]
+
+
+def _getlist(params, name):
+    if hasattr(params, 'getlist'):
+        return params.getlist(name)
+    value = params.get(name)
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def _ids(values, field_name):
+    # только ASCII-цифры ('²'.isdigit() тоже True) и только id, которые
+    # помещаются в столбец: иначе int() или сама база ответят ошибкой
+    _, max_id = _id_range(field_name)
+    ids = []
+    for value in values:
+        value = str(value).strip()
+        if not (value.isascii() and value.isdigit()):
+            continue
+        pk = int(value)
+        if 0 < pk <= max_id and pk not in ids:
+            ids.append(pk)
+    return ids
+
+
+def _id_range(field_name):
+    target = Task._meta.get_field(field_name).target_field
+    return connection.ops.integer_field_range(target.get_internal_type())
+
+
+def _parse_moment(value):
+    if not value:
+        return None, False
+    value = value.strip()
+    try:
+        day = parse_date(value)
+        if day is not None:
+            return timezone.make_aware(datetime.combine(day, time.min)), True
+        moment = parse_datetime(value)
+    except ValueError:
+        return None, False
+    if moment is not None and timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment, False
+
+
+def _start_of(value):
+    moment, _ = _parse_moment(value)
+    return moment
+
+
+def _end_of(value):
+    # дата без времени включает весь день целиком
+    moment, whole_day = _parse_moment(value)
+    if moment is not None and whole_day:
+        moment += timedelta(days=1)
+    return moment
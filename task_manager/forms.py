@@ -1,6 +1,10 @@
 from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
+from django.db import connection
+
+from . import bulk
+from .models import Label, Status, Task
 
 
 class UserCreateForm(UserCreationForm):
@@ -55,3 +59,86 @@ class UserUpdateForm(forms.ModelForm):
             "last_name": "Фамилия",
             "username": "Имя пользователя",
         }
+
+
+class TaskIdsField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        if not value:
+            return []
+        # как filters._ids(): только ASCII-цифры и только id, которые
+        # помещаются в столбец, иначе pk__in упадёт в PostgreSQL
+        _, max_id = connection.ops.integer_field_range(
+            Task._meta.pk.get_internal_type()
+        )
+        ids = []
+        for pk in value:
+            pk = str(pk).strip()
+            if not (pk.isascii() and pk.isdigit()) or not (
+                0 < int(pk) <= max_id
+            ):
+                raise forms.ValidationError("Некорректный список задач")
+            ids.append(int(pk))
+        return list(dict.fromkeys(ids))
+
+
+class TaskBulkForm(forms.Form):
+    ACTIONS = (
+        (bulk.SET_STATUS, "Сменить статус"),
+        (bulk.SET_EXECUTOR, "Назначить исполнителя"),
+        (bulk.ADD_LABELS, "Добавить метки"),
+        (bulk.REMOVE_LABELS, "Снять метки"),
+        (bulk.DELETE, "Удалить"),
+    )
+
+    tasks = TaskIdsField(label="Задачи")
+    action = forms.ChoiceField(label="Действие", choices=ACTIONS)
+    status = forms.ModelChoiceField(
+        label="Статус",
+        queryset=Status.objects.all(),
+        required=False
+    )
+    executor = forms.ModelChoiceField(
+        label="Исполнитель",
+        queryset=User.objects.all(),
+        required=False
+    )
+    labels = forms.ModelMultipleChoiceField(
+        label="Метки",
+        queryset=Label.objects.all(),
+        required=False
+    )
+
+    def clean_tasks(self):
+        tasks = self.cleaned_data["tasks"]
+        if len(tasks) > bulk.MAX_TASKS:
+            raise forms.ValidationError(
+                f"За один раз можно изменить не больше {bulk.MAX_TASKS} задач"
+            )
+        return tasks
+
+    def clean(self):
+        cleaned_data = super().clean()
+        action = cleaned_data.get("action")
+        if action == bulk.SET_STATUS and not cleaned_data.get("status"):
+            self.add_error("status", "Выберите статус")
+        if (action in (bulk.ADD_LABELS, bulk.REMOVE_LABELS)
+                and not cleaned_data.get("labels")):
+            self.add_error("labels", "Выберите метки")
+        return cleaned_data
+
+    def run(self, user):
+        """Выполняет действие; возвращает bulk.BulkResult."""
+        data = self.cleaned_data
+        tasks = data["tasks"]
+        action = data["action"]
+        if action == bulk.SET_STATUS:
+            return bulk.set_status(tasks, data["status"])
+        if action == bulk.SET_EXECUTOR:
+            return bulk.set_executor(tasks, data["executor"])
+        if action == bulk.ADD_LABELS:
+            return bulk.add_labels(tasks, data["labels"])
+        if action == bulk.REMOVE_LABELS:
+            return bulk.remove_labels(tasks, data["labels"])
+        return bulk.delete_tasks(tasks, user)
@@ -0,0 +1,209 @@
+from contextvars import ContextVar
+from functools import partial
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.db import transaction
+
+from .caching import get_reference_data
+from .models import TaskHistory
+from .pagination import KeysetPaginator
+
+
+HISTORY_KEYS = ('-created_at', '-id')
+
+# поле задачи -> (подпись, справочник для id из get_reference_data)
+FIELDS = {
+    'name': ('Name', None),
+    'description': ('Description', None),
+    'status_id': ('Status', 'statuses'),
+    'executor_id': ('Executor', 'users'),
+    'labels': ('Labels', 'labels'),
+}
+
+current_request = ContextVar('history_request', default=None)
+current_buffer = ContextVar('history_buffer', default=None)
+
+
+class HistoryBuffer:
+    """
+    Накопленные за запрос записи; пишутся одним INSERT. Транзакция,
+    зафиксированная уже после ответа, пишет свои записи сразу.
+    """
+
+    def __init__(self, size=None):
+        self.size = size or settings.HISTORY_BUFFER_SIZE
+        self.entries = []
+        self.closed = False
+
+    def extend(self, entries):
+        self.entries.extend(entries)
+        if self.closed or len(self.entries) >= self.size:
+            self.flush()
+
+    def flush(self):
+        entries, self.entries = self.entries, []
+        write(entries)
+
+    def close(self):
+        self.closed = True
+        self.flush()
+
+
+def write(entries):
+    if entries:
+        TaskHistory.objects.bulk_create(entries)
+
+
+def entry(task_id, action, field='', old='', new=''):
+    request = current_request.get()
+    user = getattr(request, 'user', None)
+    return TaskHistory(
+        task_id=task_id,
+        user_id=user.pk if user is not None else None,
+        action=action,
+        field=field,
+        old_value=_text(old),
+        new_value=_text(new),
+    )
+
+
+def record(entries, using=None):
+    """
+    Откладывает записи до фиксации транзакции, в которой сделано
+    изменение: откаченное в журнал не попадёт. В запросе записи
+    копятся в буфере HistoryMiddleware, вне запроса пишутся сразу
+    после фиксации.
+    """
+    entries = list(entries)
+    if not entries:
+        return
+    buffer = current_buffer.get()
+    if buffer is None:
+        transaction.on_commit(partial(write, entries), using=using)
+    else:
+        transaction.on_commit(partial(buffer.extend, entries), using=using)
+
+
+def field_changes(task_id, old, new):
+    """Записи по отличающимся полям двух состояний задачи."""
+    return [
+        entry(task_id, TaskHistory.CHANGED, field, old[field], new[field])
+        for field in FIELDS
+        if field in old and field in new and old[field] != new[field]
+    ]
+
+
+def label_changes(task_id, added=(), removed=()):
+    return entry(
+        task_id, TaskHistory.CHANGED, 'labels',
+        old=sorted(removed), new=sorted(added),
+    )
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple, set)):
+        return ','.join(str(item) for item in value)
+    return str(value)
+
+
+class HistoryMiddleware:
+    """
+    Собирает записи журнала за запрос и пишет их одним INSERT
+    после ответа представления — не на каждом save().
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        buffer = HistoryBuffer()
+        tokens = current_request.set(request), current_buffer.set(buffer)
+        try:
+            return self.get_response(request)
+        finally:
+            self.reset(tokens)
+            buffer.close()
+
+    async def __acall__(self, request):
+        buffer = HistoryBuffer()
+        tokens = current_request.set(request), current_buffer.set(buffer)
+        try:
+            return await self.get_response(request)
+        finally:
+            self.reset(tokens)
+            buffer.closed = True
+            if buffer.entries:
+                await sync_to_async(buffer.flush)()
+
+    @staticmethod
+    def reset(tokens):
+        request_token, buffer_token = tokens
+        current_buffer.reset(buffer_token)
+        current_request.reset(request_token)
+
+
+def history_paginator():
+    return KeysetPaginator(HISTORY_KEYS, settings.HISTORY_PER_PAGE)
+
+
+def history_queryset(task_id):
+    return TaskHistory.objects.filter(task_id=task_id).select_related('user')
+
+
+def history_page(task_id, cursor=None):
+    page = history_paginator().paginate(history_queryset(task_id), cursor)
+    describe(page.object_list)
+    return page
+
+
+async def ahistory_page(task_id, cursor=None):
+    page = await history_paginator().apaginate(
+        history_queryset(task_id), cursor
+    )
+    await sync_to_async(describe)(page.object_list)
+    return page
+
+
+def describe(entries):
+    """
+    Подписи и значения для шаблона. id статусов, исполнителей и меток
+    переводятся в названия по кэшированным справочникам — только если
+    на странице есть такие записи.
+    """
+    kinds = {FIELDS[e.field][1] for e in entries if e.field in FIELDS}
+    kinds.discard(None)
+    names = {}
+    if kinds:
+        names = {
+            kind: dict(rows)
+            for kind, rows in get_reference_data().items()
+            if kind in kinds
+        }
+    for e in entries:
+        label, kind = FIELDS.get(e.field, (e.field, None))
+        e.field_label = label
+        e.old_display = _display(e.old_value, names.get(kind))
+        e.new_display = _display(e.new_value, names.get(kind))
+    return entries
+
+
+def _display(value, names):
+    if names is None or not value:
+        return value
+    return ', '.join(
+        names.get(int(pk), f'#{pk}') for pk in value.split(',')
+    )
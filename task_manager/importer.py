@@ -0,0 +1,220 @@
+import csv
+import json
+import time
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import conditional, counters
+from .models import Label, Status, Task
+from .search import get_search_backend
+
+
+DEFAULT_BATCH_SIZE = 5000
+DEFAULT_TRANSACTION_SIZE = 50000
+
+
+class ImportRowError(Exception):
+    pass
+
+
+def read_csv(stream):
+    for row in csv.DictReader(stream):
+        labels = row.get('labels') or ''
+        row['labels'] = [name.strip() for name in labels.split(',')]
+        yield row
+
+
+def read_ndjson(stream):
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as error:
+            # битая строка пропускается, как и другие неверные строки,
+            # а не обрывает импорт посреди файла
+            yield ImportRowError(f'некорректный JSON: {error}')
+
+
+def text_field(row, field):
+    """Строковое поле строки импорта; пустое — ''."""
+    value = row.get(field)
+    if value is None:
+        return ''
+    if not isinstance(value, str):
+        raise ImportRowError(f'поле {field!r} должно быть строкой')
+    return value
+
+
+def parse_date(value):
+    # parse_datetime возвращает None для чужого формата, но падает
+    # с ValueError на несуществующей дате вроде 2024-13-45
+    try:
+        created_at = parse_datetime(value)
+    except ValueError:
+        created_at = None
+    if created_at is None:
+        raise ImportRowError(f'некорректная дата {value!r}')
+    return created_at
+
+
+READERS = {
+    'csv': read_csv,
+    'ndjson': read_ndjson,
+}
+
+
+class TaskImporter:
+    """
+    Массовая загрузка задач в обход форм и сигналов.
+
+    Названия статусов, пользователей и меток один раз загружаются
+    в словари и дальше превращаются в id без запросов к базе. Задачи
+    вставляются через bulk_create порциями по batch_size, строки
+    промежуточной таблицы меток — тоже bulk_create, а каждые
+    transaction_size задач фиксируются отдельной транзакцией.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE,
+                 transaction_size=DEFAULT_TRANSACTION_SIZE,
+                 create_missing=False, progress=None):
+        self.batch_size = batch_size
+        self.transaction_size = max(transaction_size, batch_size)
+        self.create_missing = create_missing
+        self.progress = progress
+        self.imported = 0
+        self.skipped = []
+
+        self.statuses = dict(Status.objects.values_list('name', 'id'))
+        self.users = dict(User.objects.values_list('username', 'id'))
+        self.labels = dict(Label.objects.values_list('name', 'id'))
+        self.now = timezone.now()
+
+    def run(self, rows):
+        started = time.monotonic()
+        rows = enumerate(rows, start=1)
+        while True:
+            chunk = list(islice(rows, self.transaction_size))
+            if not chunk:
+                break
+            tasks, label_ids = [], []
+            with transaction.atomic():
+                for start in range(0, len(chunk), self.batch_size):
+                    self.import_batch(
+                        chunk[start:start + self.batch_size],
+                        tasks, label_ids,
+                    )
+                self.update_derived(tasks, label_ids)
+            self.imported += len(tasks)
+            if self.progress:
+                elapsed = time.monotonic() - started
+                self.progress(self.imported, len(self.skipped), elapsed)
+
+        if self.imported:
+            # кэши сбрасываются один раз на весь импорт, как в bulk.py
+            conditional.bump_tables([conditional.TASK])
+        return self.imported
+
+    def import_batch(self, numbered_rows, tasks, label_ids):
+        batch = []
+        task_labels = []
+        for line, row in numbered_rows:
+            try:
+                task, labels = self.build_task(row)
+            except ImportRowError as error:
+                self.skipped.append((line, str(error)))
+                continue
+            batch.append(task)
+            task_labels.append(labels)
+
+        Task.objects.bulk_create(batch, batch_size=self.batch_size)
+
+        Through = Task.labels.through
+        links = [
+            Through(task_id=task.pk, label_id=label_id)
+            for task, labels in zip(batch, task_labels)
+            for label_id in labels
+        ]
+        Through.objects.bulk_create(links, batch_size=self.batch_size)
+        tasks.extend(batch)
+        label_ids.extend(link.label_id for link in links)
+
+    def update_derived(self, tasks, label_ids):
+        """
+        bulk_create не отправляет post_save: счётчики и поиск
+        обновляются сами, один раз на транзакцию, а не на пачку.
+        """
+        if not tasks:
+            return
+        counters.add_tasks(tasks, label_ids)
+        # задачи транзакции идут подряд; чужие в диапазоне
+        # переиндексируются зря, но без вреда
+        get_search_backend().update_tasks(Task.objects.filter(
+            pk__range=(
+                min(task.pk for task in tasks),
+                max(task.pk for task in tasks),
+            )
+        ))
+
+    def build_task(self, row):
+        if isinstance(row, ImportRowError):
+            raise row
+        if not isinstance(row, dict):
+            raise ImportRowError('строка должна быть объектом JSON')
+        name = text_field(row, 'name').strip()
+        if not name:
+            raise ImportRowError('не указано название задачи')
+
+        executor = text_field(row, 'executor').strip()
+        created_at = self.now
+        if row.get('created_at'):
+            created_at = parse_date(text_field(row, 'created_at'))
+            if timezone.is_naive(created_at):
+                created_at = timezone.make_aware(created_at)
+
+        task = Task(
+            name=name,
+            description=text_field(row, 'description'),
+            status_id=self.resolve_status(text_field(row, 'status')),
+            author_id=self.resolve_user(text_field(row, 'author')),
+            executor_id=self.resolve_user(executor) if executor else None,
+            created_at=created_at,
+        )
+        labels = row.get('labels') or []
+        if isinstance(labels, str):
+            labels = labels.split(',')
+        if not isinstance(labels, list) or not all(
+            isinstance(label, str) for label in labels
+        ):
+            raise ImportRowError('метки должны быть списком строк')
+        label_ids = {
+            self.resolve_label(label.strip())
+            for label in labels if label.strip()
+        }
+        return task, label_ids
+
+    def resolve_status(self, name):
+        name = (name or '').strip()
+        if name not in self.statuses:
+            if not name or not self.create_missing:
+                raise ImportRowError(f'неизвестный статус {name!r}')
+            self.statuses[name] = Status.objects.create(name=name).pk
+        return self.statuses[name]
+
+    def resolve_label(self, name):
+        if name not in self.labels:
+            if not self.create_missing:
+                raise ImportRowError(f'неизвестная метка {name!r}')
+            self.labels[name] = Label.objects.create(name=name).pk
+        return self.labels[name]
+
+    def resolve_user(self, username):
+        username = (username or '').strip()
+        if username not in self.users:
+            raise ImportRowError(f'неизвестный пользователь {username!r}')
+        return self.users[username]
@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .caching import get_reference_data
+from .conditional import STATUS, TASK, get_table_versions
+from .models import Task
+
+
+INBOX = 'inbox'
+# от каких таблиц зависит страница (conditional.py)
+TABLES = (TASK, STATUS)
+
+TASK_FIELDS = ('id', 'name', 'status_id', 'author_id', 'executor_id',
+               'created_at')
+
+
+def get_inbox(user, versions=None):
+    """
+    Разделы страницы «Мои задачи» из кэша. Ключ содержит версии
+    таблиц задач и статусов из базы (conditional.py): их видят все
+    воркеры, так что запись в одном процессе не оставляет в кэше
+    других устаревшую страницу. versions — уже прочитанные версии
+    (ConditionalPageMixin), чтобы не читать их второй раз.
+    """
+    if settings.INBOX_CACHE_TIMEOUT <= 0:
+        return build_inbox(user)
+    if versions is None:
+        versions = get_table_versions(TABLES)
+    key = ':'.join(
+        [INBOX, str(user.pk)]
+        + [str(versions[table].version) for table in TABLES]
+    )
+    sections = cache.get(key)
+    if sections is None:
+        sections = build_inbox(user)
+        cache.set(key, sections, timeout=settings.INBOX_CACHE_TIMEOUT)
+    return sections
+
+
+def build_inbox(user, per_status=None):
+    """
+    Задачи, где пользователь автор или исполнитель, по статусам:
+    счётчик и несколько последних задач в каждом.
+
+    Условие «автор ИЛИ исполнитель» не ложится ни на один индекс,
+    поэтому каждая сторона читается отдельно по своему индексу
+    (executor|author, status, -created_at, id): счётчики — GROUP BY
+    по диапазону индекса, задачи — короткий проход с LIMIT в пределах
+    статуса, без сортировки всех задач пользователя. Готовый результат
+    кэшируется в get_inbox().
+    """
+    per_status = per_status or settings.INBOX_TASKS_PER_STATUS
+    assigned = _counts(Task.objects.filter(executor=user))
+    # свои задачи, назначенные себе же, уже посчитаны как назначенные
+    authored = _counts(
+        Task.objects.filter(author=user).exclude(executor=user)
+    )
+    sections = []
+    for status_id, status_name in get_reference_data()['statuses']:
+        count = assigned.get(status_id, 0) + authored.get(status_id, 0)
+        if not count:
+            continue
+        tasks = {}
+        for field, counts in (('executor', assigned), ('author', authored)):
+            if counts.get(status_id):
+                latest = (
+                    Task.objects.filter(**{field: user, 'status': status_id})
+                    .order_by('-created_at', 'id')
+                    .values(*TASK_FIELDS)[:per_status]
+                )
+                tasks.update((task['id'], task) for task in latest)
+        sections.append({
+            'status_id': status_id,
+            'status_name': status_name,
+            'count': count,
+            'tasks': _latest(tasks.values())[:per_status],
+        })
+    return sections
+
+
+def _latest(tasks):
+    # тот же порядок, что и в списке задач: (-created_at, id)
+    tasks = sorted(tasks, key=lambda task: task['id'])
+    return sorted(tasks, key=lambda task: task['created_at'], reverse=True)
+
+
+def _counts(queryset):
+    return dict(
+        queryset.order_by().values_list('status_id')
+        .annotate(count=Count('id'))
+    )
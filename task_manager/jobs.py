@@ -0,0 +1,255 @@
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+
+logger = logging.getLogger('task_manager.jobs')
+
+# имя задания -> (функция, число попыток)
+_handlers = {}
+
+
+def job(name, max_attempts=None):
+    """
+    Регистрирует функцию как задание. Функция получает payload
+    именованными аргументами, поэтому в него кладут только то, что
+    сериализуется в JSON: id, а не объекты.
+    """
+    def register(func):
+        _handlers[name] = (func, max_attempts or settings.JOB_MAX_ATTEMPTS)
+        return func
+    return register
+
+
+def enqueue(name, payload=None, delay=0, using=None):
+    """
+    Ставит задание в очередь в текущей транзакции: воркеры увидят его
+    только после фиксации, а при откате его не будет вовсе.
+    """
+    _, max_attempts = _handler(name)
+    return Job.objects.using(using).create(
+        name=name,
+        payload=payload or {},
+        max_attempts=max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def enqueue_on_commit(name, payload=None, delay=0, using=None):
+    """
+    Ставит задание после фиксации транзакции — для представлений:
+    INSERT в очередь не удлиняет транзакцию с самим изменением.
+    """
+    _handler(name)
+    transaction.on_commit(
+        partial(enqueue, name, payload, delay, using), using=using
+    )
+
+
+def _handler(name):
+    try:
+        return _handlers[name]
+    except KeyError:
+        raise LookupError(f'Неизвестное задание: {name}') from None
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+
+
+def claim(worker, limit=1, using=None):
+    """
+    Забирает до limit заданий, срок которых подошёл, и помечает их
+    выполняемыми. На PostgreSQL строки выбираются через
+    SELECT ... FOR UPDATE SKIP LOCKED: воркеры не ждут друг друга
+    и не берут одно задание дважды. SQLite блокирует базу целиком,
+    поэтому там задание захватывает условный UPDATE ... WHERE
+    status = 'queued', и побеждает тот, у кого он изменил строку.
+    """
+    connection = connections[using or 'default']
+    if connection.features.has_select_for_update_skip_locked:
+        return _claim_skip_locked(worker, limit, connection.alias)
+    return _claim_optimistic(worker, limit, connection.alias)
+
+
+def _due(using):
+    return Job.objects.using(using).filter(
+        status=Job.QUEUED, run_at__lte=timezone.now()
+    ).order_by('run_at', 'id')
+
+
+def _claim_skip_locked(worker, limit, using):
+    with transaction.atomic(using=using):
+        jobs = list(
+            _due(using).select_for_update(skip_locked=True)[:limit]
+        )
+        now = timezone.now()
+        Job.objects.using(using).filter(pk__in=[j.pk for j in jobs]).update(
+            status=Job.RUNNING, locked_by=worker, locked_at=now
+        )
+    for claimed in jobs:
+        claimed.status, claimed.locked_by = Job.RUNNING, worker
+        claimed.locked_at = now
+    return jobs
+
+
+def _claim_optimistic(worker, limit, using):
+    claimed = []
+    for candidate in _due(using)[:limit]:
+        now = timezone.now()
+        taken = Job.objects.using(using).filter(
+            pk=candidate.pk, status=Job.QUEUED
+        ).update(status=Job.RUNNING, locked_by=worker, locked_at=now)
+        if taken:
+            candidate.status, candidate.locked_by = Job.RUNNING, worker
+            candidate.locked_at = now
+            claimed.append(candidate)
+    return claimed
+
+
+def backoff(attempts):
+    """Пауза перед следующей попыткой: 2^n * JOB_BACKOFF_SECONDS."""
+    return min(
+        settings.JOB_BACKOFF_SECONDS * 2 ** (attempts - 1),
+        settings.JOB_BACKOFF_MAX_SECONDS,
+    )
+
+
+def execute(claimed, using=None):
+    """Выполняет захваченное задание и записывает исход."""
+    claimed.attempts += 1
+    started = time.perf_counter()
+    try:
+        func, _ = _handler(claimed.name)
+        func(**claimed.payload)
+    except Exception:
+        error = traceback.format_exc()
+        if claimed.attempts >= claimed.max_attempts:
+            logger.error('Задание %s провалено:\n%s', claimed, error)
+            claimed.status = Job.FAILED
+            _finish(
+                claimed, using,
+                status=Job.FAILED, attempts=claimed.attempts,
+                last_error=error, finished_at=timezone.now(),
+            )
+        else:
+            logger.warning('Задание %s будет повторено:\n%s', claimed, error)
+            claimed.status = Job.QUEUED
+            _finish(
+                claimed, using,
+                status=Job.QUEUED, attempts=claimed.attempts,
+                last_error=error, locked_by='', locked_at=None,
+                run_at=timezone.now() + timedelta(
+                    seconds=backoff(claimed.attempts)
+                ),
+            )
+    else:
+        claimed.status = Job.DONE
+        _finish(
+            claimed, using,
+            status=Job.DONE, attempts=claimed.attempts,
+            finished_at=timezone.now(),
+        )
+    logger.info(
+        'Задание %s: %s за %.3f с', claimed, claimed.status,
+        time.perf_counter() - started,
+    )
+    return claimed
+
+
+def _finish(claimed, using, **fields):
+    # пока задание выполнялось, requeue_stale() мог счесть воркер
+    # пропавшим и вернуть задание в очередь, а другой воркер — его
+    # захватить: тогда строка уже не наша и исход не записывается
+    updated = Job.objects.using(using).filter(
+        pk=claimed.pk, status=Job.RUNNING, locked_by=claimed.locked_by
+    ).update(**fields)
+    if not updated:
+        logger.warning(
+            'Задание %s отобрано у воркера %s, исход %s не записан',
+            claimed, claimed.locked_by, fields['status'],
+        )
+
+
+def requeue_stale(using=None):
+    """
+    Возвращает в очередь задания, чей воркер пропал (упал, убит)
+    и не отчитался дольше JOB_LOCK_TIMEOUT. Такой запуск считается
+    попыткой: задание, которое каждый раз роняет воркер, после
+    max_attempts помечается проваленным, а не крутится вечно.
+    """
+    now = timezone.now()
+    deadline = now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    stale = Job.objects.using(using).filter(
+        status=Job.RUNNING, locked_at__lt=deadline
+    )
+    error = 'Воркер не отчитался о задании за JOB_LOCK_TIMEOUT'
+    failed = stale.filter(attempts__gte=F('max_attempts') - 1).update(
+        status=Job.FAILED, attempts=F('attempts') + 1, last_error=error,
+        locked_by='', locked_at=None, finished_at=now,
+    )
+    if failed:
+        logger.error('Заданий провалено из-за пропавших воркеров: %s', failed)
+    return stale.update(
+        status=Job.QUEUED, attempts=F('attempts') + 1, last_error=error,
+        locked_by='', locked_at=None,
+    )
+
+
+def run_pending(worker=None, using=None):
+    """Выполняет все подошедшие задания в текущем потоке (тесты, cron)."""
+    worker = worker or worker_name()
+    done = 0
+    while True:
+        claimed = claim(worker, using=using)
+        if not claimed:
+            return done
+        for pending in claimed:
+            execute(pending, using)
+            done += 1
+
+
+def work(once=False, stop=None, batch=None, poll_interval=None,
+         using=None):
+    """
+    Цикл воркера: забрать пачку, выполнить, при пустой очереди
+    подождать poll_interval. С once=True выходит, как только
+    очередь пуста. Возвращает число выполненных заданий.
+    """
+    batch = batch or settings.JOB_BATCH_SIZE
+    poll_interval = (
+        settings.JOB_POLL_INTERVAL if poll_interval is None
+        else poll_interval
+    )
+    stop = threading.Event() if stop is None else stop
+    worker = worker_name()
+    done = 0
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            claimed = claim(worker, batch, using)
+            for pending in claimed:
+                execute(pending, using)
+            done += len(claimed)
+            if not claimed:
+                if once:
+                    break
+                requeue_stale(using)
+                stop.wait(poll_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        connections.close_all()
+    return done
@@ -0,0 +1,45 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.benchmarks import (
+    BENCH_PASSWORD,
+    bench_session_flow,
+    bench_username,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет вход -> /tasks/ -> выход с разными хранилищами сессий '
+        'и флеш-сообщений (SESSION_BACKEND, MESSAGE_STORAGE): запросы '
+        'к БД, из них записи, и время на запрос.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=20)
+        parser.add_argument('--username', default=bench_username(0))
+        parser.add_argument('--password', default=BENCH_PASSWORD)
+
+    def handle(self, *args, **options):
+        if not User.objects.filter(username=options['username']).exists():
+            raise CommandError(
+                f'Нет пользователя {options["username"]}; '
+                'запустите generate_bench_data'
+            )
+        try:
+            results = bench_session_flow(
+                options['username'], options['password'],
+                rounds=options['rounds'],
+            )
+        except RuntimeError as error:
+            raise CommandError(str(error))
+
+        self.stdout.write(
+            f'{"сессии + сообщения":<28}{"запросов":>10}'
+            f'{"записей":>10}{"мс":>10}'
+        )
+        for name, stats in results.items():
+            self.stdout.write(
+                f'{name:<28}{stats["queries"]:>10}'
+                f'{stats["writes"]:>10}{stats["mean_ms"]:>10}'
+            )
@@ -0,0 +1,42 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.benchmarks import bench_templates, bench_username
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время загрузки и рендера каждого шаблона из '
+        'templates/task_manager/ без кэша загрузчика (как с '
+        'TEMPLATE_AUTORELOAD) и с кэширующим загрузчиком.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeats', type=int, default=20)
+        parser.add_argument('--username', default=bench_username(0))
+        parser.add_argument(
+            '--template', action='append', dest='templates',
+            help='Имя шаблона (можно несколько); по умолчанию все.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(
+                f'Нет пользователя {options["username"]}; '
+                'запустите generate_bench_data'
+            )
+
+        results = bench_templates(
+            user, repeats=options['repeats'], names=options['templates']
+        )
+        self.stdout.write(
+            f'{"шаблон":<42}{"без кэша":>10}{"с кэшем":>10}{"x":>7}'
+        )
+        for name, stats in results.items():
+            speedup = stats['uncached_ms'] / max(stats['cached_ms'], 0.001)
+            self.stdout.write(
+                f'{name:<42}{stats["uncached_ms"]:>10}'
+                f'{stats["cached_ms"]:>10}{speedup:>7.1f}'
+            )
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from task_manager.sessions import clear_expired_sessions, stores_sessions_in_db
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет просроченные сессии из django_session пачками, '
+        'не блокируя таблицу надолго. Запускать по расписанию (cron) '
+        'при SESSION_BACKEND=db или cached_db.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько сессий удалять одним DELETE.',
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0.0,
+            help='Пауза между пачками, с.',
+        )
+
+    def handle(self, *args, **options):
+        if not stores_sessions_in_db():
+            self.stdout.write(
+                f'Сессии хранятся не в БД ({settings.SESSION_ENGINE}), '
+                'удалять нечего'
+            )
+            return
+        deleted = clear_expired_sessions(
+            batch_size=max(1, options['batch_size']),
+            pause=options['pause'],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Удалено сессий: {deleted}')
+        )
@@ -0,0 +1,76 @@
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.benchmarks import load_report
+
+
+# ASGI сравнивается с асинхронными представлениями, WSGI — с обычными
+INTERFACES = (('wsgi', 'False'), ('asgi', 'True'))
+SCENARIOS = ('task_list', 'task_list_status', 'task_detail')
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность синхронного WSGI и '
+        'асинхронного ASGI под параллельными клиентами. Каждый вариант '
+        'запускается отдельным процессом run_benchmarks: набор '
+        'представлений выбирается при загрузке urls.py.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios',
+            help='Сценарий (можно несколько); по умолчанию список '
+                 'и карточка задачи.',
+        )
+
+    def handle(self, *args, **options):
+        reports = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for interface, async_views in INTERFACES:
+                path = Path(directory) / f'{interface}.json'
+                self.run(interface, async_views, path, options)
+                reports[interface] = load_report(path)['scenarios']
+
+        self.stdout.write(
+            f'\n{"сценарий":<22}{"WSGI rps":>10}{"ASGI rps":>10}'
+            f'{"WSGI p95":>10}{"ASGI p95":>10}'
+        )
+        for name in reports['wsgi']:
+            wsgi, asgi = reports['wsgi'][name], reports['asgi'][name]
+            self.stdout.write(
+                f'{name:<22}{wsgi["rps"]:>10}{asgi["rps"]:>10}'
+                f'{wsgi["p95_ms"]:>10}{asgi["p95_ms"]:>10}'
+            )
+
+    def run(self, interface, async_views, path, options):
+        command = [
+            sys.executable, 'manage.py', 'run_benchmarks',
+            '--interface', interface,
+            '--concurrency', str(options['concurrency']),
+            '--requests', str(options['requests']),
+            '--save', str(path),
+        ]
+        for name in options['scenarios'] or SCENARIOS:
+            command += ['--scenario', name]
+
+        self.stdout.write(f'\n{interface.upper()}')
+        result = subprocess.run(
+            command,
+            cwd=settings.BASE_DIR,
+            env={**os.environ, 'ASYNC_VIEWS': async_views},
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        self.stdout.write(result.stdout.rstrip())
+        if result.returncode:
+            raise CommandError(result.stderr.strip() or 'run_benchmarks упал')
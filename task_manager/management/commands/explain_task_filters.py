@@ -0,0 +1,97 @@
+from itertools import combinations
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import QueryDict
+
+from task_manager.filters import TaskFilter
+from task_manager.models import Label, Status, Task
+from task_manager.views import TaskListView
+
+
+FILTERS = ('status', 'executor', 'only_my', 'labels')
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает EXPLAIN для каждой комбинации фильтров списка задач '
+        'и сообщает о полных сканированиях таблицы и сортировках.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--show-plans',
+            action='store_true',
+            help='Печатать план запроса целиком.',
+        )
+        parser.add_argument(
+            '--fail-on-warnings',
+            action='store_true',
+            help='Завершаться с ошибкой, если найден хотя бы один проблемный '
+                 'план (для CI).',
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.order_by('id').first() or User(pk=1)
+        sample = {
+            'status': _first_id(Status),
+            'executor': user.pk,
+            'only_my': 'on',
+            'labels': _first_id(Label),
+        }
+
+        problems = 0
+        for size in range(len(FILTERS) + 1):
+            for names in combinations(FILTERS, size):
+                params = QueryDict(mutable=True)
+                for name in names:
+                    params[name] = sample[name]
+
+                plan = self.explain(params, user)
+                issues = find_plan_issues(plan, connection.vendor)
+                label = ', '.join(names) or 'без фильтров'
+
+                if issues:
+                    problems += 1
+                    self.stdout.write(self.style.WARNING(
+                        f'{label}: {"; ".join(issues)}'
+                    ))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'{label}: OK'))
+                if options['show_plans']:
+                    self.stdout.write(plan)
+
+        if problems and options['fail_on_warnings']:
+            raise CommandError(
+                f'Проблемных планов запросов: {problems}'
+            )
+
+    def explain(self, params, user):
+        task_filter = TaskFilter(params, user)
+        queryset = task_filter.apply(Task.objects.all())
+        queryset = queryset.order_by(*task_filter.ordering_keys)
+        return queryset[:TaskListView.paginate_by + 1].explain()
+
+
+def find_plan_issues(plan, vendor):
+    issues = []
+    if vendor == 'postgresql':
+        if 'Seq Scan on task_manager_task ' in plan:
+            issues.append('последовательное сканирование task_manager_task')
+        if 'Sort' in plan and 'Incremental Sort' not in plan:
+            issues.append('сортировка результата')
+    else:
+        for line in plan.splitlines():
+            _, found, table = line.partition('SCAN ')
+            if found and 'INDEX' not in table:
+                issues.append(f'полный обход {table.strip()}')
+        if 'TEMP B-TREE' in plan:
+            issues.append('сортировка через временное B-дерево')
+    return issues
+
+
+def _first_id(model):
+    return model.objects.order_by('id').values_list(
+        'id', flat=True
+    ).first() or 1
@@ -0,0 +1,83 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from task_manager.export import (
+    DEFAULT_CHUNK_SIZE,
+    FORMATS,
+    export_queryset,
+    iter_task_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает задачи в CSV или NDJSON потоком, не загружая '
+        'таблицу в память. Фильтры те же, что и у списка задач.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=sorted(FORMATS), default='csv',
+        )
+        parser.add_argument(
+            '--output', '-o',
+            help='Файл для выгрузки (по умолчанию stdout).',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Сколько задач читать из базы за раз.',
+        )
+        parser.add_argument('--status', action='append', default=[])
+        parser.add_argument('--executor', action='append', default=[])
+        parser.add_argument(
+            '--label', action='append', default=[], dest='labels',
+        )
+        parser.add_argument(
+            '--labels-mode', choices=('any', 'all'), default='any',
+        )
+        parser.add_argument('--created-after')
+        parser.add_argument('--created-before')
+        parser.add_argument('--q', help='Полнотекстовый поиск.')
+        parser.add_argument(
+            '--author',
+            help='Только задачи этого автора (как «Только мои задачи»).',
+        )
+
+    def handle(self, *args, **options):
+        params, user = self.build_filters(options)
+        serialize, _ = FORMATS[options['format']]
+        rows = iter_task_rows(
+            export_queryset(params, user),
+            chunk_size=options['chunk_size'],
+        )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as output:
+                for chunk in serialize(rows):
+                    output.write(chunk)
+        else:
+            for chunk in serialize(rows):
+                self.stdout.write(chunk, ending='')
+
+    def build_filters(self, options):
+        params = QueryDict(mutable=True)
+        params.setlist('status', options['status'])
+        params.setlist('executor', options['executor'])
+        params.setlist('labels', options['labels'])
+        params['labels_mode'] = options['labels_mode']
+        for name in ('created_after', 'created_before', 'q'):
+            if options[name]:
+                params[name] = options[name]
+
+        user = None
+        if options['author']:
+            try:
+                user = User.objects.get(username=options['author'])
+            except User.DoesNotExist:
+                raise CommandError(
+                    f'Пользователь {options["author"]} не найден'
+                )
+            params['only_my'] = 'on'
+        return params, user
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from task_manager.benchmarks import clear_data, generate_data
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетических пользователей, статусы, метки и задачи '
+        'для run_benchmarks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--statuses', type=int, default=5)
+        parser.add_argument('--labels', type=int, default=20)
+        parser.add_argument('--tasks', type=int, default=1000)
+        parser.add_argument(
+            '--labels-per-task', type=int, default=2,
+            help='Сколько меток у каждой задачи.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Сначала удалить данные, созданные раньше.',
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            clear_data()
+        imported = generate_data(
+            users=options['users'],
+            statuses=options['statuses'],
+            labels=options['labels'],
+            tasks=options['tasks'],
+            labels_per_task=options['labels_per_task'],
+            seed=options['seed'],
+            progress=self.report_progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано задач: {imported}'
+        ))
+
+    def report_progress(self, imported, skipped, elapsed):
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(f'{imported} задач ({rate:.0f} задач/с)')
@@ -0,0 +1,75 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.importer import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_TRANSACTION_SIZE,
+    READERS,
+    TaskImporter,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает задачи из CSV или NDJSON (формат export_tasks) '
+        'пакетными INSERT без форм и сигналов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с задачами.')
+        parser.add_argument(
+            '--format', choices=sorted(READERS),
+            help='Формат файла; по умолчанию — по расширению.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Сколько задач вставлять одним bulk_create.',
+        )
+        parser.add_argument(
+            '--transaction-size', type=int,
+            default=DEFAULT_TRANSACTION_SIZE,
+            help='Сколько задач фиксировать одной транзакцией.',
+        )
+        parser.add_argument(
+            '--create-missing', action='store_true',
+            help='Создавать отсутствующие статусы и метки.',
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        file_format = options['format'] or path.suffix.lstrip('.').lower()
+        if file_format not in READERS:
+            raise CommandError(
+                f'Не удалось определить формат файла {path.name}, '
+                'укажите --format'
+            )
+        if not path.exists():
+            raise CommandError(f'Файл {path} не найден')
+
+        importer = TaskImporter(
+            batch_size=options['batch_size'],
+            transaction_size=options['transaction_size'],
+            create_missing=options['create_missing'],
+            progress=self.report_progress,
+        )
+        with path.open(encoding='utf-8', newline='') as stream:
+            importer.run(READERS[file_format](stream))
+
+        for line, error in importer.skipped[:20]:
+            self.stderr.write(f'Строка {line}: {error}')
+        if len(importer.skipped) > 20:
+            self.stderr.write(
+                f'... и ещё {len(importer.skipped) - 20} ошибок'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено задач: {importer.imported}, '
+            f'пропущено: {len(importer.skipped)}'
+        ))
+
+    def report_progress(self, imported, skipped, elapsed):
+        rate = imported / elapsed if elapsed else 0
+        self.stdout.write(
+            f'{imported} задач загружено, {skipped} пропущено '
+            f'({rate:.0f} задач/с)'
+        )
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.startup import (
+    DEFERRED_MODULES,
+    STARTUP_BUDGET_SECONDS,
+    by_package,
+    measure_startup,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает, сколько времени уходит на импорт WSGI-приложения '
+        '(по данным python -X importtime) и на первый ответ.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default='task_manager.wsgi')
+        parser.add_argument(
+            '--path', default='/login/',
+            help='Адрес первого запроса.',
+        )
+        parser.add_argument(
+            '--top', type=int, default=20,
+            help='Сколько самых дорогих модулей показать.',
+        )
+        parser.add_argument(
+            '--sort', choices=('self', 'cumulative'), default='cumulative',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            report = measure_startup(
+                options['module'], options['path'], importtime=True
+            )
+        except RuntimeError as error:
+            raise CommandError(f'Приложение не запустилось: {error}')
+
+        key = f'{options["sort"]}_ms'
+        imports = sorted(report['imports'], key=lambda item: -item[key])
+        self.stdout.write(f'{"self, мс":>10}{"всего, мс":>11}  модуль')
+        for item in imports[:options['top']]:
+            self.stdout.write(
+                f'{item["self_ms"]:>10.1f}{item["cumulative_ms"]:>11.1f}  '
+                f'{item["module"]}'
+            )
+
+        self.stdout.write('\nПо пакетам (собственное время):')
+        for package, total in by_package(report['imports'])[:10]:
+            self.stdout.write(f'{total:>10.1f}  {package}')
+
+        loaded = [
+            name for name in DEFERRED_MODULES if name in report['modules']
+        ]
+        if loaded:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'\nЗагружены при старте: {", ".join(loaded)}'
+                )
+            )
+
+        first_response = report['first_response_seconds']
+        style = (
+            self.style.SUCCESS if first_response <= STARTUP_BUDGET_SECONDS
+            else self.style.ERROR
+        )
+        self.stdout.write(
+            f'\nИмпорт {options["module"]}: '
+            f'{report["import_seconds"] * 1000:.0f} мс'
+        )
+        self.stdout.write(style(
+            f'Первый ответ ({report["status"]}): '
+            f'{first_response * 1000:.0f} мс '
+            f'(цель {STARTUP_BUDGET_SECONDS * 1000:.0f} мс)'
+        ))
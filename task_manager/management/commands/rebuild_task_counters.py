@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from task_manager.counters import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счётчики задач по статусам и пользователям '
+        'по таблице задач. Нужен после правок в обход save(), '
+        'например QuerySet.update() или SQL вручную.'
+    )
+
+    def handle(self, *args, **options):
+        fixed = rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено счётчиков: {fixed}')
+        )
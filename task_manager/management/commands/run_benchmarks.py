@@ -0,0 +1,141 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.benchmarks import (
+    BENCH_PASSWORD,
+    SCENARIOS,
+    AsyncInProcessClient,
+    BenchContext,
+    HttpClient,
+    InProcessClient,
+    bench_username,
+    build_report,
+    compare,
+    load_report,
+    run_benchmarks,
+    save_report,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку (p50/p95/p99), пропускную способность и число '
+        'запросов к БД на основных страницах. Без --url запросы идут '
+        'через тестовый клиент в этом же процессе (WSGI- или '
+        'ASGI-обработчик, --interface), с --url — по HTTP к запущенному '
+        'серверу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios',
+            choices=sorted(SCENARIOS),
+            help='Сценарий (можно несколько); по умолчанию все.',
+        )
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument(
+            '--url', help='Адрес сервера, например http://127.0.0.1:8000',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=1,
+            help='Число параллельных клиентов.',
+        )
+        parser.add_argument(
+            '--interface', choices=('wsgi', 'asgi'), default='wsgi',
+            help='Обработчик Django для замеров в процессе.',
+        )
+        parser.add_argument('--username', default=bench_username(0))
+        parser.add_argument('--password', default=BENCH_PASSWORD)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--save', help='Сохранить отчёт в JSON (базовый замер).',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='Сравнить с сохранённым отчётом и завершиться с ошибкой '
+                 'при регрессии.',
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=0.2,
+            help='Допустимый рост p95 относительно базового замера.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            context = BenchContext(options['username'], seed=options['seed'])
+        except Exception as error:
+            raise CommandError(
+                f'Нет данных для замеров ({error}); '
+                'запустите generate_bench_data'
+            )
+
+        clients = self.make_clients(context, options)
+        self.stdout.write(
+            f'{"сценарий":<22}{"p50":>9}{"p95":>9}{"p99":>9}'
+            f'{"rps":>8}{"SQL":>6}{"ошибки":>8}'
+        )
+        results = run_benchmarks(
+            clients,
+            context,
+            scenarios=options['scenarios'],
+            requests=options['requests'],
+            warmup=options['warmup'],
+            progress=self.report,
+        )
+        report = build_report(
+            results,
+            mode='http' if options['url'] else 'in-process',
+            interface=None if options['url'] else options['interface'],
+            async_views=settings.ASYNC_VIEWS,
+            url=options['url'],
+            concurrency=options['concurrency'],
+            requests=options['requests'],
+        )
+
+        if options['save']:
+            save_report(report, options['save'])
+            self.stdout.write(f'Отчёт сохранён в {options["save"]}')
+
+        if options['baseline']:
+            regressions = compare(
+                report,
+                load_report(options['baseline']),
+                threshold=options['threshold'],
+            )
+            if regressions:
+                raise CommandError(
+                    'Регрессии относительно базового замера:\n'
+                    + '\n'.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('Регрессий нет'))
+
+    def make_clients(self, context, options):
+        if not options['url']:
+            # WSGI-клиенты работают в пуле потоков, ASGI — корутинами
+            # в одном цикле событий
+            client_class = (
+                AsyncInProcessClient if options['interface'] == 'asgi'
+                else InProcessClient
+            )
+            return [
+                client_class(context.user)
+                for _ in range(options['concurrency'])
+            ]
+        try:
+            return [
+                HttpClient(
+                    options['url'], options['username'], options['password']
+                )
+                for _ in range(options['concurrency'])
+            ]
+        except RuntimeError as error:
+            raise CommandError(str(error))
+
+    def report(self, name, stats):
+        queries = '-' if stats['queries'] is None else stats['queries']
+        self.stdout.write(
+            f'{name:<22}{stats["p50_ms"]:>9}{stats["p95_ms"]:>9}'
+            f'{stats["p99_ms"]:>9}{stats["rps"]:>8}{queries:>6}'
+            f'{stats["errors"]:>8}'
+        )
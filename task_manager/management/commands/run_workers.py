@@ -0,0 +1,96 @@
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.managers import SyncManager
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from task_manager.jobs import work
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет фоновые задания из очереди в БД (task_manager/jobs.py) '
+        'пулом потоков или процессов. Redis и Celery не нужны.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=2,
+            help='Число воркеров в пуле.',
+        )
+        parser.add_argument(
+            '--pool', choices=('thread', 'process'), default='thread',
+            help='Потоки подходят для заданий, ждущих сеть и БД; '
+                 'процессы — для счёта на CPU.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить подошедшие задания и выйти.',
+        )
+        parser.add_argument(
+            '--batch', type=int, default=settings.JOB_BATCH_SIZE,
+            help='Сколько заданий воркер забирает за раз.',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=settings.JOB_POLL_INTERVAL,
+            help='Пауза между опросами пустой очереди, с.',
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        kwargs = {
+            'once': options['once'],
+            'batch': options['batch'],
+            'poll_interval': options['poll_interval'],
+        }
+        manager = None
+        stop = threading.Event()
+        if options['pool'] == 'process':
+            # событие остановки должно быть видно и в дочерних
+            # процессах: SIGTERM получает только этот процесс
+            manager = SyncManager()
+            manager.start(ignore_sigint)
+            stop = manager.Event()
+            # дочерние процессы не должны унаследовать открытые
+            # соединения родителя; Ctrl+C они получают сами
+            connections.close_all()
+            executor = ProcessPoolExecutor(workers, initializer=django.setup)
+            futures = [
+                executor.submit(work, stop=stop, **kwargs)
+                for _ in range(workers)
+            ]
+        else:
+            executor = ThreadPoolExecutor(
+                workers, thread_name_prefix='job-worker'
+            )
+            futures = [
+                executor.submit(work, stop=stop, **kwargs)
+                for _ in range(workers)
+            ]
+
+        self.stdout.write(
+            f'Воркеров: {workers} ({options["pool"]}), Ctrl+C — остановка'
+        )
+        previous = signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        try:
+            done = sum(future.result() for future in futures)
+        except KeyboardInterrupt:
+            # потоки доделывают текущую пачку и выходят
+            stop.set()
+            done = sum(future.result() for future in futures)
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+            executor.shutdown()
+            if manager is not None:
+                manager.shutdown()
+        self.stdout.write(self.style.SUCCESS(f'Выполнено заданий: {done}'))
+
+
+def ignore_sigint():
+    # процесс менеджера должен пережить Ctrl+C, пока воркеры
+    # доделывают текущую пачку и читают событие остановки
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
@@ -0,0 +1,118 @@
+import threading
+from bisect import bisect_left
+
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000)
+
+
+class Histogram:
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """
+    Метрики процесса в памяти: гистограммы и счётчики с метками.
+
+    Каждый воркер gunicorn ведёт свои значения; Prometheus опрашивает
+    их по отдельности и суммирует сам.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.help = {}
+
+    def observe(self, name, labels, value, buckets, help_text=''):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+                self.help.setdefault(name, help_text)
+            histogram.observe(value)
+
+    def inc(self, name, labels, help_text=''):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+            self.help.setdefault(name, help_text)
+
+    def clear(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def render(self):
+        """Текстовый формат Prometheus (exposition format 0.0.4)."""
+        with self.lock:
+            histograms = sorted(
+                (key, histogram.buckets, list(histogram.counts),
+                 histogram.sum, histogram.count)
+                for key, histogram in self.histograms.items()
+            )
+            counters = sorted(self.counters.items())
+
+        lines = []
+        seen = set()
+
+        def header(name, kind):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f'# HELP {name} {self.help.get(name, "")}')
+                lines.append(f'# TYPE {name} {kind}')
+
+        for (name, labels), buckets, counts, total, count in histograms:
+            header(name, 'histogram')
+            cumulative = 0
+            for bound, bucket_count in zip(buckets, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{name}_bucket'
+                    f'{_labels(labels, le=_number(bound))} {cumulative}'
+                )
+            lines.append(f'{name}_bucket{_labels(labels, le="+Inf")} {count}')
+            lines.append(f'{name}_sum{_labels(labels)} {_number(total)}')
+            lines.append(f'{name}_count{_labels(labels)} {count}')
+
+        for (name, labels), value in counters:
+            header(name, 'counter')
+            lines.append(f'{name}{_labels(labels)} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return (
+        str(value).replace('\\', r'\\').replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ''
+    body = ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return '{' + body + '}'
+
+
+registry = Registry()
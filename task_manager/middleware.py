@@ -0,0 +1,257 @@
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .metrics import (
+    DURATION_BUCKETS,
+    QUERY_BUCKETS,
+    SIZE_BUCKETS,
+    registry,
+)
+
+
+logger = logging.getLogger('task_manager.requests')
+
+# сколько SQL-запросов одного запроса держать для журнала медленных
+MAX_RECORDED_QUERIES = 200
+LOGGED_QUERIES = 10
+
+
+class RequestMetrics:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_time = 0.0
+        self.db_queries = 0
+        self.template_time = 0.0
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.db_time += duration
+            self.db_queries += 1
+            if len(self.queries) < MAX_RECORDED_QUERIES:
+                self.queries.append((sql, duration))
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+# Замеры текущего запроса. ContextVar, а не атрибут соединения:
+# под ASGI ORM выполняется в потоке sync_to_async со своими
+# соединениями, а контекст asgiref копирует туда вместе с вызовом.
+current_metrics = ContextVar('request_metrics', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """execute_wrapper, который ставится на каждое соединение с БД."""
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+class RequestMetricsMiddleware:
+    """
+    Время ответа, число и время SQL-запросов, время рендера шаблона
+    и размер ответа для каждого запроса.
+
+    Значения уходят в заголовок Server-Timing, в гистограммы /metrics/
+    (по имени URL) и, для медленных запросов, в журнал
+    task_manager.requests вместе с самыми долгими SQL. Замер стоит
+    пару вызовов perf_counter на SQL-запрос, так что его можно
+    держать включённым в продакшене. Работает и под WSGI, и под ASGI
+    без переключения в поток.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            self.process_template_response = self.aprocess_template_response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = request._metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = request._metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        if response.streaming:
+            # запросы к БД потокового ответа выполняются при отдаче тела,
+            # поэтому замер закрывается, когда поток прочитан
+            wrap = (
+                self.wrap_async_stream if response.is_async
+                else self.wrap_stream
+            )
+            response.streaming_content = wrap(
+                response.streaming_content, request, response, metrics
+            )
+            self.add_server_timing(response, metrics)
+        else:
+            self.add_server_timing(response, metrics)
+            self.record(request, response, metrics, len(response.content))
+        return response
+
+    def process_template_response(self, request, response):
+        return self.time_render(request, response)
+
+    async def aprocess_template_response(self, request, response):
+        # под ASGI синхронный хук Django вызвал бы через sync_to_async
+        return self.time_render(request, response)
+
+    def time_render(self, request, response):
+        metrics = getattr(request, '_metrics', None)
+        if metrics is None:
+            return response
+        render = response.render
+
+        def timed_render():
+            started = time.perf_counter()
+            try:
+                return render()
+            finally:
+                metrics.template_time += time.perf_counter() - started
+
+        response.render = timed_render
+        return response
+
+    def wrap_stream(self, content, request, response, metrics):
+        size = 0
+        current_metrics.set(metrics)
+        try:
+            for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            current_metrics.set(None)
+            self.record(request, response, metrics, size)
+
+    async def wrap_async_stream(self, content, request, response, metrics):
+        size = 0
+        current_metrics.set(metrics)
+        try:
+            async for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            current_metrics.set(None)
+            self.record(request, response, metrics, size)
+
+    def add_server_timing(self, response, metrics):
+        if not settings.SERVER_TIMING:
+            return
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={metrics.db_time * 1000:.1f};'
+            f'desc="{metrics.db_queries} queries"',
+            f'tpl;dur={metrics.template_time * 1000:.1f}',
+            f'total;dur={metrics.elapsed * 1000:.1f}',
+        ])
+
+    def record(self, request, response, metrics, size):
+        view = view_name(request)
+        if view == 'metrics':
+            return
+        elapsed = metrics.elapsed
+        labels = {'view': view, 'method': request.method}
+        registry.observe(
+            'http_request_duration_seconds', labels, elapsed,
+            DURATION_BUCKETS, 'Время ответа',
+        )
+        registry.observe(
+            'http_request_db_queries', {'view': view}, metrics.db_queries,
+            QUERY_BUCKETS, 'SQL-запросов на запрос',
+        )
+        registry.observe(
+            'http_request_db_duration_seconds', {'view': view},
+            metrics.db_time, DURATION_BUCKETS, 'Время SQL-запросов',
+        )
+        registry.observe(
+            'http_request_template_duration_seconds', {'view': view},
+            metrics.template_time, DURATION_BUCKETS, 'Время рендера шаблона',
+        )
+        registry.observe(
+            'http_response_size_bytes', {'view': view}, size,
+            SIZE_BUCKETS, 'Размер ответа',
+        )
+        registry.inc(
+            'http_responses_total',
+            {'view': view, 'status': response.status_code},
+            'Ответы по кодам',
+        )
+
+        # поток событий открыт, пока открыта страница, — это не медленно
+        if (elapsed * 1000 >= settings.SLOW_REQUEST_MS
+                and not is_event_stream(response)
+                and random.random() < settings.SLOW_REQUEST_SAMPLE_RATE):
+            logger.warning(json.dumps(
+                slow_request_record(request, response, metrics, size, view),
+                ensure_ascii=False,
+            ))
+
+
+def is_event_stream(response):
+    return response.get('Content-Type', '').startswith('text/event-stream')
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match._func_path
+
+
+def slow_request_record(request, response, metrics, size, view):
+    repeated = Counter(sql for sql, _ in metrics.queries)
+    slowest = sorted(metrics.queries, key=lambda item: -item[1])
+    return {
+        'event': 'slow_request',
+        'method': request.method,
+        'path': request.get_full_path(),
+        'view': view,
+        'status': response.status_code,
+        'user': getattr(getattr(request, 'user', None), 'pk', None),
+        'duration_ms': round(metrics.elapsed * 1000, 1),
+        'db_ms': round(metrics.db_time * 1000, 1),
+        'db_queries': metrics.db_queries,
+        'template_ms': round(metrics.template_time * 1000, 1),
+        'size': size,
+        'slowest_queries': [
+            {'sql': sql, 'ms': round(duration * 1000, 2)}
+            for sql, duration in slowest[:LOGGED_QUERIES]
+        ],
+        # одинаковый SQL много раз подряд — обычно N+1
+        'repeated_queries': [
+            {'sql': sql, 'count': count}
+            for sql, count in repeated.most_common(3) if count > 1
+        ],
+    }
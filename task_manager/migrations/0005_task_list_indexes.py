@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:39
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0004_alter_label_options_alter_task_options_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['-created_at', 'id'], name='task_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', '-created_at', 'id'], name='task_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['executor', '-created_at', 'id'], name='task_executor_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['author', '-created_at', 'id'], name='task_author_created_idx'),
+        ),
+        # Фильтр по метке идёт от label_id к task_id; уникальный индекс
+        # (task_id, label_id), который Django создаёт сам, здесь не помогает.
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX task_labels_label_task_idx '
+                'ON task_manager_task_labels (label_id, task_id)'
+            ),
+            reverse_sql='DROP INDEX task_labels_label_task_idx',
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:45
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+# DDL зафиксирован здесь, а не берётся из task_manager.search: миграция
+# должна работать и после того, как модуль поиска изменится
+
+SQLITE_FTS_TABLE = 'task_manager_task_fts'
+
+SQLITE_FTS_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        name,
+        description,
+        content='task_manager_task',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai
+    AFTER INSERT ON task_manager_task BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad
+    AFTER DELETE ON task_manager_task BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(
+            {SQLITE_FTS_TABLE}, rowid, name, description
+        )
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au
+    AFTER UPDATE OF name, description ON task_manager_task BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(
+            {SQLITE_FTS_TABLE}, rowid, name, description
+        )
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_FTS_DROP_SQL = [
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}',
+]
+
+POSTGRES_INDEX = 'task_search_vector_idx'
+
+
+def install_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for statement in SQLITE_FTS_SQL:
+            schema_editor.execute(statement)
+    elif vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchVector
+
+        config = getattr(settings, 'TASK_SEARCH_CONFIG', 'simple')
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {POSTGRES_INDEX} '
+            'ON task_manager_task USING gin (search_vector)'
+        )
+        Task = apps.get_model('task_manager', 'Task')
+        Task.objects.using(schema_editor.connection.alias).update(
+            search_vector=(
+                SearchVector('name', weight='A', config=config)
+                + SearchVector('description', weight='B', config=config)
+            ),
+        )
+
+
+def uninstall_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for statement in SQLITE_FTS_DROP_SQL:
+            schema_editor.execute(statement)
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {POSTGRES_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0005_task_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
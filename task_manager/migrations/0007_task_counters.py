@@ -0,0 +1,62 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_counters(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    Status = apps.get_model('task_manager', 'Status')
+    Task = apps.get_model('task_manager', 'Task')
+    UserTaskStats = apps.get_model('task_manager', 'UserTaskStats')
+    tasks = Task.objects.using(alias)
+
+    for status_id, count in (
+        tasks.values_list('status').annotate(n=Count('id')).order_by()
+    ):
+        Status.objects.using(alias).filter(pk=status_id).update(
+            task_count=count
+        )
+
+    stats = {}
+    for field, column in (('executor', 'assigned_count'),
+                          ('author', 'authored_count')):
+        for user_id, count in (
+            tasks.exclude(**{field: None}).values_list(field)
+            .annotate(n=Count('id')).order_by()
+        ):
+            stats.setdefault(user_id, {})[column] = count
+    UserTaskStats.objects.using(alias).bulk_create([
+        UserTaskStats(user_id=user_id, **values)
+        for user_id, values in stats.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('task_manager', '0006_task_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='status',
+            name='task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.CreateModel(
+            name='UserTaskStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('assigned_count', models.PositiveIntegerField(default=0)),
+                ('authored_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-assigned_count'], name='stats_assigned_idx')],
+            },
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:38
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_label_counts(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    Label = apps.get_model('task_manager', 'Label')
+    Task = apps.get_model('task_manager', 'Task')
+    for label_id, count in (
+        Task.labels.through.objects.using(alias)
+        .values_list('label').annotate(n=Count('id')).order_by()
+    ):
+        Label.objects.using(alias).filter(pk=label_id).update(
+            task_count=count
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0007_task_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='label',
+            name='task_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_label_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+TABLES = ('task', 'status', 'label', 'user')
+
+
+def create_table_versions(apps, schema_editor):
+    alias = schema_editor.connection.alias
+    TableVersion = apps.get_model('task_manager', 'TableVersion')
+    now = django.utils.timezone.now()
+    TableVersion.objects.using(alias).bulk_create([
+        TableVersion(table=table, updated_at=now) for table in TABLES
+    ])
+
+
+def fill_updated_at(apps, schema_editor):
+    # у существующих строк время изменения неизвестно: берём создание
+    alias = schema_editor.connection.alias
+    for name in ('Task', 'Label'):
+        model = apps.get_model('task_manager', name)
+        model.objects.using(alias).update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0008_label_task_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='label',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='status',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.CreateModel(
+            name='TableVersion',
+            fields=[
+                ('table', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+        migrations.RunPython(
+            create_table_versions, migrations.RunPython.noop
+        ),
+    ]
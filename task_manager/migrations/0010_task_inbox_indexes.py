@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0009_conditional_get'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['executor', 'status', '-created_at', 'id'], name='task_executor_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['author', 'status', '-created_at', 'id'], name='task_author_status_idx'),
+        ),
+    ]
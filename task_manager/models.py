@@ -1,10 +1,16 @@
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, router, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
 
+from .querysets import TaskQuerySet
+
 
 class Status(models.Model):
     name = models.CharField(max_length=100, unique=True)
+    # число задач в статусе; ведётся в counters.py
+    task_count = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -13,6 +19,9 @@ class Status(models.Model):
 class Label(models.Model):
     name = models.CharField(max_length=100, unique=True)
     created_at = models.DateTimeField(default=timezone.now, editable=False)
+    # число задач с меткой; ведётся в counters.py
+    task_count = models.PositiveIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['id']
@@ -47,9 +56,189 @@ class Task(models.Model):
         related_name='tasks'
     )
     created_at = models.DateTimeField(default=timezone.now, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+    # заполняется только на PostgreSQL, см. search.PostgresSearchBackend
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = TaskQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
+        # Список задач всегда отсортирован по (-created_at, id), а фильтры
+        # сужают его по статусу, исполнителю или автору: под каждую такую
+        # комбинацию — свой составной индекс, чтобы обойтись без сортировки.
+        indexes = [
+            models.Index(
+                fields=['-created_at', 'id'],
+                name='task_created_idx',
+            ),
+            models.Index(
+                fields=['status', '-created_at', 'id'],
+                name='task_status_created_idx',
+            ),
+            models.Index(
+                fields=['executor', '-created_at', 'id'],
+                name='task_executor_created_idx',
+            ),
+            models.Index(
+                fields=['author', '-created_at', 'id'],
+                name='task_author_created_idx',
+            ),
+            # страница «Мои задачи» (inbox.py) читает задачи
+            # пользователя в пределах статуса
+            models.Index(
+                fields=['executor', 'status', '-created_at', 'id'],
+                name='task_executor_status_idx',
+            ),
+            models.Index(
+                fields=['author', 'status', '-created_at', 'id'],
+                name='task_author_status_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        task = super().from_db(db, field_names, values)
+        # значения, с которыми задача учтена в счётчиках (counters.py)
+        task._counted_state = {
+            field: task.__dict__[field]
+            for field in ('status_id', 'executor_id', 'author_id')
+            if field in task.__dict__
+        }
+        # прежние значения для журнала изменений (history.py)
+        task._history_state = {
+            field: task.__dict__[field]
+            for field in ('name', 'description', 'status_id', 'executor_id')
+            if field in task.__dict__
+        }
+        return task
+
+    def save(self, *args, **kwargs):
+        # счётчики обновляются в post_save, в той же транзакции
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self
+        )
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
+class UserTaskStats(models.Model):
+    """Число задач пользователя; ведётся в counters.py."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='task_stats'
+    )
+    assigned_count = models.PositiveIntegerField(default=0)
+    authored_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['-assigned_count'],
+                name='stats_assigned_idx',
+            ),
+        ]
+
+
+class TaskHistory(models.Model):
+    """
+    Журнал изменений задачи, только для добавления; пишется пачками
+    через history.py. Внешние ключи без ограничений в базе: записи
+    переживают удаление задачи и пользователя.
+    """
+
+    CREATED = 'created'
+    CHANGED = 'changed'
+    DELETED = 'deleted'
+    ACTIONS = [
+        (CREATED, 'created'),
+        (CHANGED, 'changed'),
+        (DELETED, 'deleted'),
+    ]
+
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='history'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='+'
+    )
+    action = models.CharField(max_length=16, choices=ACTIONS)
+    # для меток old_value — снятые, new_value — добавленные id
+    field = models.CharField(max_length=32, blank=True)
+    old_value = models.TextField(blank=True)
+    new_value = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['task', '-created_at', '-id'],
+                name='history_task_idx',
+            ),
+        ]
+
+
+class Job(models.Model):
+    """Отложенная работа для run_workers; очередь ведёт jobs.py."""
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = [
+        (QUEUED, 'queued'),
+        (RUNNING, 'running'),
+        (DONE, 'done'),
+        (FAILED, 'failed'),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=16, choices=STATUSES, default=QUEUED
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    # не раньше этого времени: отложенный запуск и паузы между повторами
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # выборка воркера: очередные задания, срок которых подошёл
+            models.Index(
+                fields=['status', 'run_at', 'id'],
+                name='job_queue_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
+
+
+class TableVersion(models.Model):
+    """
+    Версия таблицы для условных GET (conditional.py): счётчик
+    изменений и время последнего из них, включая удаления.
+    """
+
+    table = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
@@ -0,0 +1,25 @@
+from django.core.mail import send_mail
+
+from .jobs import job
+from .models import Task
+
+
+NOTIFY_EXECUTOR = 'notify_executor'
+
+
+@job(NOTIFY_EXECUTOR)
+def notify_executor(task_id):
+    """Письмо исполнителю о назначенной задаче; идёт через run_workers."""
+    task = (
+        Task.objects.select_related('executor', 'author')
+        .filter(pk=task_id).first()
+    )
+    if task is None or task.executor is None or not task.executor.email:
+        return
+    send_mail(
+        f'Вам назначена задача «{task.name}»',
+        f'{task.author.username} назначил(а) вам задачу «{task.name}».\n\n'
+        f'{task.description}',
+        None,
+        [task.executor.email],
+    )
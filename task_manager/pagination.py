@@ -0,0 +1,229 @@
+import base64
+import binascii
+import json
+import math
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPage:
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.next_query = ''
+        self.previous_query = ''
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Постраничный вывод по ключу (keyset / cursor pagination).
+
+    Вместо OFFSET страница начинается строго после (или до) значений
+    ключей последней показанной строки, поэтому сотая страница стоит
+    столько же, сколько первая. Ключи задаются как в order_by():
+    ('-created_at', 'id'). Последний ключ должен быть уникальным.
+    """
+
+    def __init__(self, keys, per_page):
+        self.keys = [
+            (key.lstrip('-'), key.startswith('-')) for key in keys
+        ]
+        self.per_page = per_page
+
+    def seek(self, queryset, cursor=None):
+        """
+        Упорядочивает queryset по ключам и отрезает всё до курсора.
+        Возвращает (queryset, backwards, values); сам запрос не выполняется.
+        """
+        backwards = False
+        values = None
+        if cursor:
+            backwards, values = self.decode_cursor(queryset.model, cursor)
+
+        ordering = [
+            ('-' if desc != backwards else '') + name
+            for name, desc in self.keys
+        ]
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, backwards))
+        return queryset, backwards, values
+
+    def paginate(self, queryset, cursor=None):
+        queryset, backwards, values = self.seek(queryset, cursor)
+        rows = list(queryset[:self.per_page + 1])
+        return self.make_page(rows, backwards, values)
+
+    async def apaginate(self, queryset, cursor=None):
+        queryset, backwards, values = self.seek(queryset, cursor)
+        rows = [
+            obj async for obj in queryset[:self.per_page + 1].aiterator(
+                chunk_size=self.per_page + 1
+            )
+        ]
+        return self.make_page(rows, backwards, values)
+
+    def make_page(self, rows, backwards, values):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage(rows)
+
+        if backwards:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        return KeysetPage(
+            rows,
+            next_cursor=(
+                self.encode_cursor(rows[-1]) if has_next else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(rows[0], backwards=True)
+                if has_previous else None
+            ),
+        )
+
+    def _seek(self, values, backwards):
+        condition = Q()
+        for position, (name, desc) in enumerate(self.keys):
+            lookup = 'lt' if desc != backwards else 'gt'
+            step = Q(**{f'{name}__{lookup}': values[position]})
+            for prev_position, (prev_name, _) in enumerate(
+                self.keys[:position]
+            ):
+                step &= Q(**{prev_name: values[prev_position]})
+            condition |= step
+        return condition
+
+    def encode_cursor(self, obj, backwards=False):
+        values = [
+            self._serialize(_key_value(obj, name)) for name, _ in self.keys
+        ]
+        payload = json.dumps(
+            {'p': int(backwards), 'v': values},
+            separators=(',', ':'),
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, model, cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            raw_values = payload['v']
+            backwards = bool(payload['p'])
+        except (
+            binascii.Error, ValueError, TypeError, KeyError, AttributeError
+        ) as exc:
+            raise InvalidCursor(cursor) from exc
+
+        if not isinstance(raw_values, list) or (
+            len(raw_values) != len(self.keys)
+        ):
+            raise InvalidCursor(cursor)
+
+        values = []
+        for (name, _), raw in zip(self.keys, raw_values):
+            try:
+                values.append(self._to_python(model, name, raw))
+            except (ValidationError, TypeError) as exc:
+                raise InvalidCursor(cursor) from exc
+        return backwards, values
+
+    @staticmethod
+    def _to_python(model, name, raw):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # ключ по аннотации — число (релевантность поиска); строка
+            # из подделанного курсора сравнивалась бы с float, и
+            # PostgreSQL ответил бы ошибкой
+            if isinstance(raw, bool) or not isinstance(raw, (int, float)):
+                raise TypeError(name)
+            if not math.isfinite(raw):
+                raise TypeError(name)
+            return raw
+        field = getattr(field, 'target_field', field)
+        return field.to_python(raw)
+
+    @staticmethod
+    def _serialize(value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+
+
+def _key_value(obj, name):
+    # obj — экземпляр модели или словарь из queryset.values()
+    if isinstance(obj, dict):
+        return obj[name]
+    return getattr(obj, name)
+
+
+class KeysetPaginationMixin:
+    paginate_by = 50
+    paginate_keys = ('id',)
+    cursor_kwarg = 'cursor'
+
+    def get_paginate_keys(self):
+        return self.paginate_keys
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(self.get_paginate_keys(), page_size)
+        try:
+            page = paginator.paginate(
+                queryset,
+                self.request.GET.get(self.cursor_kwarg),
+            )
+        except InvalidCursor:
+            raise Http404('Некорректный курсор страницы')
+        return self._page_result(paginator, page)
+
+    async def apaginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(self.get_paginate_keys(), page_size)
+        try:
+            page = await paginator.apaginate(
+                queryset,
+                self.request.GET.get(self.cursor_kwarg),
+            )
+        except InvalidCursor:
+            raise Http404('Некорректный курсор страницы')
+        return self._page_result(paginator, page)
+
+    def _page_result(self, paginator, page):
+        page.next_query = self._query_with_cursor(page.next_cursor)
+        page.previous_query = self._query_with_cursor(page.previous_cursor)
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def _query_with_cursor(self, cursor):
+        if cursor is None:
+            return ''
+        params = self.request.GET.copy()
+        params[self.cursor_kwarg] = cursor
+        return params.urlencode()
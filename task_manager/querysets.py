@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class TaskQuerySet(models.QuerySet):
+
+    def for_listing(self):
+        # Всё, что шаблоны списка и карточки задачи читают по связям,
+        # забираем заранее: один JOIN и один запрос на метки
+        # вместо трёх-четырёх запросов на каждую строку.
+        return self.select_related(
+            'status',
+            'executor',
+            'author',
+        ).prefetch_related('labels').defer('search_vector')
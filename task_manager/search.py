@@ -0,0 +1,258 @@
+import re
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+from django.utils.module_loading import import_string
+
+
+SQLITE_FTS_TABLE = 'task_manager_task_fts'
+
+SQLITE_FTS_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        name,
+        description,
+        content='task_manager_task',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ai
+    AFTER INSERT ON task_manager_task BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_ad
+    AFTER DELETE ON task_manager_task BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(
+            {SQLITE_FTS_TABLE}, rowid, name, description
+        )
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_FTS_TABLE}_au
+    AFTER UPDATE OF name, description ON task_manager_task BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(
+            {SQLITE_FTS_TABLE}, rowid, name, description
+        )
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+]
+
+SQLITE_FTS_DROP_SQL = [
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {SQLITE_FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}',
+]
+
+
+class BaseSearchBackend:
+    # ключ сортировки по релевантности для KeysetPaginator
+    rank_key = '-search_rank'
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+    @staticmethod
+    def query_words(query):
+        # запрос разбирается одинаково во всех бэкендах: только слова,
+        # кавычки и операторы пользователя синтаксисом не считаются
+        return re.findall(r'\w+', query)
+
+    def update_task(self, task):
+        self.update_tasks(type(task).objects.filter(pk=task.pk))
+
+    def update_tasks(self, queryset):
+        # вызывается после сохранения задач, в том числе bulk_create
+        pass
+
+    def reindex(self, queryset):
+        pass
+
+    def install(self, schema_editor):
+        pass
+
+    def uninstall(self, schema_editor):
+        pass
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    Поиск по колонке Task.search_vector с GIN-индексом.
+
+    Вектор пересчитывается после каждого сохранения задачи
+    (см. signals.py), ранжирование — ts_rank, имя весит больше описания.
+    """
+
+    index_name = 'task_search_vector_idx'
+
+    def __init__(self):
+        self.config = getattr(settings, 'TASK_SEARCH_CONFIG', 'simple')
+
+    def vector(self):
+        from django.contrib.postgres.search import SearchVector
+
+        return (
+            SearchVector('name', weight='A', config=self.config)
+            + SearchVector('description', weight='B', config=self.config)
+        )
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        words = self.query_words(query)
+        if not words:
+            return queryset.none()
+        # как у FTS5: каждое слово — префикс, слова объединяются по И
+        search_query = SearchQuery(
+            ' & '.join(f'{word}:*' for word in words),
+            search_type='raw', config=self.config,
+        )
+        # ts_rank возвращает real; приводим к double, чтобы значение
+        # в курсоре страницы сравнивалось с базой без потери точности
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=Cast(
+                SearchRank(F('search_vector'), search_query),
+                FloatField(),
+            ),
+        )
+
+    def update_tasks(self, queryset):
+        self.reindex(queryset)
+
+    def reindex(self, queryset):
+        queryset.update(search_vector=self.vector())
+
+    def install(self, schema_editor):
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {self.index_name} '
+            'ON task_manager_task USING gin (search_vector)'
+        )
+
+    def uninstall(self, schema_editor):
+        schema_editor.execute(f'DROP INDEX IF EXISTS {self.index_name}')
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    Поиск через виртуальную таблицу FTS5 с внешним содержимым.
+
+    Таблицу в актуальном состоянии держат триггеры на task_manager_task,
+    поэтому сохранение задачи ничего дополнительно не делает. bm25 у
+    FTS5 тем меньше, чем документ релевантнее, отсюда прямой порядок.
+    """
+
+    rank_key = 'search_rank'
+
+    def search(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+
+        # MATCH выполняется в некоррелированных подзапросах, по разу
+        # на запрос. bm25 нельзя посчитать для одной строки без
+        # повторного MATCH, поэтому ранги берутся из выборки rowid/bm25;
+        # LIMIT -1 не даёт SQLite развернуть её в коррелированный
+        # подзапрос (квадратичное время на частых словах) — она
+        # материализуется один раз и ищется по автоматическому индексу.
+        table = queryset.model._meta.db_table
+        return queryset.filter(
+            pk__in=RawSQL(
+                f'SELECT rowid FROM {SQLITE_FTS_TABLE} '
+                f'WHERE {SQLITE_FTS_TABLE} MATCH %s',
+                [match],
+            ),
+        ).annotate(
+            search_rank=RawSQL(
+                'SELECT ranks.rank FROM ('
+                f'SELECT rowid AS id, bm25({SQLITE_FTS_TABLE}, 10.0, 1.0) '
+                f'AS rank FROM {SQLITE_FTS_TABLE} '
+                f'WHERE {SQLITE_FTS_TABLE} MATCH %s LIMIT -1'
+                f') AS ranks WHERE ranks.id = {table}.id',
+                [match],
+                output_field=FloatField(),
+            ),
+        )
+
+    @classmethod
+    def match_expression(cls, query):
+        # каждое слово — отдельный префиксный терм в кавычках, чтобы
+        # пользовательский ввод не интерпретировался как синтаксис FTS5
+        return ' '.join(f'"{word}"*' for word in cls.query_words(query))
+
+    def reindex(self, queryset):
+        # FTS5 умеет только полную перестройку внешнего индекса
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) "
+                "VALUES ('rebuild')"
+            )
+
+    def install(self, schema_editor):
+        for statement in SQLITE_FTS_SQL:
+            schema_editor.execute(statement)
+
+    def uninstall(self, schema_editor):
+        for statement in SQLITE_FTS_DROP_SQL:
+            schema_editor.execute(statement)
+
+
+class LikeSearchBackend(BaseSearchBackend):
+    """
+    Запасной поиск для баз без полнотекстового индекса: каждое слово
+    ищется через icontains в названии или описании. Медленно на
+    больших таблицах, но ?q= работает и на MySQL, и на Oracle.
+    Совпадения в названии поднимаются выше.
+    """
+
+    def search(self, queryset, query):
+        words = self.query_words(query)
+        if not words:
+            return queryset.none()
+        for word in words:
+            queryset = queryset.filter(
+                Q(name__icontains=word) | Q(description__icontains=word)
+            )
+        rank = sum(
+            (
+                Case(
+                    When(name__icontains=word, then=Value(1.0)),
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                )
+                for word in words
+            ),
+            Value(0.0),
+        )
+        return queryset.annotate(search_rank=rank)
+
+
+VENDOR_BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+_backends = {}
+
+
+def get_search_backend(using=None):
+    vendor = using.vendor if using is not None else connection.vendor
+    if vendor not in _backends:
+        path = getattr(settings, 'TASK_SEARCH_BACKEND', None)
+        if path:
+            backend_class = import_string(path)
+        else:
+            backend_class = VENDOR_BACKENDS.get(vendor, LikeSearchBackend)
+        _backends[vendor] = backend_class()
+    return _backends[vendor]
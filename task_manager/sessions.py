@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+
+DB_BACKENDS = ('db', 'cached_db')
+
+
+def stores_sessions_in_db():
+    return settings.SESSION_ENGINE in {
+        settings.SESSION_BACKENDS[name] for name in DB_BACKENDS
+    }
+
+
+def clear_expired_sessions(batch_size=1000, pause=0.0, using=None):
+    """
+    Удаляет просроченные сессии пачками по batch_size. В отличие от
+    clearsessions (один DELETE на всю таблицу) каждая пачка — короткая
+    транзакция, и вход пользователей не ждёт, пока очистка держит
+    блокировку. pause — пауза между пачками, с.
+    """
+    sessions = Session.objects.using(using)
+    now = timezone.now()
+    deleted = 0
+    while True:
+        keys = list(
+            sessions.filter(expire_date__lt=now)
+            .values_list('session_key', flat=True)[:batch_size]
+        )
+        if not keys:
+            return deleted
+        # у Session нет связей и сигналов: это один DELETE без выборки
+        deleted += sessions.filter(session_key__in=keys).delete()[0]
+        if pause:
+            time.sleep(pause)
@@ -1,13 +1,14 @@
 import os
 from pathlib import Path
 
-from dotenv import load_dotenv
-import dj_database_url
-import rollbar
+BASE_DIR = Path(__file__).resolve().parent.parent
 
-load_dotenv()
+# python-dotenv и dj-database-url импортируются, только когда нужны:
+# каждый лишний импорт удлиняет холодный старт воркера
+if (BASE_DIR / '.env').exists():
+    from dotenv import load_dotenv
 
-BASE_DIR = Path(__file__).resolve().parent.parent
+    load_dotenv(BASE_DIR / '.env')
 
 SECRET_KEY = os.getenv("SECRET_KEY", "django-insecure-default-key")
 DEBUG = os.getenv("DEBUG", "True").lower() == "true"
@@ -18,7 +19,6 @@ ALLOWED_HOSTS = os.getenv(
 ).split(",")
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -29,42 +29,187 @@ INSTALLED_APPS = [
     'task_manager',
 ]
 
+# Админка по умолчанию не загружается
+ENABLE_ADMIN = os.getenv("ENABLE_ADMIN", "False").lower() == "true"
+if ENABLE_ADMIN:
+    INSTALLED_APPS.insert(0, 'django.contrib.admin')
+
 MIDDLEWARE = [
+    'task_manager.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'task_manager.history.HistoryMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'rollbar.contrib.django.middleware.RollbarNotifierMiddleware',
+    'task_manager.error_reporting.ErrorReportingMiddleware',
 ]
 
 ROOT_URLCONF = 'task_manager.urls'
 WSGI_APPLICATION = 'task_manager.wsgi.application'
 
+# По умолчанию шаблоны компилируются один раз и берутся из кэша
+# загрузчика (прогрев при старте — startup.warm_templates), независимо
+# от DEBUG. TEMPLATE_AUTORELOAD=True для разработки: файлы шаблонов
+# перечитываются при каждом рендере.
+TEMPLATE_AUTORELOAD = (
+    os.getenv("TEMPLATE_AUTORELOAD", "False").lower() == "true"
+)
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': (
+                TEMPLATE_LOADERS if TEMPLATE_AUTORELOAD
+                else [('django.template.loaders.cached.Loader',
+                       TEMPLATE_LOADERS)]
+            ),
         },
     },
 ]
 
-DEFAULT_DB_URL = f"sqlite:///{BASE_DIR / 'db.sqlite3'}"
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+if DATABASE_URL:
+    import dj_database_url
+
+    DATABASES = {
+        'default': dj_database_url.parse(DATABASE_URL, conn_max_age=600)
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': 600,
+        }
+    }
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[os.getenv("CACHE_BACKEND", "locmem")],
+        'LOCATION': os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+# Сессии. db — по умолчанию Django: SELECT из django_session на каждый
+# запрос, INSERT при входе, DELETE при выходе. cached_db читает сессию
+# из кэша SESSION_CACHE_ALIAS и ходит в БД только при промахе и записи;
+# локальный locmem годится, пока процесс один, — при нескольких
+# воркерах кэш сессий должен быть общим (SESSION_CACHE_BACKEND=redis),
+# иначе выход в одном процессе не виден другим. signed_cookies хранит
+# сессию в подписанной cookie и БД не трогает вовсе, но выход не
+# отзывает уже выданную cookie.
+SESSION_BACKENDS = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_BACKENDS[os.getenv("SESSION_BACKEND", "db")]
+SESSION_CACHE_ALIAS = 'sessions'
+CACHES[SESSION_CACHE_ALIAS] = {
+    'BACKEND': CACHE_BACKENDS[os.getenv("SESSION_CACHE_BACKEND", "locmem")],
+    'LOCATION': os.getenv("SESSION_CACHE_LOCATION", "sessions"),
+}
+
+# Флеш-сообщения (messages.success(...)). fallback — по умолчанию
+# Django: cookie, а в сессию только то, что в cookie не влезло;
+# cookie — только cookie; session — всегда в сессию (запись в БД
+# при db-сессиях)
+MESSAGE_STORAGES = {
+    'fallback': 'django.contrib.messages.storage.fallback.FallbackStorage',
+    'cookie': 'django.contrib.messages.storage.cookie.CookieStorage',
+    'session': 'django.contrib.messages.storage.session.SessionStorage',
+}
+MESSAGE_STORAGE = MESSAGE_STORAGES[os.getenv("MESSAGE_STORAGE", "fallback")]
+
+FRAGMENT_CACHE_TIMEOUT = int(os.getenv("FRAGMENT_CACHE_TIMEOUT", 60 * 60))
+REFERENCE_CACHE_TIMEOUT = int(os.getenv("REFERENCE_CACHE_TIMEOUT", 5 * 60))
+
+# Страница «Мои задачи» (task_manager/inbox.py): сколько задач
+# показывать в каждом статусе и сколько хранить её в кэше; 0 — без кэша
+INBOX_TASKS_PER_STATUS = int(os.getenv("INBOX_TASKS_PER_STATUS", 10))
+INBOX_CACHE_TIMEOUT = int(os.getenv("INBOX_CACHE_TIMEOUT", 10 * 60))
+
+# Журнал изменений задач (task_manager/history.py): сколько записей
+# копить в памяти до INSERT и сколько показывать в карточке задачи
+HISTORY_BUFFER_SIZE = int(os.getenv("HISTORY_BUFFER_SIZE", 500))
+HISTORY_PER_PAGE = int(os.getenv("HISTORY_PER_PAGE", 20))
+
+# Очередь фоновых заданий в БД (task_manager/jobs.py, run_workers)
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 5))
+JOB_BACKOFF_SECONDS = float(os.getenv("JOB_BACKOFF_SECONDS", 10))
+JOB_BACKOFF_MAX_SECONDS = float(os.getenv("JOB_BACKOFF_MAX_SECONDS", 3600))
+JOB_LOCK_TIMEOUT = int(os.getenv("JOB_LOCK_TIMEOUT", 10 * 60))
+JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", 10))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1.0))
+
+EMAIL_BACKEND = os.getenv(
+    "EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend"
+)
+
+# Асинхронные представления списка и карточки задач; asgi.py
+# включает их по умолчанию
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False").lower() == "true"
+
+# Живые обновления списка задач по SSE (task_manager/events.py), только
+# под ASGI. Брокер по умолчанию рассылает события в пределах процесса;
+# очередь — сколько событий держать для медленного клиента
+TASK_EVENTS_BACKEND = os.getenv(
+    "TASK_EVENTS_BACKEND", "task_manager.events.LocalBroker"
+)
+TASK_EVENTS_QUEUE_SIZE = int(os.getenv("TASK_EVENTS_QUEUE_SIZE", 100))
+TASK_EVENTS_HEARTBEAT = float(os.getenv("TASK_EVENTS_HEARTBEAT", 15))
+TASK_EVENTS_RETRY_MS = int(os.getenv("TASK_EVENTS_RETRY_MS", 5000))
 
-DATABASES = {
-    'default': dj_database_url.parse(
-        os.getenv("DATABASE_URL", DEFAULT_DB_URL),
-        conn_max_age=600,
-    )
+# Метрики запросов (task_manager/middleware.py)
+SERVER_TIMING = os.getenv("SERVER_TIMING", "True").lower() == "true"
+SLOW_REQUEST_MS = int(os.getenv("SLOW_REQUEST_MS", 500))
+SLOW_REQUEST_SAMPLE_RATE = float(os.getenv("SLOW_REQUEST_SAMPLE_RATE", 1.0))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'task_manager.requests': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'task_manager.errors': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'task_manager.jobs': {
+            'handlers': ['console'],
+            'level': os.getenv("JOB_LOG_LEVEL", "INFO"),
+            'propagate': False,
+        },
+    },
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -115,8 +260,17 @@ ROLLBAR = {
     'root': BASE_DIR,
 }
 
-rollbar.init(
-    access_token=ROLLBAR['access_token'],
-    environment=ROLLBAR['environment'],
-    root=str(ROLLBAR['root']),
-)
+# Ошибки отправляются из фонового потока пачками
+# (task_manager/error_reporting.py); в разработке и CI — в файл.
+ERROR_REPORTING = {
+    'SINK': os.getenv(
+        "ERROR_REPORTING_SINK", "file" if DEBUG else "rollbar"
+    ),
+    'FILE': os.getenv(
+        "ERROR_REPORTING_FILE", str(BASE_DIR / 'errors.ndjson')
+    ),
+    'QUEUE_SIZE': int(os.getenv("ERROR_REPORTING_QUEUE_SIZE", 1000)),
+    'BATCH_SIZE': 50,
+    'FLUSH_INTERVAL': 2.0,
+    'DEDUP_WINDOW': 60.0,
+}
@@ -0,0 +1,321 @@
+from functools import wraps
+
+from django.contrib.auth.models import User
+from django.db.backends.signals import connection_created
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from . import bulk, conditional, counters, events, history
+from .caching import REFERENCE, bump_generation, bump_versions
+from .middleware import record_query
+from .models import Label, Status, Task, TaskHistory
+from .search import get_search_backend
+
+
+def skip_in_bulk(handler):
+    # массовые действия (bulk.py) сами обновляют счётчики и кэши
+    # одним проходом после операции
+    @wraps(handler)
+    def wrapper(sender, **kwargs):
+        if sender is Task and bulk.in_bulk_operation():
+            return
+        return handler(sender, **kwargs)
+    return wrapper
+
+
+@receiver(post_save, sender=Task)
+@skip_in_bulk
+def update_task_search_index(sender, instance, using, **kwargs):
+    get_search_backend().update_task(instance)
+
+
+# ===== Счётчики задач по статусам и пользователям (counters.py) =====
+
+@receiver(pre_save, sender=Task)
+@skip_in_bulk
+def remember_counted_state(sender, instance, using, **kwargs):
+    # задача создана не из запроса (или с отложенными полями):
+    # прежние значения берём из базы, пока их не перезаписали
+    state = getattr(instance, '_counted_state', {})
+    if instance.pk is None or len(state) == len(counters.COUNTED_FIELDS):
+        return
+    instance._counted_state = (
+        Task.objects.using(using).filter(pk=instance.pk)
+        .values(*counters.COUNTED_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=Task)
+@skip_in_bulk
+def update_task_counters(sender, instance, created, using, update_fields,
+                         **kwargs):
+    old = None if created else getattr(instance, '_counted_state', None)
+    new = counters.task_state(instance)
+    if old and update_fields is not None:
+        new = {
+            field: (
+                new[field]
+                if {field, field[:-3]} & set(update_fields) else old[field]
+            )
+            for field in counters.COUNTED_FIELDS
+        }
+    counters.apply_deltas(counters.change_deltas(old, new), using)
+    instance._counted_state = new
+
+
+@receiver(post_delete, sender=Task)
+@skip_in_bulk
+def release_task_counters(sender, instance, using, **kwargs):
+    state = getattr(instance, '_counted_state', None)
+    if not state or len(state) < len(counters.COUNTED_FIELDS):
+        state = counters.task_state(instance)
+    counters.apply_deltas(counters.change_deltas(state, None), using)
+
+
+@receiver(m2m_changed, sender=Task.labels.through)
+def count_label_uses(sender, instance, action, reverse, pk_set, using,
+                     **kwargs):
+    # Collector не шлёт сигналов для автоматической промежуточной
+    # таблицы, поэтому удаляемые связи считаются до удаления, в той
+    # же транзакции, что и сам remove()/clear()
+    links = sender.objects.using(using)
+    if action == 'post_add' and pk_set:
+        # pk_set — только действительно добавленные связи
+        if reverse:
+            counters.add_label_uses({instance.pk: len(pk_set)}, using)
+        else:
+            counters.add_label_uses(dict.fromkeys(pk_set, 1), using)
+    elif action == 'pre_remove' and pk_set:
+        if reverse:
+            removed = links.filter(label=instance, task__in=pk_set).count()
+            counters.add_label_uses({instance.pk: -removed}, using)
+        else:
+            counters.add_label_uses(dict.fromkeys(
+                links.filter(task=instance, label__in=pk_set)
+                .values_list('label_id', flat=True),
+                -1,
+            ), using)
+    elif action == 'pre_clear':
+        if reverse:
+            Label.objects.using(using).filter(pk=instance.pk).update(
+                task_count=0
+            )
+        else:
+            counters.add_label_uses(dict.fromkeys(
+                links.filter(task=instance)
+                .values_list('label_id', flat=True),
+                -1,
+            ), using)
+
+
+@receiver(pre_delete, sender=Task)
+@skip_in_bulk
+def remember_task_labels(sender, instance, using, **kwargs):
+    instance._deleted_label_ids = list(
+        Task.labels.through.objects.using(using).filter(task=instance)
+        .values_list('label_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Task)
+@skip_in_bulk
+def release_label_uses(sender, instance, using, **kwargs):
+    counters.add_label_uses(
+        dict.fromkeys(getattr(instance, '_deleted_label_ids', ()), -1),
+        using,
+    )
+
+
+# ===== Версии для кэша фрагментов (caching.py) =====
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@skip_in_bulk
+def invalidate_task(sender, instance, **kwargs):
+    bump_versions('task', [instance.pk])
+
+
+@receiver(m2m_changed, sender=Task.labels.through)
+def invalidate_task_labels(sender, instance, action, reverse, pk_set,
+                           **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_versions('task', [instance.pk])
+    elif pk_set:
+        bump_versions('task', pk_set)
+    else:
+        # label.tasks.clear(): затронутые задачи уже не узнать,
+        # поэтому сбрасываем версию самой метки
+        bump_versions('label', [instance.pk])
+
+
+@receiver(post_save, sender=Status)
+@receiver(post_delete, sender=Status)
+def invalidate_status(sender, instance, **kwargs):
+    bump_versions('status', [instance.pk])
+    bump_generation(REFERENCE)
+
+
+@receiver(post_save, sender=Label)
+@receiver(post_delete, sender=Label)
+def invalidate_label(sender, instance, **kwargs):
+    bump_versions('label', [instance.pk])
+    bump_generation(REFERENCE)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, update_fields=None, **kwargs):
+    # при каждом входе Django сохраняет только last_login,
+    # на отображение пользователя это не влияет
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    bump_versions('user', [instance.pk])
+    bump_generation(REFERENCE)
+
+
+# ===== Журнал изменений задач (history.py) =====
+
+HISTORY_FIELDS = ('name', 'description', 'status_id', 'executor_id')
+
+
+@receiver(post_save, sender=Task)
+@skip_in_bulk
+def record_task_history(sender, instance, created, using, update_fields,
+                        **kwargs):
+    new = {field: getattr(instance, field) for field in HISTORY_FIELDS}
+    old = getattr(instance, '_history_state', None)
+    if created:
+        history.record(
+            [history.entry(instance.pk, TaskHistory.CREATED)], using
+        )
+    elif old is not None:
+        # задача, созданная не из базы, сравнивать не с чем
+        if update_fields is not None:
+            new = {
+                field: value for field, value in new.items()
+                if {field, field.removesuffix('_id')} & set(update_fields)
+            }
+        history.record(history.field_changes(instance.pk, old, new), using)
+        new = {**old, **new}
+    instance._history_state = new
+
+
+@receiver(post_delete, sender=Task)
+@skip_in_bulk
+def record_task_deletion(sender, instance, using, **kwargs):
+    history.record([history.entry(instance.pk, TaskHistory.DELETED)], using)
+
+
+@receiver(m2m_changed, sender=Task.labels.through)
+def record_label_history(sender, instance, action, reverse, pk_set, using,
+                         **kwargs):
+    if action == 'pre_clear':
+        # после clear() pk_set пуст: снимаемые связи читаем заранее
+        links = sender.objects.using(using)
+        instance._cleared_links = set(
+            links.filter(label=instance).values_list('task_id', flat=True)
+            if reverse else
+            links.filter(task=instance).values_list('label_id', flat=True)
+        )
+        return
+    if action == 'post_clear':
+        action, pk_set = 'post_remove', instance.__dict__.pop(
+            '_cleared_links', set()
+        )
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+    side = 'added' if action == 'post_add' else 'removed'
+    if reverse:
+        entries = [
+            history.label_changes(task_id, **{side: [instance.pk]})
+            for task_id in sorted(pk_set)
+        ]
+    else:
+        entries = [history.label_changes(instance.pk, **{side: pk_set})]
+    history.record(entries, using)
+
+
+# ===== Живые обновления списка задач (events.py) =====
+
+@receiver(post_save, sender=Task)
+@skip_in_bulk
+def publish_task_saved(sender, instance, created, using, **kwargs):
+    events.publish_on_commit(
+        [instance.pk], events.CREATED if created else events.UPDATED, using
+    )
+
+
+@receiver(post_delete, sender=Task)
+@skip_in_bulk
+def publish_task_deleted(sender, instance, using, **kwargs):
+    events.publish_on_commit([instance.pk], events.DELETED, using)
+
+
+@receiver(m2m_changed, sender=Task.labels.through)
+def publish_task_labels(sender, instance, action, reverse, pk_set, using,
+                        **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        events.publish_on_commit([instance.pk], events.UPDATED, using)
+    elif pk_set:
+        events.publish_on_commit(pk_set, events.UPDATED, using)
+    # label.tasks.clear(): задачи уже не узнать, как и в
+    # invalidate_task_labels; подписчики увидят это при перезагрузке
+
+
+# ===== Версии таблиц для условных GET (conditional.py) =====
+
+TABLE_NAMES = {
+    Task: conditional.TASK,
+    Status: conditional.STATUS,
+    Label: conditional.LABEL,
+    User: conditional.USER,
+}
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+@receiver(post_save, sender=Status)
+@receiver(post_delete, sender=Status)
+@receiver(post_save, sender=Label)
+@receiver(post_delete, sender=Label)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@skip_in_bulk
+def bump_table_version(sender, using, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    conditional.bump_tables([TABLE_NAMES[sender]], using)
+
+
+@receiver(m2m_changed, sender=Task.labels.through)
+def bump_task_labels_version(sender, action, using, **kwargs):
+    if action.startswith('post_'):
+        conditional.bump_tables([conditional.TASK], using)
+
+
+def install_search_index(sender, using, **kwargs):
+    # Пересоздание таблицы при миграциях SQLite уносит с собой триггеры
+    # FTS5, поэтому после каждого migrate проверяем, что они на месте.
+    from django.db import connections
+
+    connection = connections[using]
+    with connection.schema_editor() as schema_editor:
+        get_search_backend(connection).install(schema_editor)
+
+
+# ===== Учёт SQL-запросов для RequestMetricsMiddleware =====
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
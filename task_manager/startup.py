@@ -0,0 +1,127 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# целевое время от запуска интерпретатора до первого ответа воркера;
+# проверяется тестом test_startup.py
+STARTUP_BUDGET_SECONDS = 1.5
+
+# модули, которые не должны загружаться при старте воркера
+DEFERRED_MODULES = ('rollbar', 'dotenv', 'dj_database_url')
+
+_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+import importlib
+from wsgiref.util import setup_testing_defaults
+module = importlib.import_module({module!r})
+imported = time.perf_counter()
+
+environ = {{'PATH_INFO': {path!r}, 'REQUEST_METHOD': 'GET'}}
+setup_testing_defaults(environ)
+status = []
+body = module.application(
+    environ, lambda code, headers, exc_info=None: status.append(code)
+)
+size = sum(len(chunk) for chunk in body)
+getattr(body, 'close', lambda: None)()
+finished = time.perf_counter()
+
+print(json.dumps({{
+    'import_seconds': imported - started,
+    'first_response_seconds': finished - started,
+    'status': status[0],
+    'size': size,
+    'modules': sorted(sys.modules),
+}}))
+"""
+
+
+def warm_templates(directory='task_manager'):
+    """
+    Компилирует все шаблоны из templates/<directory>/ в кэш
+    загрузчика, чтобы первый запрос к каждой странице не читал файлы
+    с диска. С TEMPLATE_AUTORELOAD кэша нет, и прогревать нечего.
+    Возвращает имена прогретых шаблонов.
+    """
+    from django.conf import settings
+    from django.template.loader import get_template
+
+    if settings.TEMPLATE_AUTORELOAD:
+        return []
+    names = template_names(directory)
+    for name in names:
+        get_template(name)
+    return names
+
+
+def template_names(directory='task_manager'):
+    root = BASE_DIR / 'templates'
+    return sorted(
+        path.relative_to(root).as_posix()
+        for path in (root / directory).rglob('*.html')
+    )
+
+
+def measure_startup(module='task_manager.wsgi', path='/login/',
+                    importtime=False, env=None):
+    """
+    Запускает чистый интерпретатор, импортирует WSGI-модуль и отдаёт
+    первый запрос на path. Возвращает время импорта, время до первого
+    ответа, загруженные модули и, при importtime=True, разбор вывода
+    python -X importtime.
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', _SCRIPT.format(module=module, path=path)]
+
+    process_env = dict(os.environ if env is None else env)
+    process_env.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
+    result = subprocess.run(
+        command,
+        cwd=BASE_DIR,
+        env=process_env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    if importtime:
+        report['imports'] = parse_importtime(result.stderr)
+    return report
+
+
+def parse_importtime(output):
+    """
+    Строки вида «import time: self [us] | cumulative | module»
+    превращаются в список словарей со временем в миллисекундах.
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        imports.append({
+            'module': name.strip(),
+            'depth': (len(name) - len(name.lstrip()) - 1) // 2,
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+        })
+    return imports
+
+
+def by_package(imports):
+    totals = defaultdict(float)
+    for item in imports:
+        totals[item['module'].split('.')[0]] += item['self_ms']
+    return sorted(totals.items(), key=lambda item: -item[1])
@@ -0,0 +1,141 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from task_manager import conditional
+from task_manager.models import Label, Status, Task
+
+
+class TaskApiTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        self.status = Status.objects.create(name='New')
+        self.other_status = Status.objects.create(name='Done')
+        self.label = Label.objects.create(name='bug')
+
+        self.task = Task.objects.create(
+            name='Task A',
+            description='Some description',
+            status=self.status,
+            author=self.user,
+        )
+        self.task.labels.add(self.label)
+        self.other_task = Task.objects.create(
+            name='Task B',
+            status=self.other_status,
+            author=self.user,
+            executor=self.user,
+        )
+        self.client.login(username='tester', password='pass123')
+
+    def get_json(self, url, **extra):
+        response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, json.loads(b''.join(response.streaming_content))
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        response = self.client.get(reverse('api_task_list'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_full_task_representation(self):
+        _, data = self.get_json(reverse('api_task_list'))
+        task = data['results'][1]
+
+        self.assertEqual(task['name'], 'Task A')
+        self.assertEqual(
+            task['status'], {'id': self.status.id, 'name': 'New'}
+        )
+        self.assertIsNone(task['executor'])
+        self.assertEqual(task['author']['name'], 'tester')
+        self.assertEqual(
+            task['labels'], [{'id': self.label.id, 'name': 'bug'}]
+        )
+        self.assertIsNone(data['next'])
+
+    def test_sparse_fieldset_selects_only_requested_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            _, data = self.get_json(
+                reverse('api_task_list') + '?fields=id,name'
+            )
+
+        self.assertEqual(set(data['results'][0]), {'id', 'name'})
+        sql = queries[-1]['sql']
+        self.assertIn('"name"', sql)
+        self.assertNotIn('description', sql)
+        self.assertNotIn('auth_user', sql)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(
+            reverse('api_task_list') + '?fields=id,password'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_filters_are_shared_with_task_list(self):
+        _, data = self.get_json(
+            reverse('api_task_list') + f'?status={self.other_status.id}'
+        )
+        self.assertEqual(
+            [task['id'] for task in data['results']], [self.other_task.id]
+        )
+
+    def test_cursor_pagination(self):
+        _, first = self.get_json(reverse('api_task_list') + '?limit=1')
+        self.assertEqual(len(first['results']), 1)
+        self.assertIsNotNone(first['next'])
+
+        _, second = self.get_json(
+            reverse('api_task_list') + f'?limit=1&cursor={first["next"]}'
+        )
+        self.assertEqual(len(second['results']), 1)
+        self.assertNotEqual(first['results'], second['results'])
+        self.assertIsNone(second['next'])
+
+    def test_etag_and_if_none_match(self):
+        response, _ = self.get_json(reverse('api_task_list'))
+        etag = response['ETag']
+
+        # сессия, пользователь и версии таблиц — без самого списка
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse('api_task_list'), HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+
+        # версия в БД, а не в кэше процесса: запись в другом воркере
+        # тоже меняет ETag
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            conditional.bump_tables([conditional.STATUS])
+        response = self.client.get(
+            reverse('api_task_list'), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_task.labels.add(self.label)
+        response, _ = self.get_json(
+            reverse('api_task_list'), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_reference_lists(self):
+        _, data = self.get_json(reverse('api_status_list'))
+        self.assertEqual(
+            [status['name'] for status in data['results']], ['New', 'Done']
+        )
+
+        _, data = self.get_json(reverse('api_user_list') + '?fields=username')
+        self.assertEqual(data['results'], [{'username': 'tester'}])
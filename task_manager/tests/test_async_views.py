@@ -0,0 +1,111 @@
+import re
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import path, reverse
+
+from task_manager import urls, views
+from task_manager.benchmarks import AsyncInProcessClient
+from task_manager.models import Label, Status, Task
+
+
+# urls.py выбирает представления при импорте по ASYNC_VIEWS,
+# поэтому для тестов асинхронные подключаются отдельным urlconf
+urlpatterns = [
+    path('tasks/', views.AsyncTaskListView.as_view(), name='task_list'),
+    path(
+        'tasks/<int:pk>/',
+        views.AsyncTaskDetailView.as_view(),
+        name='task_detail',
+    ),
+] + [
+    pattern for pattern in urls.urlpatterns
+    if getattr(pattern, 'name', None) not in ('task_list', 'task_detail')
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncTaskViewsTests(TestCase):
+
+    # столько же, сколько у синхронного TaskListView с тёплым кэшем
+    QUERY_BUDGET = 5
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        self.status = Status.objects.create(name='New')
+        self.other_status = Status.objects.create(name='Done')
+        label = Label.objects.create(name='bug')
+        self.task = Task.objects.create(
+            name='First task', status=self.status, author=self.user
+        )
+        self.task.labels.add(label)
+        Task.objects.create(
+            name='Second task', status=self.other_status, author=self.user
+        )
+        self.async_client.force_login(self.user)
+
+    async def test_list_renders_filtered_tasks(self):
+        response = await self.async_client.get(
+            reverse('task_list'), {'status': self.status.pk}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'First task')
+        self.assertNotContains(response, 'Second task')
+        self.assertContains(response, 'bug')
+
+    async def test_list_redirects_anonymous(self):
+        await self.async_client.alogout()
+        response = await self.async_client.get(reverse('task_list'))
+        self.assertRedirects(
+            response, reverse('login'), fetch_redirect_response=False
+        )
+
+    async def test_detail(self):
+        response = await self.async_client.get(
+            reverse('task_detail', args=[self.task.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'First task')
+
+        response = await self.async_client.get(
+            reverse('task_detail', args=[self.task.pk + 100])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_stays_within_sync_query_budget(self):
+        # assertNumQueries нельзя открыть внутри цикла событий
+        get = async_to_sync(self.async_client.get)
+        get(reverse('task_list'))
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            get(reverse('task_list'))
+
+    async def test_unchanged_detail_answers_304(self):
+        url = reverse('task_detail', args=[self.task.pk])
+        response = await self.async_client.get(url)
+        again = await self.async_client.get(
+            url, headers={'If-None-Match': response['ETag']}
+        )
+        self.assertEqual(again.status_code, 304)
+
+    async def test_server_timing_counts_async_queries(self):
+        response = await self.async_client.get(reverse('task_list'))
+        timing = response['Server-Timing']
+        queries = int(re.search(r'desc="(\d+) queries"', timing).group(1))
+        self.assertGreater(queries, 0)
+
+    async def test_benchmark_client(self):
+        client = await sync_to_async(AsyncInProcessClient)(
+            self.user, isolate_threads=False
+        )
+        status, elapsed, queries = await client.request(
+            'GET', reverse('task_list'), None
+        )
+        self.assertEqual(status, 200)
+        self.assertGreater(elapsed, 0)
+        self.assertGreater(queries, 0)
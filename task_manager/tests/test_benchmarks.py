@@ -0,0 +1,97 @@
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from task_manager.benchmarks import (
+    BenchContext,
+    InProcessClient,
+    bench_username,
+    compare,
+    generate_data,
+    percentile,
+    run_benchmarks,
+)
+from task_manager.models import Label, Status, Task
+
+
+class BenchmarkTests(TestCase):
+
+    def setUp(self):
+        generate_data(users=3, statuses=2, labels=4, tasks=30)
+
+    def test_generated_data(self):
+        self.assertEqual(
+            User.objects.filter(username__startswith='bench').count(), 3
+        )
+        self.assertEqual(Status.objects.count(), 2)
+        self.assertEqual(Task.objects.count(), 30)
+        self.assertEqual(Task.labels.through.objects.count(), 60)
+        self.assertTrue(
+            self.client.login(
+                username=bench_username(0), password='bench-password'
+            )
+        )
+
+    def test_all_scenarios_succeed_in_process(self):
+        context = BenchContext(bench_username(0))
+        results = run_benchmarks(
+            [InProcessClient(context.user)], context,
+            requests=3, warmup=1,
+        )
+
+        for name, stats in results.items():
+            self.assertEqual(stats['errors'], 0, name)
+            self.assertEqual(stats['requests'], 3)
+            self.assertGreater(stats['queries'], 0)
+            self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+        # задачи, созданные сценариями, удалены
+        self.assertEqual(Task.objects.count(), 30)
+        self.assertEqual(Label.objects.count(), 4)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+
+    def test_compare_flags_regressions(self):
+        baseline = {'scenarios': {
+            'task_list': {'p95_ms': 10.0, 'queries': 4.0},
+            'user_list': {'p95_ms': 10.0, 'queries': 3.0},
+        }}
+        report = {'scenarios': {
+            'task_list': {'p95_ms': 15.0, 'queries': 4.0},
+            'user_list': {'p95_ms': 10.5, 'queries': 5.0},
+            'task_detail': {'p95_ms': 99.0, 'queries': 9.0},
+        }}
+        regressions = compare(report, baseline, threshold=0.2)
+
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('task_list: p95'))
+        self.assertIn('user_list: запросов к БД 3.0 -> 5.0', regressions)
+
+    def test_command_saves_and_checks_baseline(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / 'baseline.json'
+            call_command(
+                'run_benchmarks', '--scenario', 'task_list',
+                '--requests', '2', '--warmup', '0', '--save', str(path),
+                stdout=io.StringIO(),
+            )
+            report = json.loads(path.read_text(encoding='utf-8'))
+            self.assertEqual(list(report['scenarios']), ['task_list'])
+            self.assertEqual(report['meta']['tasks'], 30)
+
+            report['scenarios']['task_list']['queries'] = 1
+            path.write_text(json.dumps(report), encoding='utf-8')
+            with self.assertRaises(CommandError):
+                call_command(
+                    'run_benchmarks', '--scenario', 'task_list',
+                    '--requests', '2', '--warmup', '0',
+                    '--baseline', str(path), stdout=io.StringIO(),
+                )
@@ -0,0 +1,138 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from task_manager import bulk
+from task_manager.forms import TaskBulkForm
+from task_manager.models import Label, Status, Task, UserTaskStats
+
+
+class TaskBulkTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        self.other = User.objects.create_user(
+            username='other',
+            password='pass123'
+        )
+        self.new = Status.objects.create(name='New')
+        self.done = Status.objects.create(name='Done')
+        self.bug = Label.objects.create(name='bug')
+        self.urgent = Label.objects.create(name='urgent')
+        self.tasks = [
+            Task.objects.create(
+                name=f'Task {i}', status=self.new, author=self.user
+            )
+            for i in range(5)
+        ]
+        self.foreign = Task.objects.create(
+            name='Foreign', status=self.new, author=self.other,
+            executor=self.other,
+        )
+        self.url = reverse('task_bulk')
+        self.client.login(username='tester', password='pass123')
+
+    def post(self, action, tasks, **data):
+        return self.client.post(self.url, {
+            'action': action,
+            'tasks': [task.pk for task in tasks],
+            **data,
+        }, follow=True)
+
+    def refresh(self, *objects):
+        for obj in objects:
+            obj.refresh_from_db()
+
+    def test_set_status_with_one_update(self):
+        tasks = self.tasks + [self.foreign]
+        url = reverse('task_list')
+        listing = self.client.get(url)
+        # точка сохранения, чтение состояния, UPDATE задач, по UPDATE на
+        # каждый затронутый счётчик, после фиксации история и версия
+        # таблицы — сколько бы ни было задач
+        with self.assertNumQueries(8) as context, \
+                self.captureOnCommitCallbacks(execute=True):
+            bulk.set_status([task.pk for task in tasks], self.done)
+        updates = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "task_manager_task"')
+        ]
+        self.assertEqual(len(updates), 1)
+
+        self.refresh(self.new, self.done)
+        self.assertEqual((self.new.task_count, self.done.task_count), (0, 6))
+        self.assertEqual(Task.objects.filter(status=self.done).count(), 6)
+        # список задач больше не отвечает 304
+        again = self.client.get(url, HTTP_IF_NONE_MATCH=listing['ETag'])
+        self.assertEqual(again.status_code, 200)
+
+    def test_set_and_clear_executor(self):
+        response = self.post(
+            'executor', self.tasks[:3], executor=self.other.pk
+        )
+        self.assertContains(response, 'Изменено задач: 3')
+        stats = UserTaskStats.objects.get(pk=self.other.pk)
+        self.assertEqual(stats.assigned_count, 4)
+
+        self.post('executor', self.tasks[:3])
+        stats.refresh_from_db()
+        self.assertEqual(stats.assigned_count, 1)
+        self.assertFalse(
+            Task.objects.filter(pk__in=[t.pk for t in self.tasks])
+            .exclude(executor=None).exists()
+        )
+
+    def test_add_and_remove_labels(self):
+        self.tasks[0].labels.add(self.bug)
+        response = self.post(
+            'add_labels', self.tasks, labels=[self.bug.pk, self.urgent.pk]
+        )
+        # у первой задачи новая связь только одна
+        self.assertContains(response, 'Изменено задач: 5')
+        self.refresh(self.bug, self.urgent)
+        self.assertEqual((self.bug.task_count, self.urgent.task_count),
+                         (5, 5))
+
+        self.post('remove_labels', self.tasks[:2], labels=[self.bug.pk])
+        self.refresh(self.bug, self.urgent)
+        self.assertEqual((self.bug.task_count, self.urgent.task_count),
+                         (3, 5))
+        self.assertEqual(self.tasks[0].labels.get(), self.urgent)
+
+    def test_delete_only_own_tasks(self):
+        self.tasks[0].labels.add(self.bug)
+        response = self.post('delete', self.tasks[:2] + [self.foreign])
+        self.assertContains(response, 'Удалено задач: 2')
+        self.assertContains(response, 'Чужие задачи не удалены: 1')
+
+        self.assertTrue(Task.objects.filter(pk=self.foreign.pk).exists())
+        self.assertEqual(Task.objects.count(), 4)
+        self.refresh(self.new, self.bug)
+        self.assertEqual(self.new.task_count, 4)
+        self.assertEqual(self.bug.task_count, 0)
+        stats = UserTaskStats.objects.get(pk=self.user.pk)
+        self.assertEqual(stats.authored_count, 3)
+
+    def test_invalid_form(self):
+        response = self.post('status', self.tasks)
+        self.assertContains(response, 'Выберите статус')
+        response = self.post('add_labels', [])
+        self.assertEqual(Task.objects.filter(labels__isnull=False).count(), 0)
+        self.assertEqual(len(response.context['messages']), 2)
+
+    def test_malformed_task_ids_are_rejected(self):
+        for pk in ('²', '١', '99999999999999999999', '0', '-1', 'x'):
+            with self.subTest(pk=pk):
+                form = TaskBulkForm({'action': 'delete', 'tasks': [pk]})
+                self.assertFalse(form.is_valid())
+                self.assertIn('tasks', form.errors)
+        self.assertEqual(Task.objects.count(), 6)
+
+    def test_list_rows_have_checkboxes(self):
+        response = self.client.get(reverse('task_list'))
+        self.assertContains(response, 'form="bulk-form"', count=6)
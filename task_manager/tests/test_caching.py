@@ -0,0 +1,88 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from task_manager import caching
+from task_manager.models import Label, Status, Task
+
+
+class TaskRowCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        self.status_a = Status.objects.create(name='Status A')
+        self.status_b = Status.objects.create(name='Status B')
+        self.label = Label.objects.create(name='bug')
+
+        self.task_a = Task.objects.create(
+            name='Task A', status=self.status_a, author=self.user
+        )
+        self.task_b = Task.objects.create(
+            name='Task B', status=self.status_b, author=self.user
+        )
+        self.client.login(username='tester', password='pass123')
+
+    def rendered_rows(self):
+        with mock.patch.object(
+            caching, 'render_to_string', wraps=caching.render_to_string
+        ) as render:
+            response = self.client.get(reverse('task_list'))
+        self.assertEqual(response.status_code, 200)
+        return response, [
+            call.args[1]['task'].pk for call in render.call_args_list
+        ]
+
+    def test_warm_cache_renders_no_rows(self):
+        _, rendered = self.rendered_rows()
+        self.assertCountEqual(rendered, [self.task_a.pk, self.task_b.pk])
+
+        response, rendered = self.rendered_rows()
+        self.assertEqual(rendered, [])
+        self.assertContains(response, 'Task A')
+
+    def test_status_rename_busts_only_its_rows(self):
+        self.rendered_rows()
+
+        self.status_a.name = 'Renamed'
+        self.status_a.save()
+
+        response, rendered = self.rendered_rows()
+        self.assertEqual(rendered, [self.task_a.pk])
+        self.assertContains(response, 'Renamed')
+
+    def test_label_changes_bust_the_task_row(self):
+        self.rendered_rows()
+
+        self.task_b.labels.add(self.label)
+        response, rendered = self.rendered_rows()
+        self.assertEqual(rendered, [self.task_b.pk])
+
+        self.label.name = 'critical'
+        self.label.save()
+        response, rendered = self.rendered_rows()
+        self.assertEqual(rendered, [self.task_b.pk])
+        self.assertContains(response, 'critical')
+
+    def test_last_login_does_not_bust_rows(self):
+        self.rendered_rows()
+        self.client.logout()
+        self.client.login(username='tester', password='pass123')
+
+        _, rendered = self.rendered_rows()
+        self.assertEqual(rendered, [])
+
+    def test_rows_differ_for_author_and_other_users(self):
+        self.rendered_rows()
+        User.objects.create_user(username='other', password='pass123')
+        self.client.login(username='other', password='pass123')
+
+        response, rendered = self.rendered_rows()
+        self.assertEqual(len(rendered), 2)
+        self.assertNotContains(response, 'Delete')
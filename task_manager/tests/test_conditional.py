@@ -0,0 +1,152 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from task_manager import conditional
+from task_manager.models import Label, Status, Task
+
+
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        self.other = User.objects.create_user(
+            username='other',
+            password='pass123'
+        )
+        self.status = Status.objects.create(name='New')
+        self.label = Label.objects.create(name='bug')
+        self.task = Task.objects.create(
+            name='Task', status=self.status, author=self.user
+        )
+        self.client.login(username='tester', password='pass123')
+
+    def revalidate(self, url, response):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_unchanged_list_is_not_rendered(self):
+        url = reverse('task_list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+        # сессия, пользователь, версии таблиц — без списка задач
+        with self.assertNumQueries(3):
+            again = self.revalidate(url, response)
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b'')
+        self.assertFalse(again.templates)
+
+    def test_if_modified_since(self):
+        url = reverse('task_detail', args=[self.task.pk])
+        response = self.client.get(url)
+        again = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(again.status_code, 304)
+
+    def test_changes_invalidate(self):
+        url = reverse('task_list')
+        changes = [
+            lambda: Task.objects.create(
+                name='Another', status=self.status, author=self.user
+            ),
+            lambda: self.task.labels.add(self.label),
+            lambda: Status.objects.filter(pk=self.status.pk).first().save(),
+            lambda: Label.objects.get(pk=self.label.pk).delete(),
+            lambda: User.objects.create_user(username='new'),
+        ]
+        for change in changes:
+            response = self.client.get(url)
+            # версии таблиц сдвигаются после фиксации транзакции
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            self.assertEqual(self.revalidate(url, response).status_code, 200)
+
+    def test_status_list_follows_task_counts(self):
+        url = reverse('status_list')
+        response = self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(
+                name='Another', status=self.status, author=self.user
+            )
+        again = self.revalidate(url, response)
+        self.assertEqual(again.status_code, 200)
+        self.assertContains(again, '<td>2</td>', html=True)
+
+    def test_etag_depends_on_user_and_query(self):
+        url = reverse('task_list') + '?only_my=on'
+        mine = self.client.get(url)
+        self.assertNotEqual(
+            mine['ETag'], self.client.get(reverse('task_list'))['ETag']
+        )
+
+        self.client.login(username='other', password='pass123')
+        self.assertEqual(self.revalidate(url, mine).status_code, 200)
+
+    def test_pending_messages_are_not_hidden_by_304(self):
+        url = reverse('status_list')
+        response = self.client.get(url)
+        # сообщение без изменения таблиц: отказ в удалении
+        self.client.post(reverse('status_delete', args=[self.status.pk]))
+
+        again = self.revalidate(url, response)
+        self.assertEqual(again.status_code, 200)
+        self.assertContains(again, 'используется')
+        # страницу с сообщением браузер не должен переиспользовать
+        self.assertNotIn('ETag', again)
+        self.assertEqual(self.revalidate(url, response).status_code, 304)
+
+    def test_anonymous_user_list(self):
+        self.client.logout()
+        url = reverse('user_list')
+        response = self.client.get(url)
+        self.assertEqual(self.revalidate(url, response).status_code, 304)
+
+
+class TableVersionBumpTests(TestCase):
+
+    def version(self):
+        return conditional.get_table_versions([conditional.TASK])[
+            conditional.TASK
+        ].version
+
+    def test_bumps_wait_for_commit_and_are_merged(self):
+        user = User.objects.create_user(username='tester')
+        status = Status.objects.create(name='New')
+        before = self.version()
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    for i in range(3):
+                        Task.objects.create(
+                            name=f'Task {i}', status=status, author=user
+                        )
+                    # внутри транзакции строку версий никто не трогал
+                    self.assertEqual(self.version(), before)
+        self.assertEqual(self.version(), before + 1)
+        bumps = [
+            query for query in queries
+            if query['sql'].startswith('UPDATE "task_manager_tableversion"')
+        ]
+        self.assertEqual(len(bumps), 1)
+
+    def test_rolled_back_transaction_does_not_lose_later_bumps(self):
+        before = self.version()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    conditional.bump_tables([conditional.TASK])
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            conditional.bump_tables([conditional.TASK])
+        self.assertEqual(self.version(), before + 1)
@@ -0,0 +1,309 @@
+import io
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from task_manager.importer import TaskImporter
+from task_manager.models import Label, Status, Task, UserTaskStats
+
+
+class TaskCountersTests(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username='author',
+            password='pass123'
+        )
+        self.executor = User.objects.create_user(
+            username='executor',
+            password='pass123'
+        )
+        self.new = Status.objects.create(name='New')
+        self.done = Status.objects.create(name='Done')
+
+    def assertCounters(self, statuses, assigned, authored):
+        self.assertEqual(
+            {
+                status.name: status.task_count
+                for status in Status.objects.all()
+            },
+            statuses,
+        )
+        stats = {s.user.username: s for s in UserTaskStats.objects.all()}
+        self.assertEqual(
+            {name: s.assigned_count for name, s in stats.items()
+             if s.assigned_count},
+            assigned,
+        )
+        self.assertEqual(
+            {name: s.authored_count for name, s in stats.items()
+             if s.authored_count},
+            authored,
+        )
+
+    def create_task(self, **kwargs):
+        return Task.objects.create(
+            name='Task', status=self.new, author=self.author, **kwargs
+        )
+
+    def test_create(self):
+        self.create_task(executor=self.executor)
+        self.create_task()
+        self.assertCounters(
+            {'New': 2, 'Done': 0}, {'executor': 1}, {'author': 2}
+        )
+
+    def test_status_and_executor_change(self):
+        task = self.create_task(executor=self.executor)
+
+        task = Task.objects.get(pk=task.pk)
+        task.status = self.done
+        task.executor = self.author
+        task.save()
+        self.assertCounters(
+            {'New': 0, 'Done': 1}, {'author': 1}, {'author': 1}
+        )
+
+        # повторное сохранение без изменений ничего не сдвигает
+        task.save()
+        self.assertCounters(
+            {'New': 0, 'Done': 1}, {'author': 1}, {'author': 1}
+        )
+
+    def test_update_fields_ignore_unsaved_changes(self):
+        task = self.create_task()
+        task.status = self.done
+        task.name = 'Renamed'
+        task.save(update_fields=['name'])
+        self.assertCounters({'New': 1, 'Done': 0}, {}, {'author': 1})
+
+    def test_instance_without_loaded_state(self):
+        task = self.create_task()
+        Task(
+            pk=task.pk, name='Task', status=self.done, author=self.author,
+            created_at=task.created_at,
+        ).save()
+        self.assertCounters({'New': 0, 'Done': 1}, {}, {'author': 1})
+
+    def test_delete(self):
+        task = self.create_task(executor=self.executor)
+        self.create_task(executor=self.executor)
+        task.delete()
+        self.assertCounters(
+            {'New': 1, 'Done': 0}, {'executor': 1}, {'author': 1}
+        )
+
+        Task.objects.all().delete()
+        self.assertCounters({'New': 0, 'Done': 0}, {}, {})
+
+    def test_drifted_counters_do_not_go_negative(self):
+        task = self.create_task(executor=self.executor)
+        task.labels.add(Label.objects.create(name='bug'))
+        Status.objects.update(task_count=0)
+        UserTaskStats.objects.update(assigned_count=0, authored_count=0)
+        Label.objects.update(task_count=0)
+
+        task.delete()
+        self.assertCounters({'New': 0, 'Done': 0}, {}, {})
+        self.assertEqual(Label.objects.get().task_count, 0)
+
+    def test_import_updates_counters(self):
+        TaskImporter().run([
+            {'name': 'A', 'status': 'Done', 'author': 'author',
+             'executor': 'executor', 'labels': []},
+            {'name': 'B', 'status': 'Done', 'author': 'executor',
+             'executor': '', 'labels': []},
+        ])
+        self.assertCounters(
+            {'New': 0, 'Done': 2},
+            {'executor': 1},
+            {'author': 1, 'executor': 1},
+        )
+
+    def test_rebuild_command(self):
+        self.create_task(executor=self.executor)
+        self.create_task()
+        # правки в обход save() счётчики не видят
+        Task.objects.update(status=self.done, executor=self.author)
+        UserTaskStats.objects.all().delete()
+
+        out = io.StringIO()
+        call_command('rebuild_task_counters', stdout=out)
+        self.assertIn('Исправлено счётчиков: 3', out.getvalue())
+        self.assertCounters(
+            {'New': 0, 'Done': 2}, {'author': 2}, {'author': 2}
+        )
+
+        out = io.StringIO()
+        call_command('rebuild_task_counters', stdout=out)
+        self.assertIn('Исправлено счётчиков: 0', out.getvalue())
+
+
+class LabelCountersTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        self.status = Status.objects.create(name='New')
+        self.bug = Label.objects.create(name='bug')
+        self.urgent = Label.objects.create(name='urgent')
+        self.tasks = [
+            Task.objects.create(
+                name=f'Task {i}', status=self.status, author=self.user
+            )
+            for i in range(3)
+        ]
+
+    def assertLabelCounts(self, bug, urgent):
+        self.bug.refresh_from_db()
+        self.urgent.refresh_from_db()
+        self.assertEqual((self.bug.task_count, self.urgent.task_count),
+                         (bug, urgent))
+
+    def test_add_remove_from_both_sides(self):
+        first, second, third = self.tasks
+        first.labels.add(self.bug, self.urgent)
+        # повторное добавление связи не считается
+        first.labels.add(self.bug)
+        self.bug.tasks.add(second, third)
+        self.assertLabelCounts(3, 1)
+
+        first.labels.remove(self.bug)
+        self.assertLabelCounts(2, 1)
+        first.labels.set([self.bug])
+        self.assertLabelCounts(3, 0)
+
+        self.bug.tasks.clear()
+        self.assertLabelCounts(0, 0)
+
+    def test_task_delete_releases_labels(self):
+        for task in self.tasks:
+            task.labels.add(self.bug)
+        self.tasks[0].delete()
+        self.assertLabelCounts(2, 0)
+        Task.objects.all().delete()
+        self.assertLabelCounts(0, 0)
+
+    def test_import_counts_labels(self):
+        TaskImporter().run([
+            {'name': 'A', 'status': 'New', 'author': 'tester',
+             'labels': ['bug', 'urgent']},
+            {'name': 'B', 'status': 'New', 'author': 'tester',
+             'labels': ['bug']},
+        ])
+        self.assertLabelCounts(2, 1)
+
+    def test_rebuild_fixes_labels(self):
+        self.tasks[0].labels.add(self.bug)
+        Label.objects.update(task_count=7)
+        call_command('rebuild_task_counters', stdout=io.StringIO())
+        self.assertLabelCounts(1, 0)
+
+
+class ProtectedDeleteTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        self.executor = User.objects.create_user(
+            username='executor',
+            password='pass123'
+        )
+        self.status = Status.objects.create(name='Used')
+        self.label = Label.objects.create(name='used')
+        task = Task.objects.create(
+            name='Task', status=self.status, author=self.user,
+            executor=self.executor,
+        )
+        task.labels.add(self.label)
+        self.client.login(username='tester', password='pass123')
+
+    def assertRefused(self, url, model, pk):
+        response = self.client.post(url, follow=True)
+        self.assertTrue(model.objects.filter(pk=pk).exists())
+        self.assertIn('используется', ' '.join(
+            str(message) for message in response.context['messages']
+        ))
+        return response
+
+    def test_status_in_use(self):
+        self.assertRefused(
+            reverse('status_delete', args=[self.status.pk]),
+            Status, self.status.pk,
+        )
+
+    def test_status_refused_by_counter_without_collector(self):
+        url = reverse('status_delete', args=[self.status.pk])
+        # сессия, пользователь, статус — и ни одного запроса к задачам
+        with self.assertNumQueries(3) as context:
+            self.client.post(url)
+        self.assertFalse(any(
+            'task_manager_task' in query['sql']
+            for query in context.captured_queries
+        ))
+
+    def test_label_in_use(self):
+        self.assertRefused(
+            reverse('label_delete', args=[self.label.pk]),
+            Label, self.label.pk,
+        )
+
+    def test_unused_label_is_deleted(self):
+        unused = Label.objects.create(name='unused')
+        self.client.post(reverse('label_delete', args=[unused.pk]))
+        self.assertFalse(Label.objects.filter(pk=unused.pk).exists())
+
+    def test_author_and_executor_cannot_be_deleted(self):
+        self.assertRefused(
+            reverse('user_delete', args=[self.user.pk]), User, self.user.pk,
+        )
+        self.client.login(username='executor', password='pass123')
+        self.assertRefused(
+            reverse('user_delete', args=[self.executor.pk]),
+            User, self.executor.pk,
+        )
+
+    def test_lists_show_usage(self):
+        response = self.client.get(reverse('status_list'))
+        self.assertContains(response, '<td>1</td>', html=True)
+        response = self.client.get(reverse('label_list'))
+        self.assertContains(response, '<td>1</td>', html=True)
+
+
+class DashboardTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        self.status = Status.objects.create(name='In progress')
+
+    def test_anonymous_sees_welcome_page(self):
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, 'Welcome to Task Manager!')
+
+    def test_counts_without_scanning_tasks(self):
+        self.client.login(username='tester', password='pass123')
+        for _ in range(3):
+            Task.objects.create(
+                name='Task', status=self.status, author=self.user,
+                executor=self.user,
+            )
+
+        # сессия, пользователь, статусы, исполнители, свои счётчики
+        with self.assertNumQueries(5) as context:
+            response = self.client.get(reverse('home'))
+        self.assertFalse(any(
+            'task_manager_task"' in query['sql']
+            for query in context.captured_queries
+        ))
+        self.assertEqual(response.context['total_tasks'], 3)
+        self.assertEqual(response.context['my_stats'].assigned_count, 3)
+        self.assertContains(response, 'In progress')
@@ -0,0 +1,171 @@
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+
+from task_manager.error_reporting import (
+    ErrorReporter,
+    ErrorReportingMiddleware,
+    FileSink,
+    RollbarSink,
+)
+
+
+class MemorySink:
+
+    def __init__(self, delay=0):
+        self.batches = []
+        self.delay = delay
+
+    def send(self, events):
+        time.sleep(self.delay)
+        self.batches.append(list(events))
+
+    @property
+    def events(self):
+        return [event for batch in self.batches for event in batch]
+
+
+class BrokenSink:
+
+    def send(self, events):
+        raise ConnectionError('no network')
+
+
+def exc_info(error_class=ValueError, message='boom'):
+    try:
+        raise error_class(message)
+    except Exception:
+        return sys.exc_info()
+
+
+def error_classes(count):
+    return [type(f'Error{i}', (Exception,), {}) for i in range(count)]
+
+
+class ErrorReporterTests(TestCase):
+
+    def test_repeated_errors_are_deduplicated(self):
+        sink = MemorySink()
+        reporter = ErrorReporter(sink)
+        with mock.patch.object(reporter, 'ensure_thread'):
+            for _ in range(3):
+                reporter.report(exc_info())
+            reporter.report(exc_info(KeyError))
+        reporter.flush()
+
+        events = sink.events
+        self.assertEqual(len(events), 2)
+        self.assertEqual(events[0]['exception'], 'ValueError')
+        self.assertEqual(events[0]['occurrences'], 3)
+        self.assertIn('raise error_class(message)', events[0]['traceback'])
+
+    def test_full_queue_drops_and_counts(self):
+        sink = MemorySink()
+        reporter = ErrorReporter(sink, max_queue=2)
+        with mock.patch.object(reporter, 'ensure_thread'):
+            for error_class in error_classes(5):
+                reporter.report(exc_info(error_class))
+        self.assertEqual(reporter.dropped, 3)
+        reporter.flush()
+
+        events = sink.events
+        self.assertEqual(len(events), 3)
+        self.assertEqual(events[-1]['dropped'], 3)
+
+    def test_events_are_sent_in_batches(self):
+        sink = MemorySink()
+        reporter = ErrorReporter(sink, batch_size=2)
+        with mock.patch.object(reporter, 'ensure_thread'):
+            for error_class in error_classes(5):
+                reporter.report(exc_info(error_class))
+        reporter.flush()
+
+        self.assertEqual([len(batch) for batch in sink.batches], [2, 2, 1])
+
+    def test_fallback_to_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / 'errors.ndjson'
+            reporter = ErrorReporter(BrokenSink(), fallback=FileSink(path))
+            with mock.patch.object(reporter, 'ensure_thread'):
+                reporter.report(exc_info())
+            with self.assertLogs('task_manager.errors', 'ERROR'):
+                reporter.flush()
+
+            lines = path.read_text(encoding='utf-8').splitlines()
+            self.assertEqual(json.loads(lines[0])['message'], 'boom')
+
+    def test_rollbar_without_network_falls_back_to_file(self):
+        # на порту 9 никто не слушает: соединение сразу отклоняется
+        sink = RollbarSink({
+            'access_token': 'test',
+            'environment': 'test',
+            'root': Path(__file__).parent,
+            'endpoint': 'http://127.0.0.1:9/api/1/',
+            'timeout': 1,
+        })
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / 'errors.ndjson'
+            reporter = ErrorReporter(sink, fallback=FileSink(path))
+            with mock.patch.object(reporter, 'ensure_thread'):
+                reporter.report(exc_info())
+            with self.assertLogs('task_manager.errors', 'ERROR'):
+                reporter.flush()
+
+            lines = path.read_text(encoding='utf-8').splitlines()
+            self.assertEqual(json.loads(lines[0])['message'], 'boom')
+
+    def test_report_does_not_wait_for_slow_sink(self):
+        sink = MemorySink(delay=0.3)
+        reporter = ErrorReporter(sink, flush_interval=0.05)
+
+        started = time.perf_counter()
+        for error_class in error_classes(20):
+            reporter.report(exc_info(error_class))
+        self.assertLess(time.perf_counter() - started, 0.2)
+
+        deadline = time.monotonic() + 5
+        while len(sink.events) < 20 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertEqual(len(sink.events), 20)
+        self.assertIsInstance(reporter.thread, threading.Thread)
+
+    def test_middleware_reports_view_exceptions(self):
+        sink = MemorySink()
+        reporter = ErrorReporter(sink)
+        request = RequestFactory().get('/tasks/?q=x')
+        middleware = ErrorReportingMiddleware(lambda request: None)
+
+        with mock.patch(
+            'task_manager.error_reporting.get_reporter',
+            return_value=reporter,
+        ), mock.patch.object(reporter, 'ensure_thread'):
+            try:
+                raise RuntimeError('view failed')
+            except RuntimeError as error:
+                self.assertIsNone(
+                    middleware.process_exception(request, error)
+                )
+        reporter.flush()
+
+        event = sink.events[0]
+        self.assertEqual(event['exception'], 'RuntimeError')
+        self.assertEqual(event['request']['path'], '/tasks/?q=x')
+
+    def test_not_found_is_not_reported(self):
+        reporter = ErrorReporter(MemorySink())
+        middleware = ErrorReportingMiddleware(lambda request: None)
+        with mock.patch(
+            'task_manager.error_reporting.get_reporter',
+            return_value=reporter,
+        ):
+            middleware.process_exception(
+                RequestFactory().get('/tasks/1/'), Http404()
+            )
+        self.assertTrue(reporter.queue.empty())
@@ -0,0 +1,190 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from task_manager import bulk, events
+from task_manager.filters import TaskFilter
+from task_manager.models import Status, Task
+
+
+def parse(message):
+    fields = dict(
+        line.split(': ', 1) for line in message.strip().splitlines()
+    )
+    return fields['event'], json.loads(fields['data'])
+
+
+class TaskFilterMatchTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester')
+        self.task = {
+            'status_id': 1,
+            'executor_id': 2,
+            'author_id': self.user.pk,
+            'label_ids': [5, 6],
+            'created_at': timezone.now(),
+            'name': 'Deploy release',
+            'description': 'Roll out to production',
+        }
+
+    def matches(self, **params):
+        return TaskFilter(params, self.user).matches(self.task)
+
+    def test_matches_like_the_list_query(self):
+        self.assertTrue(self.matches())
+        self.assertTrue(self.matches(status=['1', '3'], executor='2'))
+        self.assertFalse(self.matches(status='3'))
+        self.assertTrue(self.matches(labels=['6', '7']))
+        self.assertFalse(self.matches(labels=['6', '7'], labels_mode='all'))
+        self.assertTrue(self.matches(only_my='on'))
+        self.assertFalse(self.matches(created_before='2000-01-01'))
+        self.assertTrue(self.matches(q='deploy PRODUCTION'))
+        self.assertFalse(self.matches(q='rollback'))
+
+
+class TaskEventsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        self.other = User.objects.create_user(
+            username='other',
+            password='pass123'
+        )
+        self.new = Status.objects.create(name='New')
+        self.done = Status.objects.create(name='Done')
+        self.task = Task.objects.create(
+            name='First task', status=self.new, author=self.user
+        )
+        self.broker = events.get_broker()
+
+    def change(self, func, *args):
+        with self.captureOnCommitCallbacks(execute=True):
+            func(*args)
+
+    def create_task(self):
+        Task.objects.create(name='Second', status=self.new, author=self.user)
+
+    def finish_task(self):
+        self.task.status = self.done
+        self.task.save()
+
+    async def receive(self, subscription):
+        message = await asyncio.wait_for(subscription.queue.get(), 1)
+        return parse(message)
+
+    async def test_event_is_filtered_per_subscriber(self):
+        new_only = self.broker.subscribe(
+            TaskFilter({'status': self.new.pk}, self.user), self.user
+        )
+        everything = self.broker.subscribe(TaskFilter({}, self.other),
+                                           self.other)
+        try:
+            await sync_to_async(self.change)(self.finish_task)
+
+            _, data = await self.receive(new_only)
+            # задача ушла из фильтра: строку надо убрать
+            self.assertEqual(data, {'action': 'removed', 'id': self.task.pk})
+
+            _, data = await self.receive(everything)
+            self.assertEqual(data['action'], 'updated')
+            self.assertIn('Done', data['html'])
+            # чужой задачи удалить нельзя
+            self.assertNotIn('Delete', data['html'])
+        finally:
+            new_only.close()
+            everything.close()
+
+    async def test_bulk_actions_are_published(self):
+        subscription = self.broker.subscribe(TaskFilter({}, self.user),
+                                             self.user)
+        try:
+            await sync_to_async(self.change)(
+                bulk.delete_tasks, [self.task.pk], self.user
+            )
+            self.assertEqual(
+                await self.receive(subscription),
+                ('task', {'action': 'deleted', 'id': self.task.pk}),
+            )
+        finally:
+            subscription.close()
+
+    @override_settings(TASK_EVENTS_QUEUE_SIZE=1)
+    async def test_slow_subscriber_is_asked_to_reload(self):
+        subscription = self.broker.subscribe(TaskFilter({}, self.user),
+                                             self.user)
+        try:
+            await sync_to_async(self.change)(self.create_task)
+            await sync_to_async(self.change)(self.finish_task)
+            await asyncio.sleep(0)
+            self.assertIs(await subscription.queue.get(), events.RELOAD)
+        finally:
+            subscription.close()
+
+    def test_nothing_is_rendered_without_subscribers(self):
+        with self.assertNumQueries(0):
+            events.publish([self.task.pk], events.UPDATED)
+
+    @override_settings(ASYNC_VIEWS=True)
+    async def test_stream(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(
+            reverse('task_events'), {'status': self.new.pk}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = response.streaming_content
+        self.assertTrue((await anext(content)).startswith(b'retry:'))
+        await sync_to_async(self.change)(self.create_task)
+        event, data = parse((await anext(content)).decode())
+        self.assertEqual((event, data['action']), ('task', 'created'))
+        # своя задача: в строке есть кнопка удаления
+        self.assertIn('Delete', data['html'])
+
+        # клиент отключился: ASGI-сервер отменяет ожидание события
+        waiting = asyncio.ensure_future(anext(content))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        self.assertFalse(self.broker.has_subscribers())
+
+    @override_settings(ASYNC_VIEWS=True, TASK_EVENTS_HEARTBEAT=0.01)
+    async def test_idle_stream_sends_heartbeat(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('task_events'))
+        content = response.streaming_content
+        await anext(content)
+        try:
+            self.assertEqual(await anext(content), b': ping\n\n')
+        finally:
+            waiting = asyncio.ensure_future(anext(content))
+            await asyncio.sleep(0)
+            waiting.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiting
+
+    async def test_stream_requires_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('task_events'))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(ROOT_URLCONF='task_manager.tests.test_async_views')
+class TaskListLiveUpdatesTests(TestCase):
+
+    def test_async_list_subscribes_with_its_filter(self):
+        user = User.objects.create_user(username='tester')
+        self.client.force_login(user)
+        response = self.client.get(reverse('task_list'), {'status': 1})
+        self.assertContains(response, 'new EventSource(')
+        self.assertContains(response, 'tasks/events/?status')
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from task_manager.models import Label, Status, Task
+
+
+class TaskExportTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        self.executor = User.objects.create_user(
+            username='executor',
+            password='pass123'
+        )
+        self.status = Status.objects.create(name='New')
+        self.other_status = Status.objects.create(name='Done')
+        self.bug = Label.objects.create(name='bug')
+        self.urgent = Label.objects.create(name='urgent')
+
+        for i in range(5):
+            task = Task.objects.create(
+                name=f'Task {i}',
+                status=self.status if i < 4 else self.other_status,
+                author=self.user,
+                executor=self.executor if i % 2 else None,
+            )
+            task.labels.add(self.bug, self.urgent)
+        self.client.login(username='tester', password='pass123')
+
+    def test_csv_export_view(self):
+        response = self.client.get(
+            reverse('task_export') + f'?status={self.other_status.id}'
+        )
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+
+        content = b''.join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['name'], 'Task 4')
+        self.assertEqual(rows[0]['status'], 'Done')
+        self.assertEqual(rows[0]['labels'], 'bug, urgent')
+
+    def test_ndjson_export_view(self):
+        response = self.client.get(
+            reverse('task_export') + f'?format=ndjson&executor='
+            f'{self.executor.id}'
+        )
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row['name'] for row in rows], ['Task 3', 'Task 1'])
+        self.assertEqual(rows[0]['executor'], 'executor')
+
+    def test_unknown_format(self):
+        response = self.client.get(reverse('task_export') + '?format=xml')
+        self.assertEqual(response.status_code, 404)
+
+    def test_command_prefetches_labels_per_chunk(self):
+        out = io.StringIO()
+        # один запрос задач и по запросу меток на каждые 2 задачи
+        with self.assertNumQueries(1 + 3):
+            call_command(
+                'export_tasks', '--format=ndjson', '--chunk-size=2',
+                stdout=out,
+            )
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['labels'], ['bug', 'urgent'])
+
+    def test_command_filters(self):
+        out = io.StringIO()
+        call_command(
+            'export_tasks', '--author=tester', f'--status={self.status.id}',
+            stdout=out,
+        )
+        rows = list(csv.DictReader(io.StringIO(out.getvalue())))
+        self.assertEqual(len(rows), 4)
@@ -1,7 +1,12 @@
+from datetime import timedelta
+
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.http import QueryDict
+from django.utils import timezone
 
+from task_manager.filters import TaskFilter
 from task_manager.models import Status, Task, Label
 
 
@@ -83,3 +88,91 @@ class TaskFilterTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, 'Task A')
         self.assertNotContains(response, 'Task B')
+
+
+class TaskFilterEngineTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        self.status_a = Status.objects.create(name='Status A')
+        self.status_b = Status.objects.create(name='Status B')
+        self.status_c = Status.objects.create(name='Status C')
+        self.bug = Label.objects.create(name='bug')
+        self.urgent = Label.objects.create(name='urgent')
+
+        self.task_a = Task.objects.create(
+            name='Task A', status=self.status_a, author=self.user
+        )
+        self.task_b = Task.objects.create(
+            name='Task B', status=self.status_b, author=self.user
+        )
+        self.task_c = Task.objects.create(
+            name='Task C', status=self.status_c, author=self.user,
+            created_at=timezone.now() - timedelta(days=10),
+        )
+        self.task_a.labels.add(self.bug, self.urgent)
+        self.task_b.labels.add(self.bug)
+
+    def filtered(self, query):
+        task_filter = TaskFilter(QueryDict(query), self.user)
+        return list(task_filter.apply(Task.objects.all()))
+
+    def test_multiple_statuses(self):
+        tasks = self.filtered(
+            f'status={self.status_a.id}&status={self.status_c.id}'
+        )
+        self.assertCountEqual(tasks, [self.task_a, self.task_c])
+
+    def test_any_label_does_not_duplicate_tasks(self):
+        tasks = self.filtered(f'labels={self.bug.id}&labels={self.urgent.id}')
+        self.assertCountEqual(tasks, [self.task_a, self.task_b])
+
+    def test_all_labels(self):
+        tasks = self.filtered(
+            f'labels={self.bug.id}&labels={self.urgent.id}&labels_mode=all'
+        )
+        self.assertEqual(tasks, [self.task_a])
+
+    def test_created_range(self):
+        day = (timezone.now() - timedelta(days=10)).date().isoformat()
+        tasks = self.filtered(f'created_after={day}&created_before={day}')
+        self.assertEqual(tasks, [self.task_c])
+
+    def test_invalid_values_are_ignored(self):
+        tasks = self.filtered('status=abc&executor=&created_after=tomorrow')
+        self.assertEqual(len(tasks), 3)
+
+    def test_malformed_ids_are_ignored(self):
+        # '²' — цифра для isdigit(), но не для int()
+        for value in ('%C2%B2', '-1', '0', str(2 ** 64)):
+            with self.subTest(value=value):
+                self.assertEqual(
+                    len(self.filtered(f'status={value}&labels={value}')), 3
+                )
+        self.client.login(username='tester', password='pass123')
+        response = self.client.get(reverse('task_list') + '?executor=%C2%B2')
+        self.assertEqual(response.status_code, 200)
+
+    def test_labels_are_matched_with_exists_subquery(self):
+        task_filter = TaskFilter(
+            QueryDict(f'labels={self.bug.id}&labels={self.urgent.id}'),
+            self.user,
+        )
+        sql = str(task_filter.apply(Task.objects.all()).query).upper()
+        self.assertIn('EXISTS', sql)
+        self.assertNotIn('DISTINCT', sql)
+        self.assertNotIn('JOIN', sql)
+
+    def test_view_accepts_repeated_parameters(self):
+        self.client.login(username='tester', password='pass123')
+        url = reverse('task_list') + (
+            f'?status={self.status_b.id}&status={self.status_c.id}'
+        )
+        response = self.client.get(url)
+
+        self.assertContains(response, 'Task B')
+        self.assertContains(response, 'Task C')
+        self.assertNotContains(response, 'Task A')
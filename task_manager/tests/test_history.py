@@ -0,0 +1,168 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from task_manager import bulk, history
+from task_manager.models import Label, Status, Task, TaskHistory
+
+
+class TaskHistoryTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        self.executor = User.objects.create_user(
+            username='executor',
+            password='pass123'
+        )
+        self.new = Status.objects.create(name='New')
+        self.done = Status.objects.create(name='Done')
+        self.bug = Label.objects.create(name='bug')
+        self.urgent = Label.objects.create(name='urgent')
+        self.client.login(username='tester', password='pass123')
+
+    def changes(self, task):
+        return [
+            (entry.action, entry.field, entry.old_value, entry.new_value)
+            for entry in TaskHistory.objects.filter(task=task)
+            .order_by('id')
+        ]
+
+    def create_via_form(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('task_create'), {
+                'name': 'Deploy',
+                'description': '',
+                'status': self.new.pk,
+                'labels': [self.bug.pk],
+            })
+        return Task.objects.get(name='Deploy')
+
+    def test_create_and_update_are_recorded(self):
+        task = self.create_via_form()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('task_update', args=[task.pk]), {
+                'name': 'Deploy v2',
+                'description': '',
+                'status': self.done.pk,
+                'executor': self.executor.pk,
+                'labels': [self.urgent.pk],
+            })
+
+        self.assertEqual(self.changes(task), [
+            ('created', '', '', ''),
+            ('changed', 'labels', '', str(self.bug.pk)),
+            ('changed', 'name', 'Deploy', 'Deploy v2'),
+            ('changed', 'status_id', str(self.new.pk), str(self.done.pk)),
+            ('changed', 'executor_id', '', str(self.executor.pk)),
+            ('changed', 'labels', str(self.bug.pk), ''),
+            ('changed', 'labels', '', str(self.urgent.pk)),
+        ])
+        self.assertEqual(
+            set(TaskHistory.objects.values_list('user', flat=True)),
+            {self.user.pk},
+        )
+
+    def test_buffer_writes_entries_in_one_insert(self):
+        task = Task.objects.create(
+            name='Task', status=self.new, author=self.user
+        )
+        buffer = history.HistoryBuffer()
+        token = history.current_buffer.set(buffer)
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                task.labels.add(self.bug)
+                task.labels.add(self.urgent)
+                task.status = self.done
+                task.save()
+            # до конца запроса записи только копятся в памяти
+            self.assertEqual(len(buffer.entries), 3)
+            self.assertFalse(TaskHistory.objects.exists())
+            with self.assertNumQueries(1):
+                buffer.close()
+        finally:
+            history.current_buffer.reset(token)
+        self.assertEqual(TaskHistory.objects.filter(task=task).count(), 3)
+
+    def test_rolled_back_changes_are_not_recorded(self):
+        task = Task.objects.create(
+            name='Task', status=self.new, author=self.user
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    task.labels.add(self.bug)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertFalse(TaskHistory.objects.filter(field='labels'))
+
+    def test_label_changes_from_both_sides(self):
+        task = Task.objects.create(
+            name='Task', status=self.new, author=self.user
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bug.tasks.add(task)
+            task.labels.add(self.urgent)
+            task.labels.clear()
+        # создание задачи выше зафиксировано вне блока и не попало
+        self.assertEqual(self.changes(task), [
+            ('changed', 'labels', '', str(self.bug.pk)),
+            ('changed', 'labels', '', str(self.urgent.pk)),
+            ('changed', 'labels', f'{self.bug.pk},{self.urgent.pk}', ''),
+        ])
+
+    def test_bulk_actions_are_recorded(self):
+        tasks = [
+            Task.objects.create(
+                name=f'Task {i}', status=self.new, author=self.user
+            )
+            for i in range(3)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk.set_status([task.pk for task in tasks], self.done)
+            bulk.delete_tasks([tasks[0].pk], self.user)
+        self.assertEqual(
+            TaskHistory.objects.filter(field='status_id').count(), 3
+        )
+        # журнал переживает удаление задачи
+        self.assertEqual(self.changes(tasks[0])[-1][0], 'deleted')
+
+    @override_settings(HISTORY_PER_PAGE=2)
+    def test_detail_shows_paginated_history(self):
+        task = self.create_via_form()
+        with self.captureOnCommitCallbacks(execute=True):
+            for status in (self.done, self.new, self.done):
+                task = Task.objects.get(pk=task.pk)
+                task.status = status
+                task.save()
+
+        url = reverse('task_detail', args=[task.pk])
+        response = self.client.get(url)
+        history = response.context['history']
+        self.assertEqual(len(history), 2)
+        self.assertContains(response, 'Status: New → Done')
+
+        seen = []
+        while True:
+            seen.extend(entry.pk for entry in history)
+            if not history.has_next():
+                break
+            history = self.client.get(
+                url, {'history': history.next_cursor}
+            ).context['history']
+        self.assertEqual(
+            seen,
+            list(
+                TaskHistory.objects.filter(task=task)
+                .order_by('-created_at', '-id').values_list('id', flat=True)
+            ),
+        )
+        self.assertEqual(
+            self.client.get(url, {'history': 'broken'}).status_code, 404
+        )
@@ -0,0 +1,211 @@
+import io
+import json
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from task_manager.importer import TaskImporter
+from task_manager.models import Label, Status, Task
+from task_manager.search import get_search_backend
+
+
+class TaskImportTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        self.executor = User.objects.create_user(
+            username='executor',
+            password='pass123'
+        )
+        self.status = Status.objects.create(name='New')
+        self.bug = Label.objects.create(name='bug')
+        self.urgent = Label.objects.create(name='urgent')
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, name, content):
+        path = Path(self.tmpdir.name) / name
+        path.write_text(content, encoding='utf-8')
+        return str(path)
+
+    def import_file(self, path, *args):
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_tasks', path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_import(self):
+        path = self.write('tasks.csv', (
+            'name,description,status,executor,author,labels,created_at\n'
+            'Deploy,Roll out,New,executor,tester,"bug, urgent",'
+            '2024-01-02T10:00:00+00:00\n'
+            'Review,,New,,tester,,\n'
+        ))
+        out, _ = self.import_file(path)
+
+        self.assertIn('Загружено задач: 2, пропущено: 0', out)
+        deploy = Task.objects.get(name='Deploy')
+        self.assertEqual(deploy.executor, self.executor)
+        self.assertEqual(deploy.created_at.year, 2024)
+        self.assertEqual(
+            set(deploy.labels.values_list('name', flat=True)),
+            {'bug', 'urgent'},
+        )
+        review = Task.objects.get(name='Review')
+        self.assertIsNone(review.executor)
+        self.assertFalse(review.labels.exists())
+
+    def test_ndjson_import(self):
+        rows = [
+            {'name': f'Task {i}', 'status': 'New', 'author': 'tester',
+             'labels': ['bug']}
+            for i in range(7)
+        ]
+        path = self.write(
+            'tasks.ndjson', '\n'.join(json.dumps(row) for row in rows)
+        )
+        self.import_file(path, '--batch-size', '3')
+
+        self.assertEqual(Task.objects.count(), 7)
+        self.assertEqual(self.bug.tasks.count(), 7)
+
+    def test_invalid_rows_are_skipped(self):
+        path = self.write('tasks.csv', (
+            'name,status,author,labels\n'
+            'Good,New,tester,bug\n'
+            'Bad status,Missing,tester,\n'
+            'Bad label,New,tester,unknown\n'
+            'Bad author,New,nobody,\n'
+        ))
+        out, err = self.import_file(path)
+
+        self.assertIn('Загружено задач: 1, пропущено: 3', out)
+        self.assertIn("Строка 2: неизвестный статус 'Missing'", err)
+        self.assertEqual(
+            list(Task.objects.values_list('name', flat=True)), ['Good']
+        )
+
+    def test_broken_ndjson_lines_are_skipped(self):
+        good = {'name': 'Good', 'status': 'New', 'author': 'tester'}
+        path = self.write('tasks.ndjson', '\n'.join([
+            json.dumps(good),
+            '{"name": "Broken", ',
+            '["not", "an", "object"]',
+            json.dumps({**good, 'name': 'After'}),
+        ]))
+        out, err = self.import_file(path, '--batch-size', '1')
+
+        self.assertIn('Загружено задач: 2, пропущено: 2', out)
+        self.assertIn('Строка 2: некорректный JSON', err)
+        self.assertIn('Строка 3: строка должна быть объектом JSON', err)
+        self.assertCountEqual(
+            Task.objects.values_list('name', flat=True), ['Good', 'After']
+        )
+
+    def test_wrong_field_types_are_skipped(self):
+        good = {'name': 'Good', 'status': 'New', 'author': 'tester'}
+        path = self.write('tasks.ndjson', '\n'.join(
+            json.dumps(row) for row in [
+                good,
+                {**good, 'created_at': '2024-13-45T00:00:00'},
+                {**good, 'name': 123},
+                {**good, 'executor': 5},
+                {**good, 'labels': [1]},
+                {**good, 'name': 'After'},
+            ]
+        ))
+        out, err = self.import_file(path, '--batch-size', '1')
+
+        self.assertIn('Загружено задач: 2, пропущено: 4', out)
+        self.assertIn("Строка 2: некорректная дата '2024-13-45T00:00:00'", err)
+        self.assertIn("Строка 3: поле 'name' должно быть строкой", err)
+        self.assertIn("Строка 4: поле 'executor' должно быть строкой", err)
+        self.assertIn('Строка 5: метки должны быть списком строк', err)
+        self.assertCountEqual(
+            Task.objects.values_list('name', flat=True), ['Good', 'After']
+        )
+
+    def test_create_missing_reference_data(self):
+        path = self.write('tasks.csv', (
+            'name,status,author,labels\n'
+            'One,Blocked,tester,infra\n'
+            'Two,Blocked,tester,infra\n'
+        ))
+        self.import_file(path, '--create-missing')
+
+        blocked = Status.objects.get(name='Blocked')
+        self.assertEqual(blocked.tasks.count(), 2)
+        self.assertEqual(Label.objects.filter(name='infra').count(), 1)
+
+    def test_batches_use_constant_number_of_queries(self):
+        rows = [
+            {'name': f'Task {i}', 'status': 'New', 'author': 'tester',
+             'labels': ['bug', 'urgent']}
+            for i in range(50)
+        ]
+        importer = TaskImporter(batch_size=50)
+        with CaptureQueriesContext(connection) as queries:
+            importer.run(rows)
+        task_inserts = [
+            query for query in queries
+            if query['sql'].startswith('INSERT INTO "task_manager_task" ')
+        ]
+        # 50 задач — один INSERT, а не 50 вызовов save()
+        self.assertEqual(len(task_inserts), 1)
+        # плюс по UPDATE на каждый затронутый счётчик (counters.py)
+        self.assertLess(len(queries), 15)
+        self.assertEqual(importer.imported, 50)
+
+    def test_imported_tasks_are_searchable(self):
+        importer = TaskImporter()
+        importer.run([
+            {'name': 'Quarterly report', 'status': 'New',
+             'author': 'tester'},
+        ])
+        results = get_search_backend().search(Task.objects.all(), 'report')
+        self.assertEqual(
+            list(results.values_list('name', flat=True)),
+            ['Quarterly report'],
+        )
+
+    def test_export_round_trip(self):
+        task = Task.objects.create(
+            name='Original',
+            description='Text, with "quotes"',
+            status=self.status,
+            author=self.user,
+            executor=self.executor,
+        )
+        task.labels.add(self.bug, self.urgent)
+
+        paths = []
+        for file_format in ('csv', 'ndjson'):
+            out = io.StringIO()
+            call_command(
+                'export_tasks', '--format', file_format, stdout=out
+            )
+            paths.append(
+                self.write(f'export.{file_format}', out.getvalue())
+            )
+        for path in paths:
+            self.import_file(path)
+
+        copies = Task.objects.exclude(pk=task.pk)
+        self.assertEqual(copies.count(), 2)
+        for copy in copies:
+            self.assertEqual(copy.description, task.description)
+            self.assertEqual(copy.executor, self.executor)
+            # DjangoJSONEncoder округляет время до миллисекунд
+            self.assertAlmostEqual(
+                copy.created_at, task.created_at,
+                delta=timedelta(milliseconds=1),
+            )
+            self.assertEqual(copy.labels.count(), 2)
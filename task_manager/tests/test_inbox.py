@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from task_manager import conditional
+from task_manager.importer import TaskImporter
+from task_manager.inbox import build_inbox
+from task_manager.models import Status, TableVersion, Task
+
+
+class TaskInboxTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        self.other = User.objects.create_user(
+            username='other',
+            password='pass123'
+        )
+        self.new = Status.objects.create(name='New')
+        self.done = Status.objects.create(name='Done')
+        self.url = reverse('task_inbox')
+        self.client.login(username='tester', password='pass123')
+
+    def create_task(self, name, status=None, **kwargs):
+        kwargs.setdefault('author', self.other)
+        return Task.objects.create(
+            name=name, status=status or self.new, **kwargs
+        )
+
+    def sections(self):
+        return {
+            section['status_name']: (
+                section['count'],
+                [task['name'] for task in section['tasks']],
+            )
+            for section in build_inbox(self.user, per_status=2)
+        }
+
+    def test_authored_and_assigned_grouped_by_status(self):
+        now = timezone.now()
+        self.create_task('Assigned', executor=self.user,
+                         created_at=now - timedelta(hours=3))
+        self.create_task('Authored', author=self.user,
+                         created_at=now - timedelta(hours=2))
+        self.create_task('Both', author=self.user, executor=self.user,
+                         created_at=now - timedelta(hours=1))
+        self.create_task('Done', self.done, executor=self.user)
+        self.create_task('Foreign', executor=self.other)
+
+        self.assertEqual(self.sections(), {
+            # задача, где я и автор, и исполнитель, считается один раз
+            'New': (3, ['Both', 'Authored']),
+            'Done': (1, ['Done']),
+        })
+
+    def test_page_is_cached_and_invalidated(self):
+        task = self.create_task('Assigned', executor=self.user)
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Assigned')
+
+        # сессия, пользователь, версии таблиц — раздел берётся из кэша
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+
+        # версии таблиц сдвигаются после фиксации транзакции
+        with self.captureOnCommitCallbacks(execute=True):
+            task.executor = self.other
+            task.save()
+        self.assertNotContains(self.client.get(self.url), 'Assigned')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.done.name = 'Closed'
+            self.done.save()
+            self.create_task('Later', self.done, author=self.user)
+        self.assertContains(self.client.get(self.url), 'Closed')
+
+    def test_changes_from_other_workers_invalidate_inbox(self):
+        task = self.create_task('Assigned', executor=self.user)
+        self.client.get(self.url)
+        # другой воркер: свой кэш, общая база. Здесь кэш не трогается,
+        # меняются только строки и версия таблицы
+        Task.objects.filter(pk=task.pk).update(name='Renamed')
+        TableVersion.objects.filter(table=conditional.TASK).update(
+            version=F('version') + 1
+        )
+        self.assertContains(self.client.get(self.url), 'Renamed')
+
+    def test_import_invalidates_inbox(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            TaskImporter().run([
+                {'name': 'Imported', 'status': 'New', 'author': 'other',
+                 'executor': 'tester', 'labels': []},
+            ])
+        self.assertContains(self.client.get(self.url), 'Imported')
+
+    @override_settings(INBOX_CACHE_TIMEOUT=0)
+    def test_without_cache(self):
+        self.create_task('Assigned', executor=self.user)
+        Task.objects.update(name='Renamed')
+        self.assertContains(self.client.get(self.url), 'Renamed')
+
+    def test_requires_login(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertRedirects(response, reverse('login'))
@@ -0,0 +1,59 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from task_manager.management.commands.explain_task_filters import (
+    find_plan_issues,
+)
+from task_manager.models import Label, Status, Task
+
+
+class ExplainTaskFiltersTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user(username='tester', password='pass')
+        status = Status.objects.create(name='New')
+        label = Label.objects.create(name='bug')
+        task = Task.objects.create(name='Task', status=status, author=user)
+        task.labels.add(label)
+
+    def run_command(self):
+        out = StringIO()
+        call_command('explain_task_filters', stdout=out)
+        return out.getvalue()
+
+    def test_single_column_filters_use_indexes(self):
+        output = self.run_command()
+        for name in ('без фильтров', 'status', 'executor', 'only_my'):
+            self.assertIn(f'{name}: OK', output)
+
+    def test_every_permutation_is_reported(self):
+        output = self.run_command()
+        self.assertEqual(len(output.strip().splitlines()), 16)
+
+
+class FindPlanIssuesTests(TestCase):
+
+    def test_sqlite_plan(self):
+        plan = (
+            '2 0 0 SCAN task_manager_task\n'
+            '9 0 0 USE TEMP B-TREE FOR ORDER BY'
+        )
+        self.assertEqual(len(find_plan_issues(plan, 'sqlite')), 2)
+
+    def test_postgresql_plan(self):
+        plan = (
+            'Limit  (cost=0.15..4.30 rows=51 width=80)\n'
+            '  ->  Index Scan using task_status_created_idx '
+            'on task_manager_task'
+        )
+        self.assertEqual(find_plan_issues(plan, 'postgresql'), [])
+
+        plan = (
+            'Limit\n'
+            '  ->  Sort\n'
+            '        ->  Seq Scan on task_manager_task  (cost=0.00..1.01)'
+        )
+        self.assertEqual(len(find_plan_issues(plan, 'postgresql')), 2)
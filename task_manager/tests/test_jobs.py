@@ -0,0 +1,204 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from task_manager import jobs
+from task_manager.models import Job, Status, Task
+from task_manager.notifications import NOTIFY_EXECUTOR
+
+
+calls = []
+
+
+@jobs.job('test_record')
+def record_call(value):
+    calls.append(value)
+
+
+@jobs.job('test_flaky', max_attempts=2)
+def flaky():
+    raise RuntimeError('boom')
+
+
+@override_settings(JOB_BACKOFF_SECONDS=10, JOB_BACKOFF_MAX_SECONDS=25)
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_and_run(self):
+        jobs.enqueue('test_record', {'value': 1})
+        jobs.enqueue('test_record', {'value': 2}, delay=60)
+
+        self.assertEqual(jobs.run_pending(), 1)
+        self.assertEqual(calls, [1])
+        self.assertEqual(
+            sorted(Job.objects.values_list('status', flat=True)),
+            [Job.DONE, Job.QUEUED],
+        )
+
+    def test_unknown_job_is_rejected(self):
+        with self.assertRaises(LookupError):
+            jobs.enqueue('missing')
+
+    def test_retries_with_backoff_then_fails(self):
+        job = jobs.enqueue('test_flaky')
+        with self.assertLogs('task_manager.jobs', 'WARNING'):
+            self.assertEqual(jobs.run_pending(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertIn('boom', job.last_error)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=5))
+
+        # пауза ещё не прошла — задание не берётся
+        self.assertEqual(jobs.run_pending(), 0)
+        Job.objects.update(run_at=timezone.now())
+        with self.assertLogs('task_manager.jobs', 'ERROR'):
+            jobs.run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+    def test_backoff_is_capped(self):
+        self.assertEqual(
+            [jobs.backoff(n) for n in (1, 2, 3)], [10, 20, 25]
+        )
+
+    def test_job_is_claimed_once(self):
+        jobs.enqueue('test_record', {'value': 1})
+        first = jobs.claim('first', limit=5)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(jobs.claim('second', limit=5), [])
+
+    def test_optimistic_claim_skips_taken_rows(self):
+        job = jobs.enqueue('test_record', {'value': 1})
+        # другой воркер успел между выборкой и UPDATE
+        original = jobs._due
+
+        def due(using):
+            rows = list(original(using))
+            Job.objects.filter(pk=job.pk).update(status=Job.RUNNING)
+            return rows
+
+        with mock.patch.object(jobs, '_due', due):
+            self.assertEqual(jobs._claim_optimistic('w', 5, 'default'), [])
+
+    def test_stale_jobs_are_requeued(self):
+        job = jobs.enqueue('test_record', {'value': 1})
+        jobs.claim('dead-worker')
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+
+    def test_job_that_kills_its_worker_fails_eventually(self):
+        # max_attempts=2: каждый пропавший воркер — это попытка
+        job = jobs.enqueue('test_flaky')
+
+        def abandon():
+            jobs.claim('dead-worker')
+            Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+            return jobs.requeue_stale()
+
+        self.assertEqual(abandon(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+
+        with self.assertLogs('task_manager.jobs', 'ERROR'):
+            self.assertEqual(abandon(), 0)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+    def test_requeued_job_is_not_overwritten_by_slow_worker(self):
+        job = jobs.enqueue('test_record', {'value': 1})
+        [slow] = jobs.claim('slow-worker')
+        # воркер завис дольше JOB_LOCK_TIMEOUT: задание отдали другому
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        jobs.requeue_stale()
+        jobs.claim('other-worker')
+
+        with self.assertLogs('task_manager.jobs', 'WARNING'):
+            jobs.execute(slow)
+        job.refresh_from_db()
+        self.assertEqual(
+            (job.status, job.locked_by, job.attempts),
+            (Job.RUNNING, 'other-worker', 1),
+        )
+
+    def test_enqueue_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            jobs.enqueue_on_commit('test_record', {'value': 3})
+        self.assertFalse(Job.objects.exists())
+        callbacks[0]()
+        self.assertEqual(Job.objects.get().payload, {'value': 3})
+
+
+class ExecutorNotificationTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        self.executor = User.objects.create_user(
+            username='executor',
+            password='pass123',
+            email='executor@example.com',
+        )
+        self.status = Status.objects.create(name='New')
+        self.client.login(username='tester', password='pass123')
+
+    def test_assignment_is_sent_by_worker(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('task_create'), {
+                'name': 'Deploy',
+                'description': 'Roll out',
+                'status': self.status.pk,
+                'executor': self.executor.pk,
+            })
+        # в запросе письмо не отправляется
+        self.assertEqual(len(mail.outbox), 0)
+        job = Job.objects.get()
+        self.assertEqual(job.name, NOTIFY_EXECUTOR)
+
+        jobs.run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Deploy', mail.outbox[0].subject)
+        self.assertEqual(mail.outbox[0].to, ['executor@example.com'])
+
+    def test_unchanged_executor_is_not_notified_again(self):
+        task = Task.objects.create(
+            name='Deploy', status=self.status, author=self.user,
+            executor=self.executor,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('task_update', args=[task.pk]), {
+                'name': 'Deploy v2',
+                'status': self.status.pk,
+                'executor': self.executor.pk,
+            })
+        self.assertFalse(Job.objects.exists())
+
+
+class RunWorkersCommandTests(TransactionTestCase):
+
+    def setUp(self):
+        calls.clear()
+
+    def test_threads_drain_queue(self):
+        for value in range(5):
+            jobs.enqueue('test_record', {'value': value})
+
+        out = io.StringIO()
+        call_command(
+            'run_workers', '--workers', '2', '--once', stdout=out
+        )
+        self.assertIn('Выполнено заданий: 5', out.getvalue())
+        self.assertEqual(sorted(calls), list(range(5)))
+        self.assertFalse(Job.objects.exclude(status=Job.DONE).exists())
@@ -0,0 +1,136 @@
+import json
+import re
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from task_manager.metrics import Registry, registry
+from task_manager.models import Status, Task
+
+
+@override_settings(METRICS_TOKEN='secret')
+class RequestMetricsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        status = Status.objects.create(name='New')
+        for i in range(3):
+            Task.objects.create(
+                name=f'Task {i}', status=status, author=self.user
+            )
+        self.client.login(username='tester', password='pass123')
+
+    def metric(self, line_start):
+        text = self.client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret'
+        ).content.decode()
+        for line in text.splitlines():
+            if line.startswith(line_start):
+                return float(line.rsplit(' ', 1)[1])
+        return None
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('task_list'))
+        timing = response['Server-Timing']
+
+        queries = int(re.search(r'desc="(\d+) queries"', timing).group(1))
+        self.assertGreater(queries, 0)
+        self.assertIn('tpl;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+    @override_settings(SERVER_TIMING=False)
+    def test_server_timing_can_be_disabled(self):
+        response = self.client.get(reverse('task_list'))
+        self.assertNotIn('Server-Timing', response)
+
+    def test_histograms_by_url_name(self):
+        self.client.get(reverse('task_list'))
+        self.client.get(reverse('task_list'))
+
+        self.assertEqual(
+            self.metric(
+                'http_request_duration_seconds_count'
+                '{method="GET",view="task_list"}'
+            ),
+            2,
+        )
+        self.assertGreater(
+            self.metric(
+                'http_request_template_duration_seconds_sum'
+                '{view="task_list"}'
+            ),
+            0,
+        )
+        self.assertEqual(
+            self.metric('http_responses_total{status="200",view="task_list"}'),
+            2,
+        )
+
+    def test_streaming_response_is_measured_when_consumed(self):
+        response = self.client.get(reverse('task_export'))
+        self.assertIsNone(
+            self.metric('http_response_size_bytes_count{view="task_export"}')
+        )
+
+        content = b''.join(response.streaming_content)
+        self.assertEqual(
+            self.metric('http_response_size_bytes_sum{view="task_export"}'),
+            len(content),
+        )
+        self.assertGreater(
+            self.metric('http_request_db_queries_sum{view="task_export"}'),
+            0,
+        )
+
+    @override_settings(SLOW_REQUEST_MS=0, SLOW_REQUEST_SAMPLE_RATE=1.0)
+    def test_slow_requests_are_logged_with_sql(self):
+        with self.assertLogs('task_manager.requests', 'WARNING') as logs:
+            self.client.get(reverse('task_list'))
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'task_list')
+        self.assertGreater(record['db_queries'], 0)
+        self.assertIn('SELECT', record['slowest_queries'][0]['sql'])
+
+    @override_settings(SLOW_REQUEST_MS=0, SLOW_REQUEST_SAMPLE_RATE=0.0)
+    def test_slow_request_log_is_sampled(self):
+        with self.assertNoLogs('task_manager.requests', 'WARNING'):
+            self.client.get(reverse('task_list'))
+
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        response = self.client.get(
+            reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN='', DEBUG=False)
+    def test_metrics_without_token_are_hidden_in_production(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+        with self.settings(DEBUG=True):
+            response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+
+
+class RegistryTests(TestCase):
+
+    def test_prometheus_text_format(self):
+        metrics = Registry()
+        metrics.observe('latency', {'view': 'a'}, 0.3, (0.1, 0.5), 'help')
+        metrics.observe('latency', {'view': 'a'}, 0.05, (0.1, 0.5))
+        metrics.inc('hits', {'view': 'a'})
+
+        text = metrics.render()
+        self.assertIn('# TYPE latency histogram', text)
+        self.assertIn('latency_bucket{view="a",le="0.1"} 1', text)
+        self.assertIn('latency_bucket{view="a",le="0.5"} 2', text)
+        self.assertIn('latency_bucket{view="a",le="+Inf"} 2', text)
+        self.assertIn('latency_count{view="a"} 2', text)
+        self.assertIn('hits{view="a"} 1', text)
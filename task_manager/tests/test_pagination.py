@@ -0,0 +1,126 @@
+import base64
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from task_manager.models import Status, Task
+from task_manager.pagination import InvalidCursor, KeysetPaginator
+from task_manager.views import TaskListView
+
+
+class TaskKeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        self.status_a = Status.objects.create(name='Status A')
+        self.status_b = Status.objects.create(name='Status B')
+
+        now = timezone.now()
+        self.tasks = []
+        for i in range(7):
+            self.tasks.append(Task.objects.create(
+                name=f'Task #{i:02}',
+                status=self.status_a if i % 2 else self.status_b,
+                author=self.user,
+                created_at=now - timedelta(minutes=i // 2),
+            ))
+        self.client.login(username='tester', password='pass123')
+
+        patcher = mock.patch.object(TaskListView, 'paginate_by', 3)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get_page(self, query=''):
+        response = self.client.get(reverse('task_list') + '?' + query)
+        self.assertEqual(response.status_code, 200)
+        return response.context['page_obj']
+
+    def test_pages_follow_created_at_then_id(self):
+        expected = sorted(
+            self.tasks,
+            key=lambda task: (-task.created_at.timestamp(), task.id),
+        )
+
+        seen = []
+        query = ''
+        while True:
+            page = self.get_page(query)
+            seen.extend(page.object_list)
+            if not page.has_next():
+                break
+            query = page.next_query
+
+        self.assertEqual(seen, expected)
+
+    def test_next_and_previous_cursors(self):
+        first = self.get_page('')
+        self.assertFalse(first.has_previous())
+
+        second = self.get_page(first.next_query)
+        self.assertTrue(second.has_previous())
+
+        back = self.get_page(second.previous_query)
+        self.assertEqual(back.object_list, first.object_list)
+        self.assertFalse(back.has_previous())
+
+    def test_cursor_keeps_filters(self):
+        page = self.get_page(f'status={self.status_b.id}')
+        self.assertIn(f'status={self.status_b.id}', page.next_query)
+
+        page = self.get_page(page.next_query)
+        self.assertTrue(page.object_list)
+        for task in page.object_list:
+            self.assertEqual(task.status, self.status_b)
+
+    def test_deep_page_costs_the_same_as_first(self):
+        first = self.get_page('')
+        # включая запрос версий таблиц для ETag
+        with self.assertNumQueries(5):
+            self.client.get(reverse('task_list'))
+        with self.assertNumQueries(5):
+            self.client.get(reverse('task_list') + '?' + first.next_query)
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse('task_list') + '?cursor=broken')
+        self.assertEqual(response.status_code, 404)
+
+    def test_rank_cursor_accepts_only_numbers(self):
+        paginator = KeysetPaginator(('search_rank', 'id'), 10)
+        for rank in ('0.5', True, None, float('nan')):
+            with self.subTest(rank=rank):
+                cursor = base64.urlsafe_b64encode(
+                    json.dumps({'p': 0, 'v': [rank, 1]}).encode()
+                ).decode()
+                with self.assertRaises(InvalidCursor):
+                    paginator.decode_cursor(Task, cursor)
+        cursor = paginator.encode_cursor({'search_rank': -1.5, 'id': 3})
+        self.assertEqual(
+            paginator.decode_cursor(Task, cursor), (False, [-1.5, 3])
+        )
+
+
+class ReferenceListPaginationTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        for i in range(5):
+            Status.objects.create(name=f'Status {i}')
+        self.client.login(username='tester', password='pass123')
+
+    def test_statuses_are_paginated_by_id(self):
+        response = self.client.get(reverse('status_list'))
+        page = response.context['page_obj']
+        ids = [status.id for status in page.object_list]
+        self.assertEqual(ids, sorted(ids))
+        self.assertFalse(page.has_next())
@@ -0,0 +1,140 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from task_manager import search
+from task_manager.filters import TaskFilter
+from task_manager.models import Status, Task
+from task_manager.views import TaskListView
+
+
+class TaskSearchTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        self.status_a = Status.objects.create(name='Status A')
+        self.status_b = Status.objects.create(name='Status B')
+
+        self.in_name = Task.objects.create(
+            name='Deploy release',
+            description='ship it',
+            status=self.status_a,
+            author=self.user,
+        )
+        self.in_description = Task.objects.create(
+            name='Write notes',
+            description='notes for the next deploy',
+            status=self.status_b,
+            author=self.user,
+        )
+        self.unrelated = Task.objects.create(
+            name='Fix login',
+            description='broken form',
+            status=self.status_a,
+            author=self.user,
+        )
+
+    def search(self, query):
+        task_filter = TaskFilter(QueryDict(query), self.user)
+        queryset = task_filter.apply(Task.objects.all())
+        return list(queryset.order_by(*task_filter.ordering_keys))
+
+    def test_name_matches_rank_above_description_matches(self):
+        self.assertEqual(
+            self.search('q=deploy'),
+            [self.in_name, self.in_description],
+        )
+
+    def test_search_combines_with_filters(self):
+        self.assertEqual(
+            self.search(f'q=deploy&status={self.status_b.id}'),
+            [self.in_description],
+        )
+
+    def test_prefix_and_case_insensitive(self):
+        self.assertEqual(self.search('q=LOG'), [self.unrelated])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.unrelated.name = 'Deploy hotfix'
+        self.unrelated.save()
+        self.assertIn(self.unrelated, self.search('q=hotfix'))
+
+        self.in_name.delete()
+        self.assertEqual(self.search('q=release'), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(self.search('q=" OR * NEAR('), [])
+        # слова запроса объединяются по И, кавычки и операторы
+        # не интерпретируются ни в одном бэкенде
+        self.assertEqual(
+            self.search('q=deploy" -notes'),
+            [self.in_description],
+        )
+
+    def test_search_does_not_use_like(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.search('q=deploy')
+        self.assertNotIn(' LIKE ', queries[0]['sql'].upper())
+
+    def test_full_text_query_runs_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.search('q=deploy')
+        # ранг не должен пересчитываться подзапросом на каждую строку:
+        # полнотекстовое условие встречается в фильтре и, в SQLite,
+        # в выборке рангов, а не в коррелированном подзапросе
+        sql = queries[0]['sql'].upper()
+        self.assertIn(sql.count(' MATCH ') + sql.count('@@'), (1, 2))
+        self.assertNotIn(' AND TASK_MANAGER_TASK_FTS.ROWID =', sql)
+
+    def test_search_results_are_paginated_by_rank(self):
+        self.client.login(username='tester', password='pass123')
+        with mock.patch.object(TaskListView, 'paginate_by', 1):
+            response = self.client.get(reverse('task_list') + '?q=deploy')
+            page = response.context['page_obj']
+            self.assertEqual(page.object_list, [self.in_name])
+
+            response = self.client.get(
+                reverse('task_list') + '?' + page.next_query
+            )
+            page = response.context['page_obj']
+            self.assertEqual(page.object_list, [self.in_description])
+            self.assertFalse(page.has_next())
+
+
+class LikeSearchBackendTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user(username='tester')
+        status = Status.objects.create(name='New')
+        self.in_name = Task.objects.create(
+            name='Deploy release', status=status, author=user
+        )
+        self.in_description = Task.objects.create(
+            name='Write notes', description='next DEPLOY',
+            status=status, author=user,
+        )
+        Task.objects.create(name='Fix login', status=status, author=user)
+
+    def test_other_vendors_fall_back_to_like_search(self):
+        other = mock.Mock(vendor='mysql')
+        with mock.patch.dict(search._backends, clear=True):
+            backend = search.get_search_backend(other)
+        self.assertIsInstance(backend, search.LikeSearchBackend)
+
+    def test_like_search_matches_all_words(self):
+        backend = search.LikeSearchBackend()
+        found = backend.search(Task.objects.all(), 'deploy" -')
+        self.assertEqual(
+            list(found.order_by(backend.rank_key, 'id')),
+            [self.in_name, self.in_description],
+        )
+        self.assertFalse(backend.search(Task.objects.all(), 'deploy fix'))
+        self.assertFalse(backend.search(Task.objects.all(), '"*'))
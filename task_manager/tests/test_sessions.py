@@ -0,0 +1,88 @@
+import io
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from task_manager.benchmarks import bench_session_flow
+from task_manager.sessions import clear_expired_sessions
+
+
+def make_session(key, expires_in):
+    Session.objects.create(
+        session_key=key,
+        session_data='',
+        expire_date=timezone.now() + timedelta(seconds=expires_in),
+    )
+
+
+class SessionCleanupTests(TestCase):
+
+    def setUp(self):
+        for i in range(5):
+            make_session(f'expired{i}', -60)
+        make_session('alive', 3600)
+
+    def test_expired_sessions_are_deleted_in_batches(self):
+        # пачки 2 + 2 + 1 (SELECT и DELETE на каждую) и пустая выборка
+        with self.assertNumQueries(7):
+            self.assertEqual(clear_expired_sessions(batch_size=2), 5)
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['alive'],
+        )
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('cleanup_sessions', stdout=out)
+        self.assertIn('Удалено сессий: 5', out.getvalue())
+
+    @override_settings(
+        SESSION_ENGINE=settings.SESSION_BACKENDS['signed_cookies']
+    )
+    def test_command_skips_cookie_sessions(self):
+        out = io.StringIO()
+        call_command('cleanup_sessions', stdout=out)
+        self.assertIn('удалять нечего', out.getvalue())
+        self.assertEqual(Session.objects.count(), 6)
+
+
+class SessionStorageTests(TestCase):
+
+    def setUp(self):
+        User.objects.create_user(username='tester', password='pass123')
+
+    @override_settings(
+        SESSION_ENGINE=settings.SESSION_BACKENDS['signed_cookies'],
+        MESSAGE_STORAGE=settings.MESSAGE_STORAGES['cookie'],
+    )
+    def test_login_flow_without_session_table(self):
+        response = self.client.post(
+            reverse('login'),
+            {'username': 'tester', 'password': 'pass123'},
+            follow=True,
+        )
+        self.assertContains(response, 'Вы залогинены')
+        self.assertEqual(
+            self.client.get(reverse('task_list')).status_code, 200
+        )
+        self.assertFalse(Session.objects.exists())
+
+    def test_benchmark_shows_fewer_writes(self):
+        results = bench_session_flow(
+            'tester', 'pass123', rounds=1,
+            setups=[('db', 'session'), ('signed_cookies', 'cookie')],
+        )
+        self.assertLess(
+            results['signed_cookies+cookie']['writes'],
+            results['db+session']['writes'],
+        )
+        self.assertLess(
+            results['signed_cookies+cookie']['queries'],
+            results['db+session']['queries'],
+        )
@@ -0,0 +1,47 @@
+import os
+
+from django.test import SimpleTestCase
+
+from task_manager.startup import (
+    DEFERRED_MODULES,
+    STARTUP_BUDGET_SECONDS,
+    by_package,
+    measure_startup,
+    parse_importtime,
+)
+
+
+class StartupTests(SimpleTestCase):
+
+    def test_time_to_first_response(self):
+        env = {
+            name: value for name, value in os.environ.items()
+            if name not in ('DATABASE_URL', 'ENABLE_ADMIN')
+        }
+        report = measure_startup(path='/login/', env=env)
+
+        self.assertEqual(report['status'], '200 OK')
+        self.assertLess(
+            report['first_response_seconds'], STARTUP_BUDGET_SECONDS
+        )
+        for module in DEFERRED_MODULES + ('django.contrib.admin',):
+            self.assertNotIn(module, report['modules'])
+
+    def test_parse_importtime(self):
+        output = (
+            'import time: self [us] | cumulative | imported package\n'
+            'import time:       120 |        120 |     dotenv.parser\n'
+            'import time:       300 |        420 |   dotenv\n'
+            'import time:      1000 |       1000 | django\n'
+        )
+        imports = parse_importtime(output)
+
+        self.assertEqual(
+            imports[0],
+            {'module': 'dotenv.parser', 'depth': 2,
+             'self_ms': 0.12, 'cumulative_ms': 0.12},
+        )
+        self.assertEqual(imports[2]['depth'], 0)
+        self.assertEqual(
+            by_package(imports), [('django', 1.0), ('dotenv', 0.42)]
+        )
@@ -1,7 +1,8 @@
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth.models import User
-from task_manager.models import Status, Task
+from django.core.cache import cache
+from task_manager.models import Status, Task, Label
 
 
 class TaskCRUDTests(TestCase):
@@ -95,3 +96,82 @@ class TaskCRUDTests(TestCase):
         )
         self.assertTrue(Task.objects.filter(id=self.task.id).exists())
         self.assertContains(response, "You cannot delete someone else")
+
+
+class TaskListQueryBudgetTests(TestCase):
+    # сессия, пользователь, версии таблиц для ETag, задачи и метки
+    # задач; справочники фильтра берутся из кэша и на холодном кэше
+    # добавляют ещё три запроса
+    QUERY_BUDGET = 5
+    COLD_CACHE_QUERIES = 3
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='user1',
+            password='pass123'
+        )
+        self.executor = User.objects.create_user(
+            username='user2',
+            password='pass123'
+        )
+        self.status = Status.objects.create(name='In progress')
+        self.labels = [
+            Label.objects.create(name=f'label {i}') for i in range(3)
+        ]
+        self.client.login(username='user1', password='pass123')
+
+    def create_tasks(self, count):
+        for i in range(count):
+            task = Task.objects.create(
+                name=f'Task {i}',
+                status=self.status,
+                author=self.user,
+                executor=self.executor if i % 2 else None,
+            )
+            task.labels.set(self.labels[:i % 4])
+
+    def test_task_list_queries_do_not_depend_on_row_count(self):
+        self.create_tasks(1)
+        with self.assertNumQueries(
+            self.QUERY_BUDGET + self.COLD_CACHE_QUERIES
+        ):
+            self.client.get(reverse('task_list'))
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            self.client.get(reverse('task_list'))
+
+        self.create_tasks(30)
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            response = self.client.get(reverse('task_list'))
+        self.assertContains(response, 'label 2')
+
+    def test_filtered_task_list_stays_within_budget(self):
+        self.create_tasks(20)
+        url = reverse('task_list') + (
+            f'?status={self.status.id}&executor={self.executor.id}'
+            f'&labels={self.labels[0].id}&only_my=on'
+        )
+        self.client.get(url)
+        with self.assertNumQueries(self.QUERY_BUDGET):
+            self.client.get(url)
+
+    def test_reference_data_is_reloaded_after_changes(self):
+        self.create_tasks(1)
+        self.client.get(reverse('task_list'))
+        Status.objects.create(name='Done')
+
+        with self.assertNumQueries(
+            self.QUERY_BUDGET + self.COLD_CACHE_QUERIES
+        ):
+            response = self.client.get(reverse('task_list'))
+        self.assertContains(response, 'Done')
+
+    def test_task_detail_queries(self):
+        self.create_tasks(4)
+        task = Task.objects.get(name='Task 3')
+        # плюс страница журнала изменений
+        with self.assertNumQueries(6):
+            response = self.client.get(
+                reverse('task_detail', args=[task.id])
+            )
+        self.assertContains(response, 'label 2')
@@ -0,0 +1,52 @@
+from django.contrib.auth.models import User
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from task_manager.benchmarks import bench_templates
+from task_manager.models import Label, Status, Task
+from task_manager.startup import template_names, warm_templates
+
+
+class TemplateWarmUpTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='tester',
+            password='pass123'
+        )
+        status = Status.objects.create(name='New')
+        Label.objects.create(name='bug')
+        Task.objects.create(name='Task', status=status, author=self.user)
+
+    def test_production_loader_is_cached(self):
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertIsInstance(loader, CachedLoader)
+
+    def test_warm_up_compiles_every_template(self):
+        loader = engines['django'].engine.template_loaders[0]
+        loader.reset()
+
+        names = warm_templates()
+        self.assertEqual(names, template_names())
+        self.assertIn('task_manager/task_list.html', names)
+        self.assertTrue(set(names) <= set(loader.get_template_cache))
+
+    @override_settings(TEMPLATE_AUTORELOAD=True)
+    def test_nothing_to_warm_with_autoreload(self):
+        self.assertEqual(warm_templates(), [])
+
+    def test_form_pages_extend_project_base(self):
+        self.client.login(username='tester', password='pass123')
+        for name in ('status_create', 'label_create', 'task_create'):
+            response = self.client.get(reverse(name))
+            self.assertTemplateUsed(response, 'task_manager/base.html')
+
+    def test_render_benchmark(self):
+        names = ['task_manager/task_list.html', 'task_manager/task_row.html']
+        results = bench_templates(self.user, repeats=1, names=names)
+        self.assertEqual(list(results), names)
+        for stats in results.values():
+            self.assertGreater(stats['uncached_ms'], 0)
+            self.assertGreater(stats['cached_ms'], 0)
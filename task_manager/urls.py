@@ -1,5 +1,14 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, views
+
+# под ASGI список и карточка задачи — асинхронные представления
+if settings.ASYNC_VIEWS:
+    TaskListView = views.AsyncTaskListView
+    TaskDetailView = views.AsyncTaskDetailView
+else:
+    TaskListView = views.TaskListView
+    TaskDetailView = views.TaskDetailView
 
 urlpatterns = [
     path('', views.index, name='home'),
@@ -59,7 +68,7 @@ urlpatterns = [
 
     path(
         'tasks/',
-        views.TaskListView.as_view(),
+        TaskListView.as_view(),
         name='task_list'
     ),
     path(
@@ -67,9 +76,29 @@ urlpatterns = [
         views.TaskCreateView.as_view(),
         name='task_create'
     ),
+    path(
+        'tasks/my/',
+        views.TaskInboxView.as_view(),
+        name='task_inbox'
+    ),
+    path(
+        'tasks/bulk/',
+        views.TaskBulkView.as_view(),
+        name='task_bulk'
+    ),
+    path(
+        'tasks/events/',
+        views.TaskEventsView.as_view(),
+        name='task_events'
+    ),
+    path(
+        'tasks/export/',
+        views.TaskExportView.as_view(),
+        name='task_export'
+    ),
     path(
         'tasks/<int:pk>/',
-        views.TaskDetailView.as_view(),
+        TaskDetailView.as_view(),
         name='task_detail'
     ),
     path(
@@ -103,4 +132,36 @@ urlpatterns = [
         views.LabelDeleteView.as_view(),
         name='label_delete'
     ),
+
+    path(
+        'api/tasks/',
+        api.TaskApiView.as_view(),
+        name='api_task_list'
+    ),
+    path(
+        'api/statuses/',
+        api.StatusApiView.as_view(),
+        name='api_status_list'
+    ),
+    path(
+        'api/labels/',
+        api.LabelApiView.as_view(),
+        name='api_label_list'
+    ),
+    path(
+        'api/users/',
+        api.UserApiView.as_view(),
+        name='api_user_list'
+    ),
+
+    path(
+        'metrics/',
+        views.metrics_view,
+        name='metrics'
+    ),
 ]
+
+if settings.ENABLE_ADMIN:
+    from django.contrib import admin
+
+    urlpatterns.append(path('admin/', admin.site.urls))
@@ -1,21 +1,54 @@
+import hmac
+
+from django.conf import settings
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth import logout
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.contrib.auth.views import LoginView
+from django.contrib.auth.views import LoginView, redirect_to_login
 from django.contrib.auth.models import User
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.views import View
+from django.views.generic.base import TemplateResponseMixin
 from django.views.generic import (
     ListView,
     CreateView,
     UpdateView,
     DeleteView,
     DetailView,
+    TemplateView,
 )
 from django.db.models import ProtectedError
 
-from .models import Status, Task, Label
-from .forms import UserCreateForm, UserUpdateForm
+from . import bulk, events, inbox
+from .models import Status, Task, Label, UserTaskStats
+from .caching import (
+    aget_reference_data,
+    arender_task_rows,
+    get_reference_data,
+    render_task_rows,
+)
+from .conditional import (
+    LABEL,
+    STATUS,
+    TASK,
+    USER,
+    AsyncConditionalPageMixin,
+    ConditionalPageMixin,
+)
+from .export import FORMATS, export_queryset, iter_task_rows
+from .filters import TaskFilter
+from .history import ahistory_page, history_page
+from .jobs import enqueue_on_commit
+from .pagination import InvalidCursor, KeysetPaginationMixin
+from .forms import TaskBulkForm, UserCreateForm, UserUpdateForm
+from .metrics import registry
+from .notifications import NOTIFY_EXECUTOR
+
+
+# сколько исполнителей показывать на главной
+DASHBOARD_EXECUTORS = 10
 
 
 # ===== Общий миксин авторизации для тестов =====
@@ -24,18 +57,56 @@ class AuthRequiredMixin(LoginRequiredMixin):
     redirect_field_name = None
 
 
+class AsyncAuthRequiredMixin:
+    """AuthRequiredMixin для асинхронных представлений."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return redirect_to_login(
+                request.get_full_path(), reverse('login'), None
+            )
+        # контекстные процессоры шаблона читают request.user;
+        # без этого ленивый объект второй раз полез бы в сессию и БД
+        request.user = user
+        return await super().dispatch(request, *args, **kwargs)
+
+
 def index(request):
-    return render(request, 'task_manager/index.html')
+    """
+    Главная. Вошедшему пользователю показывает сводку по задачам из
+    счётчиков (counters.py) — без COUNT по таблице задач.
+    """
+    if not request.user.is_authenticated:
+        return render(request, 'task_manager/index.html')
+
+    statuses = list(Status.objects.order_by('id').only('name', 'task_count'))
+    executors = (
+        UserTaskStats.objects.select_related('user')
+        .filter(assigned_count__gt=0)
+        .order_by('-assigned_count')[:DASHBOARD_EXECUTORS]
+    )
+    my_stats = (
+        UserTaskStats.objects.filter(pk=request.user.pk).first()
+        or UserTaskStats(user=request.user)
+    )
+    return render(request, 'task_manager/index.html', {
+        'statuses': statuses,
+        'total_tasks': sum(status.task_count for status in statuses),
+        'executors': executors,
+        'my_stats': my_stats,
+    })
 
 
 # =====================
 # USERS
 # =====================
 
-class UserListView(ListView):
+class UserListView(ConditionalPageMixin, KeysetPaginationMixin, ListView):
     model = User
     template_name = 'task_manager/user_list.html'
     ordering = ['id']
+    conditional_tables = (USER,)
 
 
 class UserCreateView(CreateView):
@@ -94,6 +165,16 @@ class UserDeleteView(AuthRequiredMixin, UserPassesTestMixin, DeleteView):
     def post(self, request, *args, **kwargs):
         user = self.get_object()
 
+        # автор или исполнитель задач — отказ сразу по счётчикам,
+        # без обхода связанных объектов Collector'ом
+        stats = UserTaskStats.objects.filter(pk=user.pk).first()
+        if stats and (stats.authored_count or stats.assigned_count):
+            messages.error(
+                request,
+                'Невозможно удалить пользователя, так как он используется'
+            )
+            return redirect(self.success_url)
+
         try:
             user.delete()
             messages.success(
@@ -127,11 +208,14 @@ def user_logout(request):
 # STATUSES
 # =====================
 
-class StatusListView(AuthRequiredMixin, ListView):
+class StatusListView(AuthRequiredMixin, ConditionalPageMixin,
+                     KeysetPaginationMixin, ListView):
     model = Status
     template_name = 'task_manager/status_list.html'
     context_object_name = 'statuses'
     ordering = ['id']
+    # в списке показано число задач
+    conditional_tables = (STATUS, TASK)
 
 
 class StatusCreateView(AuthRequiredMixin, CreateView):
@@ -161,61 +245,220 @@ class StatusDeleteView(AuthRequiredMixin, DeleteView):
     template_name = 'task_manager/status_confirm_delete.html'
     success_url = reverse_lazy('status_list')
 
-    def delete(self, request, *args, **kwargs):
+    def form_valid(self, form):
+        # счётчик проверяется до удаления; ProtectedError остаётся
+        # на случай, если счётчики разошлись с таблицей задач
+        if self.object.task_count:
+            return self.refuse()
         try:
-            response = super().delete(request, *args, **kwargs)
-            messages.success(request, 'Статус успешно удалён')
-            return response
+            response = super().form_valid(form)
         except ProtectedError:
-            messages.error(
-                request,
-                'Невозможно удалить статус, так как он используется'
-            )
-            return redirect('status_list')
+            return self.refuse()
+        messages.success(self.request, 'Статус успешно удалён')
+        return response
+
+    def refuse(self):
+        messages.error(
+            self.request,
+            'Невозможно удалить статус, так как он используется'
+        )
+        return redirect('status_list')
 
 
 # =====================
 # TASKS
 # =====================
 
-class TaskListView(AuthRequiredMixin, ListView):
+class TaskListView(AuthRequiredMixin, ConditionalPageMixin,
+                   KeysetPaginationMixin, ListView):
     model = Task
     template_name = 'task_manager/task_list.html'
     context_object_name = 'tasks'
     ordering = ['-created_at']
 
     def get_queryset(self):
-        queryset = super().get_queryset()
+        self.task_filter = TaskFilter(self.request.GET, self.request.user)
+        return self.task_filter.apply(super().get_queryset().for_listing())
 
-        status_id = self.request.GET.get('status')
-        executor_id = self.request.GET.get('executor')
-        label_id = self.request.GET.get('labels')
-        only_my = self.request.GET.get('only_my')
+    def get_paginate_keys(self):
+        return self.task_filter.ordering_keys
 
-        if status_id:
-            queryset = queryset.filter(status_id=status_id)
-        if executor_id:
-            queryset = queryset.filter(executor_id=executor_id)
-        if label_id:
-            queryset = queryset.filter(labels__id=label_id)
-        if only_my:
-            queryset = queryset.filter(author=self.request.user)
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['task_filter'] = self.task_filter
+        render_task_rows(context['tasks'], self.request.user)
+        context.update(get_reference_data())
+        return context
 
-        return queryset
+
+class TaskInboxView(AuthRequiredMixin, ConditionalPageMixin, TemplateView):
+    """Мои задачи: где я автор или исполнитель, по статусам."""
+
+    template_name = 'task_manager/task_inbox.html'
+    conditional_tables = inbox.TABLES
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['statuses'] = Status.objects.all()
-        context['users'] = User.objects.all()
-        context['labels'] = Label.objects.all()
+        context['sections'] = inbox.get_inbox(
+            self.request.user, self.table_versions
+        )
+        context['total'] = sum(
+            section['count'] for section in context['sections']
+        )
         return context
 
 
-class TaskDetailView(AuthRequiredMixin, DetailView):
+class TaskBulkView(AuthRequiredMixin, View):
+    """
+    Массовые действия над отмеченными в списке задачами: одно
+    UPDATE или одна запись в промежуточную таблицу на всё (bulk.py).
+    """
+
+    def post(self, request, *args, **kwargs):
+        form = TaskBulkForm(request.POST)
+        if not form.is_valid():
+            for errors in form.errors.values():
+                for error in errors:
+                    messages.error(request, error)
+            return redirect('task_list')
+
+        result = form.run(request.user)
+        if form.cleaned_data['action'] == bulk.DELETE:
+            messages.success(request, f'Удалено задач: {result.changed}')
+        else:
+            messages.success(request, f'Изменено задач: {result.changed}')
+        if result.refused:
+            messages.error(
+                request,
+                f'Чужие задачи не удалены: {result.refused}'
+            )
+        return redirect('task_list')
+
+
+class TaskExportView(AuthRequiredMixin, View):
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in FORMATS:
+            raise Http404('Неизвестный формат выгрузки')
+
+        serialize, content_type = FORMATS[export_format]
+        rows = iter_task_rows(export_queryset(request.GET, request.user))
+        response = StreamingHttpResponse(
+            serialize(rows),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="tasks.{export_format}"'
+        )
+        return response
+
+
+class TaskDetailView(AuthRequiredMixin, ConditionalPageMixin, DetailView):
     model = Task
     template_name = 'task_manager/task_detail.html'
     context_object_name = 'task'
 
+    def get_queryset(self):
+        return Task.objects.for_listing()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        try:
+            context['history'] = history_page(
+                self.object.pk, self.request.GET.get('history')
+            )
+        except InvalidCursor:
+            raise Http404('Некорректный курсор страницы')
+        return context
+
+
+class AsyncTaskListView(AsyncAuthRequiredMixin, AsyncConditionalPageMixin,
+                        KeysetPaginationMixin, TemplateResponseMixin, View):
+    """
+    Список задач на асинхронном ORM (включается ASYNC_VIEWS под ASGI).
+    Строки читаются через aiterator, фрагменты и справочники — через
+    асинхронный API кэша; в поток уходит только рендер шаблона.
+    """
+
+    template_name = TaskListView.template_name
+
+    async def get(self, request, *args, **kwargs):
+        self.task_filter = TaskFilter(request.GET, request.user)
+        queryset = self.task_filter.apply(Task.objects.for_listing())
+        paginator, page, tasks, is_paginated = (
+            await self.apaginate_queryset(queryset, self.paginate_by)
+        )
+        await arender_task_rows(tasks, request.user)
+        context = {
+            'view': self,
+            'paginator': paginator,
+            'page_obj': page,
+            'is_paginated': is_paginated,
+            'object_list': tasks,
+            'tasks': tasks,
+            'task_filter': self.task_filter,
+            # строки списка обновляются по SSE (TaskEventsView)
+            'events_url': (
+                f"{reverse('task_events')}?{request.GET.urlencode()}"
+            ),
+        }
+        context.update(await aget_reference_data())
+        return self.render_to_response(context)
+
+    def get_paginate_keys(self):
+        return self.task_filter.ordering_keys
+
+
+class AsyncTaskDetailView(AsyncAuthRequiredMixin, AsyncConditionalPageMixin,
+                          TemplateResponseMixin, View):
+    template_name = TaskDetailView.template_name
+
+    async def get(self, request, pk, *args, **kwargs):
+        try:
+            task = await Task.objects.for_listing().aget(pk=pk)
+        except Task.DoesNotExist:
+            raise Http404('Задача не найдена')
+        try:
+            page = await ahistory_page(task.pk, request.GET.get('history'))
+        except InvalidCursor:
+            raise Http404('Некорректный курсор страницы')
+        return self.render_to_response(
+            {'view': self, 'object': task, 'task': task, 'history': page}
+        )
+
+
+class TaskEventsView(AsyncAuthRequiredMixin, View):
+    """
+    Поток text/event-stream с изменениями задач, отфильтрованными
+    так же, как список (?status=&executor=&labels=...). Вместо
+    перезагрузки /tasks/ страница получает готовые строки таблицы.
+    Соединение держится открытым, поэтому работает только под ASGI:
+    под WSGI оно заняло бы поток навсегда.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        if not settings.ASYNC_VIEWS:
+            raise Http404('Живые обновления доступны только под ASGI')
+        subscription = events.get_broker().subscribe(
+            TaskFilter(request.GET, request.user), request.user
+        )
+        response = StreamingHttpResponse(
+            events.stream(subscription), content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # nginx не должен копить события в буфере
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+
+def notify_new_executor(request, form):
+    # письмо уходит из run_workers, а не в этом запросе
+    executor = form.instance.executor
+    if ('executor' in form.changed_data and executor is not None
+            and executor != request.user):
+        enqueue_on_commit(NOTIFY_EXECUTOR, {'task_id': form.instance.pk})
+
 
 class TaskCreateView(AuthRequiredMixin, CreateView):
     model = Task
@@ -226,7 +469,9 @@ class TaskCreateView(AuthRequiredMixin, CreateView):
     def form_valid(self, form):
         form.instance.author = self.request.user
         messages.success(self.request, 'Задача успешно создана')
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        notify_new_executor(self.request, form)
+        return response
 
 
 class TaskUpdateView(AuthRequiredMixin, UpdateView):
@@ -237,7 +482,9 @@ class TaskUpdateView(AuthRequiredMixin, UpdateView):
 
     def form_valid(self, form):
         messages.success(self.request, 'Задача успешно изменена')
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        notify_new_executor(self.request, form)
+        return response
 
 
 class TaskDeleteView(AuthRequiredMixin, UserPassesTestMixin, DeleteView):
@@ -265,11 +512,13 @@ class TaskDeleteView(AuthRequiredMixin, UserPassesTestMixin, DeleteView):
 # LABELS
 # =====================
 
-class LabelListView(AuthRequiredMixin, ListView):
+class LabelListView(AuthRequiredMixin, ConditionalPageMixin,
+                    KeysetPaginationMixin, ListView):
     model = Label
     template_name = 'task_manager/label_list.html'
     context_object_name = 'labels'
     ordering = ['id']
+    conditional_tables = (LABEL, TASK)
 
 
 class LabelCreateView(AuthRequiredMixin, CreateView):
@@ -299,16 +548,35 @@ class LabelDeleteView(AuthRequiredMixin, DeleteView):
     template_name = 'task_manager/label_confirm_delete.html'
     success_url = reverse_lazy('label_list')
 
-    def delete(self, request, *args, **kwargs):
-        label = self.get_object()
-
-        if label.tasks.exists():
+    def form_valid(self, form):
+        if self.object.task_count:
             messages.error(
-                request,
+                self.request,
                 'Невозможно удалить метку, так как она используется'
             )
             return redirect('label_list')
 
-        response = super().delete(request, *args, **kwargs)
-        messages.success(request, 'Метка успешно удалена')
+        response = super().form_valid(form)
+        messages.success(self.request, 'Метка успешно удалена')
         return response
+
+
+# =====================
+# METRICS
+# =====================
+
+def metrics_view(request):
+    # в метриках размеры таблиц, число пользователей и задержки:
+    # без METRICS_TOKEN они открыты только в разработке
+    if not settings.METRICS_TOKEN and not settings.DEBUG:
+        raise Http404
+    # если задан METRICS_TOKEN, Prometheus передаёт его как Bearer-токен
+    if settings.METRICS_TOKEN:
+        expected = f'Bearer {settings.METRICS_TOKEN}'
+        provided = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(provided, expected):
+            return HttpResponse(status=403)
+    return HttpResponse(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -11,6 +11,11 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from task_manager.startup import warm_templates
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'task_manager.settings')
 
 application = get_wsgi_application()
+
+# шаблоны компилируются до первого запроса (и до fork воркеров)
+warm_templates()